@@ -0,0 +1,84 @@
+"""
+Compare the legacy row-by-row build_graph with the vectorized implementation.
+
+Usage:
+    python benchmarks/bench_build_graph.py [--sizes 1000 10000 100000 1000000] [--legacy-max 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import networkx as nx
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from logic.data_processor import build_graph  # noqa: E402
+from synthetic import make_register  # noqa: E402
+
+
+def legacy_build_graph(df):
+    """Original implementation, kept verbatim as the baseline"""
+    G = nx.DiGraph()
+
+    entities = set(df['Entity ID'])
+    parent_entities = set(df['Parent Entity ID'].dropna())
+    all_entities = entities.union(parent_entities)
+
+    for entity_id in all_entities:
+        entity_data = df[df['Entity ID'] == entity_id].iloc[0] if entity_id in entities else None
+
+        G.add_node(entity_id,
+                   name=entity_data['Name'] if entity_data is not None else f'Entity {entity_id}',
+                   country=entity_data['Country Code'] if entity_data is not None else 'Unknown',
+                   is_person=entity_data['Natural Person'] == 'yes' if entity_data is not None else False)
+
+    for _, row in df.iterrows():
+        if pd.notna(row['Parent Entity ID']):
+            G.add_edge(row['Parent Entity ID'], row['Entity ID'], share=row['Share'])
+
+    return G
+
+
+def same_graph(a, b):
+    # The legacy graph predates the city attribute, so compare what it has
+    def nodes(G):
+        return {node: {key: data[key] for key in ('name', 'country', 'is_person')} for node, data in G.nodes(data=True)}
+
+    return (
+        nodes(a) == nodes(b)
+        and {(u, v): d for u, v, d in a.edges(data=True)} == {(u, v): d for u, v, d in b.edges(data=True)}
+    )
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000,
+                        help='Largest size the quadratic legacy path is run at')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for size in args.sizes:
+        df = make_register(size)
+        new_graph, new_time = timed(build_graph, df)
+
+        if size <= args.legacy_max:
+            old_graph, old_time = timed(legacy_build_graph, df)
+            assert same_graph(old_graph, new_graph), f'graphs differ at {size} rows'
+            print(f'{size:>10,} {old_time:>12.3f} {new_time:>15.3f} {old_time / new_time:>8.1f}x')
+        else:
+            print(f"{size:>10,} {'skipped':>12} {new_time:>15.3f} {'-':>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""
+Benchmark the ingest -> graph -> filter -> geocode -> render pipeline.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 1000 10000 100000] [--depth 6] [--fan-out 4]
+        [--countries 20] [--person-ratio 0.1] [--format csv] [--repeat 3]
+        [--render-max 10000] [--renderers plotly d3] [--output results.json]
+        [--compare previous.json]
+
+Every stage runs --repeat times for wall time and once more under
+tracemalloc for peak memory. Streamlit caches are cleared before each run
+and the on-disk caches live in a fresh temporary directory, so ingest is
+always cold; the geocoding stage is cold on its first repeat only, since
+its SQLite cache persists between repeats. Geocoding stays offline unless
+--online is given. Renderers run headlessly (see headless.py) and are
+skipped above --render-max rows.
+
+Results are written as JSON; --compare prints the ratio of each stage's
+best time against an earlier results file.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--fan-out', type=float, default=4)
+    parser.add_argument('--countries', type=int, default=20)
+    parser.add_argument('--person-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['csv', 'xlsx', 'parquet'], default='csv')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--render-max', type=int, default=10_000,
+                        help='Largest register the renderers are run on')
+    parser.add_argument('--renderers', nargs='*',
+                        help='Only run renderers whose name contains one of these')
+    parser.add_argument('--online', action='store_true', help='Allow online geocoding')
+    parser.add_argument('--output', help='Results file (default benchmarks/results/pipeline-<time>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Configure the app before importing it: a private cache directory and, by
+# default, offline geocoding
+WORK_DIR = tempfile.mkdtemp(prefix='gt-analyzer-bench-')
+os.environ['GT_ANALYZER_CACHE_DIR'] = os.path.join(WORK_DIR, 'cache')
+os.environ.setdefault('GT_ANALYZER_ONLINE_GEOCODING', '1' if args.online else '0')
+
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import shutil  # noqa: E402
+
+import streamlit as st  # noqa: E402
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec  # noqa: E402
+
+# Bare-mode warnings ("no runtime found", "missing ScriptRunContext") on every cached call
+set_log_level('error')
+
+from headless import headless_streamlit  # noqa: E402
+from synthetic import make_register, revise_register  # noqa: E402
+from logic.data_processor import load_data, build_graph, normalize_register, update_graph  # noqa: E402
+from logic.aggregate_cube import AggregateCube  # noqa: E402
+from logic.export import EXPORT_FORMATS, WRITERS as EXPORT_WRITERS, available_formats  # noqa: E402
+from logic.filter_engine import FilterEngine  # noqa: E402
+from logic.graph_model import get_graph  # noqa: E402
+from logic.ownership import effective_ownership  # noqa: E402
+from logic.register_diff import diff_registers  # noqa: E402
+from logic.search_index import SearchIndex  # noqa: E402
+from utils.cache_dir import cache_path  # noqa: E402
+from utils.geocoding import get_location_data  # noqa: E402
+from views import network_views, hierarchy_views, map_views, distribution_views, table_views  # noqa: E402
+from views.map_view import render_map_view  # noqa: E402
+from views.statistics_view import render_statistics_view  # noqa: E402
+from views.ubo_view import render_ubo_view  # noqa: E402
+
+# (name, renderer, takes the graph rather than the frame)
+RENDERERS = [
+    ('network.plotly', network_views.render_plotly_network, True),
+    ('network.pyvis', network_views.render_pyvis_network, True),
+    ('network.cytoscape', network_views.render_cytoscape_network, True),
+    ('network.d3', network_views.render_d3_network, True),
+    ('network.bokeh', network_views.render_bokeh_network, True),
+    ('network.networkx', network_views.render_networkx_network, True),
+    ('network.webgl', network_views.render_webgl_network, True),
+    ('hierarchy.pyvis', hierarchy_views.render_pyvis_hierarchy, True),
+    ('hierarchy.plotly', hierarchy_views.render_plotly_hierarchy, True),
+    ('hierarchy.d3', hierarchy_views.render_d3_hierarchy, True),
+    ('hierarchy.graphviz', hierarchy_views.render_graphviz_hierarchy, True),
+    ('hierarchy.pyecharts', hierarchy_views.render_pyecharts_hierarchy, True),
+    ('map.folium', map_views.render_folium_map, False),
+    ('map.plotly', map_views.render_plotly_map, False),
+    ('map.pydeck', map_views.render_pydeck_map, False),
+    ('map.leaflet', map_views.render_leaflet_map, False),
+    ('map.kepler', map_views.render_kepler_map, False),
+    ('map.streaming', render_map_view, False),
+    ('statistics', render_statistics_view, False),
+    ('ubo', render_ubo_view, False),
+    ('distribution.seaborn', distribution_views.render_seaborn_distribution, False),
+    ('distribution.plotly', distribution_views.render_plotly_distribution, False),
+    ('distribution.altair', distribution_views.render_altair_distribution, False),
+    ('distribution.bokeh', distribution_views.render_bokeh_distribution, False),
+    ('distribution.matplotlib', distribution_views.render_matplotlib_distribution, False),
+    ('table.paginated', table_views.render_paginated_table, False),
+    ('table.aggrid', table_views.render_aggrid_table, False),
+    ('table.dash', table_views.render_dash_table, False),
+    ('table.plotly', table_views.render_plotly_table, False),
+    ('table.ipywidgets', table_views.render_ipywidgets_table, False),
+]
+
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def measure(name, run, setup=None, repeat=3):
+    """
+    Wall time of each repeat and peak traced memory of one extra run.
+    setup() runs untimed before every call and its result is passed to run().
+    """
+    result = {'stage': name, 'seconds': [], 'best': None, 'peak_bytes': None, 'error': None}
+    try:
+        for _ in range(repeat):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            run(state)
+            result['seconds'].append(time.perf_counter() - start)
+
+        state = setup() if setup else None
+        tracemalloc.start()
+        try:
+            run(state)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as exc:  # one failing stage must not end the run
+        result['error'] = f'{type(exc).__name__}: {exc}'
+    if result['seconds']:
+        result['best'] = min(result['seconds'])
+    return result
+
+
+def write_source(df, directory, fmt):
+    path = os.path.join(directory, f'register.{fmt}')
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'xlsx':
+        df.to_excel(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+    with open(path, 'rb') as f:
+        return os.path.basename(path), f.read()
+
+
+def uploaded(name, data):
+    return UploadedFile(UploadedFileRec('bench', name, 'application/octet-stream', data), None)
+
+
+def run_pipeline(n_rows, args):
+    register = make_register(
+        n_rows, depth=args.depth, fan_out=args.fan_out, n_countries=args.countries,
+        person_ratio=args.person_ratio, seed=args.seed
+    )
+    name, data = write_source(register, WORK_DIR, args.format)
+    stages = []
+
+    def fresh_upload():
+        clear_caches()
+        shutil.rmtree(os.path.dirname(cache_path('ingest', 'x')), ignore_errors=True)
+        return uploaded(name, data)
+
+    stages.append(measure('ingest', load_data, fresh_upload, args.repeat))
+    clear_caches()
+    df = load_data(uploaded(name, data))
+
+    stages.append(measure('build_graph', lambda _: build_graph(df), repeat=args.repeat))
+    full_graph = build_graph(df)
+
+    # Re-upload of the register with a day's worth of changes, patched from
+    # the previous graph (fresh frame objects, so no hashes are reused)
+    revised = normalize_register(revise_register(register, max(1, n_rows // 1000), seed=args.seed + 1))
+    revised = revised[df.columns]
+
+    def patch_graph(frames):
+        old, new = frames
+        return update_graph(full_graph, new, diff_registers(old, new))
+
+    stages.append(measure(
+        'update_graph', patch_graph, lambda: (df.copy(deep=False), revised.copy(deep=False)), args.repeat
+    ))
+    stages.append(measure('effective_ownership', lambda _: effective_ownership(full_graph), repeat=args.repeat))
+    stages.append(measure('filter_index', lambda _: FilterEngine(df), repeat=args.repeat))
+    stages.append(measure('aggregate_cube', lambda _: AggregateCube(df), repeat=args.repeat))
+    stages.append(measure('search_index', lambda _: SearchIndex(df), repeat=args.repeat))
+
+    # A typical session: everything, then half the countries above 25% without persons
+    countries = sorted(df['Country Code'].astype(str).unique())
+    half = countries[:max(1, len(countries) // 2)]
+
+    def apply_filters(engine):
+        engine.apply(countries, 0, True)
+        return engine.apply(half, 25, False)
+
+    stages.append(measure('apply_filters', apply_filters, lambda: FilterEngine(df), args.repeat))
+    filtered = FilterEngine(df).apply(countries, 0, True)
+
+    def geocode(_):
+        with headless_streamlit():
+            return get_location_data(filtered)
+
+    stages.append(measure('get_location_data', geocode, lambda: st.cache_data.clear(), args.repeat))
+
+    # Exports of the filtered rows, each written fresh (write_export would
+    # answer repeats from the disk cache)
+    for export_name in ('CSV', 'Parquet', 'Arrow IPC', 'Excel'):
+        if export_name not in available_formats():
+            continue
+        export_file = os.path.join(WORK_DIR, f'export.{EXPORT_FORMATS[export_name].extension}')
+        stages.append(measure(
+            f'export.{export_name}',
+            lambda _, writer=EXPORT_WRITERS[export_name], path=export_file: writer(filtered, path),
+            repeat=args.repeat
+        ))
+
+    if n_rows <= args.render_max:
+        G = get_graph(filtered)
+        get_location_data(filtered)
+        for renderer_name, renderer, takes_graph in RENDERERS:
+            if args.renderers and not any(part in renderer_name for part in args.renderers):
+                continue
+            source = G if takes_graph else filtered
+
+            def render(_, renderer=renderer, source=source):
+                with headless_streamlit():
+                    renderer(source)
+
+            stages.append(measure(f'render.{renderer_name}', render, repeat=args.repeat))
+
+    return {
+        'params': {
+            'rows': n_rows, 'depth': args.depth, 'fan_out': args.fan_out,
+            'countries': args.countries, 'person_ratio': args.person_ratio,
+            'seed': args.seed, 'format': args.format,
+        },
+        'stages': stages,
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    import networkx
+    import numpy
+    import pandas
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'packages': {
+            'pandas': pandas.__version__, 'numpy': numpy.__version__,
+            'networkx': networkx.__version__, 'streamlit': st.__version__,
+        },
+        'repeat': args.repeat,
+    }
+
+
+def print_run(run):
+    print(f"\n{run['params']['rows']:,} rows")
+    print(f"  {'stage':<28} {'best (s)':>10} {'peak (MB)':>10}")
+    for stage in run['stages']:
+        if stage['error']:
+            print(f"  {stage['stage']:<28} {'error':>10}  {stage['error'][:60]}")
+            continue
+        peak = stage['peak_bytes'] / 2 ** 20 if stage['peak_bytes'] is not None else float('nan')
+        print(f"  {stage['stage']:<28} {stage['best']:>10.4f} {peak:>10.1f}")
+
+
+def compare(results, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    best = {
+        (run['params']['rows'], stage['stage']): stage['best']
+        for run in previous['runs'] for stage in run['stages'] if stage['best']
+    }
+    print(f"\nCompared with {previous_path} ({previous['meta'].get('commit')})")
+    print(f"  {'rows':>10} {'stage':<28} {'before (s)':>11} {'after (s)':>10} {'ratio':>7}")
+    for run in results['runs']:
+        for stage in run['stages']:
+            before = best.get((run['params']['rows'], stage['stage']))
+            if before and stage['best']:
+                print(f"  {run['params']['rows']:>10,} {stage['stage']:<28} {before:>11.4f} "
+                      f"{stage['best']:>10.4f} {stage['best'] / before:>6.2f}x")
+
+
+def main():
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"pipeline-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+
+    # Renderers that write HTML files do so into the working directory
+    previous_cwd = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        results = {'meta': metadata(), 'runs': []}
+        for size in args.sizes:
+            run = run_pipeline(size, args)
+            results['runs'].append(run)
+            print_run(run)
+        results['meta']['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults written to {output}')
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
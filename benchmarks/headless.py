@@ -0,0 +1,139 @@
+"""
+Run Streamlit renderers without a Streamlit server.
+
+Inside headless_streamlit() every element and widget function on the
+`streamlit` module (and st.sidebar, placeholders, columns and the
+components.v1 embed functions) is replaced by a stub that records the call
+and returns what a fresh session would: the default option of a widget,
+a placeholder for containers. The renderers still build their figures and
+HTML, so a benchmark measures the project's work rather than Streamlit's
+serialization.
+"""
+import contextlib
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Functions that only emit output
+OUTPUT_FUNCTIONS = [
+    'write', 'markdown', 'text', 'caption', 'title', 'header', 'subheader', 'code', 'json',
+    'metric', 'info', 'success', 'warning', 'error', 'exception', 'image',
+    'dataframe', 'table', 'bar_chart', 'line_chart', 'area_chart', 'map',
+    'plotly_chart', 'pydeck_chart', 'altair_chart', 'vega_lite_chart', 'bokeh_chart',
+    'pyplot', 'graphviz_chart', 'download_button', 'progress', 'empty', 'balloons',
+]
+
+# Layout functions returning containers
+CONTAINER_FUNCTIONS = ['container', 'expander', 'spinner', 'form', 'popover']
+
+WIDGET_FUNCTIONS = [
+    'radio', 'selectbox', 'multiselect', 'slider', 'select_slider', 'checkbox', 'toggle',
+    'button', 'text_input', 'text_area', 'number_input', 'columns', 'tabs',
+]
+
+
+class HeadlessUI:
+    """
+    Stand-in for the streamlit module, st.sidebar and every container.
+    Each call is counted in `calls` by function name.
+    """
+
+    def __init__(self, calls=None):
+        self.calls = calls if calls is not None else {}
+
+    def _record(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        def stub(*args, **kwargs):
+            self._record(name)
+            return self
+        return stub
+
+    # What st.spinner (and so a cached function's spinner) inspects on its placeholder
+    _parent_block_types = ()
+
+    @property
+    def _active_dg(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def radio(self, label, options, index=0, **kwargs):
+        self._record('radio')
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    selectbox = radio
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        self._record('multiselect')
+        if default is None:
+            return []
+        return list(default) if isinstance(default, (list, tuple)) else [default]
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        self._record('slider')
+        return value if value is not None else min_value
+
+    select_slider = slider
+
+    def checkbox(self, label, value=False, **kwargs):
+        self._record('checkbox')
+        return value
+
+    toggle = checkbox
+
+    def button(self, *args, **kwargs):
+        self._record('button')
+        return False
+
+    def text_input(self, label, value='', **kwargs):
+        self._record('text_input')
+        return value
+
+    text_area = text_input
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        self._record('number_input')
+        return value if value is not None else (min_value or 0)
+
+    def columns(self, spec, **kwargs):
+        self._record('columns')
+        count = spec if isinstance(spec, int) else len(spec)
+        return [HeadlessUI(self.calls) for _ in range(count)]
+
+    def tabs(self, labels, **kwargs):
+        self._record('tabs')
+        return [HeadlessUI(self.calls) for _ in labels]
+
+
+@contextlib.contextmanager
+def headless_streamlit():
+    """
+    Patch the streamlit module for the duration of the block and yield the
+    HeadlessUI collecting the calls. Caching decorators are left alone.
+    """
+    ui = HeadlessUI()
+    patches = [(st, name, getattr(ui, name)) for name in OUTPUT_FUNCTIONS + CONTAINER_FUNCTIONS + WIDGET_FUNCTIONS]
+    patches += [(st, 'sidebar', ui), (components, 'html', ui.html), (components, 'iframe', ui.iframe)]
+
+    missing = object()
+    saved = [(target, name, getattr(target, name, missing)) for target, name, _ in patches]
+    try:
+        for target, name, value in patches:
+            setattr(target, name, value)
+        yield ui
+    finally:
+        for target, name, value in reversed(saved):
+            if value is missing:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
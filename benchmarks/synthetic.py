@@ -0,0 +1,92 @@
+"""
+Synthetic ownership registers for the benchmarks.
+
+make_register() builds a forest level by level: the first level holds the
+top-level owners, and each further level has roughly `fan_out` times as many
+entities, each owned by a random entity of the level above. Country codes
+are drawn from the bundled gazetteer so the geocoding stage resolves them
+offline; city names are synthetic and resolve to their country centroid.
+"""
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+COUNTRY_CENTROIDS = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'data', 'gazetteer', 'country_centroids.csv'
+)
+
+
+def country_codes(n_countries):
+    """The first n_countries ISO codes of the bundled gazetteer"""
+    with open(COUNTRY_CENTROIDS, encoding='utf-8') as f:
+        codes = [row['country_code'] for row in csv.DictReader(f)]
+    if not 1 <= n_countries <= len(codes):
+        raise ValueError(f'n_countries must be between 1 and {len(codes)}')
+    return codes[:n_countries]
+
+
+def level_sizes(n_rows, depth, fan_out):
+    """Number of entities per ownership level, summing to n_rows"""
+    depth = max(1, min(depth, n_rows))
+    weights = np.float64(fan_out) ** np.arange(depth)
+    sizes = np.maximum(1, np.floor(weights / weights.sum() * n_rows)).astype(np.int64)
+    sizes[-1] += n_rows - sizes.sum()
+    # Rounding can leave the last level empty on small registers
+    while sizes[-1] < 1:
+        donor = int(np.argmax(sizes[:-1]))
+        sizes[donor] -= 1
+        sizes[-1] += 1
+    return sizes
+
+
+def make_register(n_rows, depth=6, fan_out=4, n_countries=20, person_ratio=0.1,
+                  cities_per_country=5, seed=0):
+    """
+    Ownership register of n_rows entities in the upload format.
+
+    depth is the number of ownership levels and fan_out the growth factor
+    between them; person_ratio is the share of natural persons.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_rows + 1)
+
+    sizes = level_sizes(n_rows, depth, fan_out)
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    parents = np.full(n_rows, np.nan)
+    for level in range(1, len(sizes)):
+        above = ids[starts[level - 1]:starts[level]]
+        parents[starts[level]:starts[level + 1]] = rng.choice(above, sizes[level])
+
+    countries = np.array(country_codes(n_countries))
+    country = rng.choice(countries, n_rows)
+    city = np.char.add(np.char.add(country, ' City '), rng.integers(1, cities_per_country + 1, n_rows).astype(str))
+
+    return pd.DataFrame({
+        'Entity ID': ids,
+        'Name': [f'Entity {i}' for i in ids],
+        'Country Code': country,
+        'City': city,
+        'Natural Person': np.where(rng.random(n_rows) < person_ratio, 'yes', 'no'),
+        'Parent Entity ID': parents,
+        'Share': rng.uniform(1, 100, n_rows).round(2),
+    })
+
+
+def revise_register(df, n_changes, seed=1):
+    """
+    Next day's version of a register: n_changes shares edited, n_changes
+    entities dropped and n_changes new entities owned by existing ones
+    """
+    rng = np.random.default_rng(seed)
+    df = df.reset_index(drop=True)
+    edited = rng.choice(len(df), n_changes, replace=False)
+    df.loc[edited, 'Share'] = rng.uniform(1, 100, n_changes).round(2)
+    df = df.drop(rng.choice(len(df), n_changes, replace=False))
+
+    added = df.iloc[rng.choice(len(df), n_changes)].reset_index(drop=True)
+    added['Entity ID'] = np.arange(1, n_changes + 1) + df['Entity ID'].max()
+    added['Name'] = [f'Entity {i}' for i in added['Entity ID']]
+    added['Parent Entity ID'] = df['Entity ID'].iloc[rng.choice(len(df), n_changes)].to_numpy()
+    return pd.concat([df, added], ignore_index=True)
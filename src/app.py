@@ -1,34 +1,17 @@
 import streamlit as st
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
 import pandas as pd
 
 # Import modular components
-from views.map_view import render_map_view
-from views.statistics_view import render_statistics_view
-from views.hierarchy_views import render_hierarchy_views
-from views.map_views import render_map_views
-from views.network_views import render_network_views
-from views.distribution_views import render_distribution_views
-from views.table_views import render_table_views
 from components.filters import render_filters, apply_filters
-from logic.data_processor import load_data, build_graph
+from components.view_router import render_view_router
+from components.export_panel import render_export_panel
+from logic.data_processor import load_data
+from logic.register_diff import track_upload
+from logic.search_index import get_search_index
 
 # Set page config
 st.set_page_config(page_title="Corporate Structure Visualization", layout="wide")
 
-# Cache the geocoding function
-@st.cache_data
-def get_coordinates(location):
-    try:
-        geolocator = Nominatim(user_agent="corporate_structure_app")
-        location_data = geolocator.geocode(location)
-        if location_data:
-            return location_data.latitude, location_data.longitude
-        return None
-    except GeocoderTimedOut:
-        return None
-
 # Main app
 st.title('Corporate Structure Visualization Tool')
 
@@ -36,13 +19,33 @@ st.title('Corporate Structure Visualization Tool')
 st.sidebar.title('Controls')
 
 # File upload
-uploaded_file = st.sidebar.file_uploader("Upload Excel/CSV file", type=["xlsx", "csv"])
+uploaded_file = st.sidebar.file_uploader(
+    "Upload Excel/CSV/Parquet/Arrow file",
+    type=["xlsx", "csv", "parquet", "arrow", "feather"]
+)
+
+# Unit of the register's Share column; guessed from the values unless set
+SHARE_UNIT_OPTIONS = {'Auto-detect': None, 'Percent (0-100)': 'percent', 'Fraction (0-1)': 'fraction'}
+share_unit_label = st.sidebar.selectbox("Share unit", list(SHARE_UNIT_OPTIONS), key='share_unit')
 
 if uploaded_file is not None:
     # Load and display data
-    df = load_data(uploaded_file)
+    df = load_data(uploaded_file, SHARE_UNIT_OPTIONS[share_unit_label])
     
     if df is not None:
+        if df.attrs.get('share_unit_detected') and df.attrs.get('share_unit') == 'fraction':
+            st.sidebar.warning(
+                "Every share is at most 1, so shares were read as fractions and "
+                "multiplied by 100. If they are small percentages, set the share "
+                "unit to Percent."
+            )
+        
+        # A new version of the register is patched in from the previous one
+        track_upload(df)
+        
+        # Entity search index, built once per dataset
+        get_search_index(df)
+        
         # Display raw data in expander
         with st.expander("View Raw Data"):
             st.dataframe(df)
@@ -51,37 +54,10 @@ if uploaded_file is not None:
         selected_countries, min_share, show_persons = render_filters(df)
         filtered_df = apply_filters(df, selected_countries, min_share, show_persons)
         
-        # Create tabs for different views
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Network Graph", "Hierarchy View", "Geographic View", "Map View", "Statistics", "Distribution", "Table View"])
-
-        
-        with tab1:
-            render_network_views(filtered_df)
-            
-        with tab2:
-            render_hierarchy_views(filtered_df)
-        
-        with tab3:
-            render_map_views(filtered_df)
-            
-        with tab4:
-            render_map_view(filtered_df, get_coordinates)
-        
-        with tab5:
-            render_statistics_view(filtered_df)
-        
-        with tab6:
-            render_distribution_views(filtered_df)
-        
-        with tab7:
-            render_table_views(filtered_df)
+        # Render only the selected view
+        render_view_router(filtered_df)
         
-        # Export options
-        st.sidebar.download_button(
-            "Download Filtered Data",
-            filtered_df.to_csv(index=False),
-            "filtered_data.csv",
-            "text/csv"
-        )
+        # Export options, written on demand
+        render_export_panel(filtered_df)
 else:
     st.info('Please upload a file to begin.')
\ No newline at end of file
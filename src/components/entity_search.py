@@ -0,0 +1,58 @@
+import streamlit as st
+from logic.graph_model import focus_graph
+from logic.search_index import search_rows
+from components.widget_state import drop_stale_choice
+
+# Matching entities offered for focusing a graph view
+MAX_FOCUS_CHOICES = 200
+
+def render_entity_search(df):
+    """
+    Search box shared by the table and graph views (the query carries over
+    between them). Returns the positions in df of the matching rows, or None
+    when the box is empty.
+    """
+    query_column, fuzzy_column = st.columns([4, 1])
+    with query_column:
+        query = st.text_input(
+            "Search entities",
+            key='entity_search',
+            placeholder="Name, city, country or entity ID",
+            help="Every word has to match the start of a word in one of these columns"
+        )
+    with fuzzy_column:
+        fuzzy = st.toggle("Fuzzy", key='entity_search_fuzzy', help="Also match words a typo or two away")
+
+    if not query.strip():
+        return None
+    rows = search_rows(df, query, fuzzy)
+    st.caption(f"{len(rows):,} matching rows")
+    return rows
+
+def render_graph_search(G, df):
+    """
+    Entity search for the graph views. Returns G itself while the search box
+    is empty, otherwise the neighbourhood of the chosen matching entity.
+    """
+    rows = render_entity_search(df)
+    if rows is None:
+        return G
+
+    entity_ids = [node for node in df['Entity ID'].iloc[rows].unique().tolist() if node in G]
+    if not entity_ids:
+        st.info("No entity in the graph matches the search.")
+        return G
+
+    choices = entity_ids[:MAX_FOCUS_CHOICES]
+    drop_stale_choice('entity_focus', choices)
+    focus_column, radius_column = st.columns([4, 1])
+    with focus_column:
+        node = st.selectbox(
+            "Focus on",
+            choices,
+            format_func=lambda node: f"{G.nodes[node]['name']} ({node})",
+            key='entity_focus'
+        )
+    with radius_column:
+        radius = st.number_input("Links around it", min_value=1, max_value=10, value=2, key='entity_focus_radius')
+    return focus_graph(G, node, int(radius))
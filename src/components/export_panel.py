@@ -0,0 +1,32 @@
+import streamlit as st
+from logic.export import EXPORT_FORMATS, available_formats, export_path, write_export
+
+def render_export_panel(filtered_df):
+    """
+    Sidebar downloads of the filtered data. An export is only written when
+    asked for, then kept on disk under the filter state's fingerprint, so
+    the same filters download again without any work. The file is only read
+    into the download button in the run its Prepare button was pressed, not
+    on every rerun of the app.
+    """
+    st.sidebar.write("### Export")
+    name = st.sidebar.selectbox("Format", available_formats(), key='export_format')
+    export_format = EXPORT_FORMATS[name]
+
+    if not st.sidebar.button(f"Prepare {name} export", key='export_prepare'):
+        return
+
+    path = export_path(filtered_df, name)
+    if path is None:
+        with st.spinner(f"Writing {name} export..."):
+            path = write_export(filtered_df, name)
+
+    prefix = 'filtered_graph' if export_format.graph else 'filtered_data'
+    with open(path, 'rb') as f:
+        st.sidebar.download_button(
+            f"Download {name}",
+            f,
+            f"{prefix}.{export_format.extension}",
+            export_format.mime,
+            key='export_download'
+        )
@@ -1,8 +1,9 @@
 import streamlit as st
+from logic.filter_engine import get_filter_engine
 
 def render_filters(df):
-    # Filters
-    countries = sorted(df['Country Code'].unique())
+    # Filters (country list is sorted once per dataset by the filter engine)
+    countries = get_filter_engine(df).countries
     selected_countries = st.sidebar.multiselect(
         'Filter by Country',
         countries,
@@ -15,10 +16,5 @@ def render_filters(df):
     return selected_countries, min_share, show_persons
 
 def apply_filters(df, selected_countries, min_share, show_persons):
-    # Filter data
-    filtered_df = df[df['Country Code'].isin(selected_countries)]
-    filtered_df = filtered_df[filtered_df['Share'] >= min_share]
-    if not show_persons:
-        filtered_df = filtered_df[filtered_df['Natural Person'] != 'yes']
-    
-    return filtered_df
\ No newline at end of file
+    # Filter data from the precomputed indexes
+    return get_filter_engine(df).apply(selected_countries, min_share, show_persons)
\ No newline at end of file
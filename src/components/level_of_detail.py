@@ -0,0 +1,58 @@
+import streamlit as st
+from logic.layout import graph_fingerprint
+from logic.level_of_detail import DEFAULT_NODE_BUDGET, GROUPINGS, DetailView, get_cluster_tree
+from components.widget_state import drop_stale_choice
+
+# Session state of the current level-of-detail view
+VIEW_KEY = 'level_of_detail'
+
+def _detail_view(G, grouping, budget):
+    # Only the current view is kept for the session, so expanded groups stay
+    # expanded across reruns; another graph, grouping or budget replaces it
+    current = (graph_fingerprint(G), grouping, budget)
+    state = st.session_state.get(VIEW_KEY)
+    if state is None or state[0] != current:
+        state = (current, DetailView(get_cluster_tree(G, grouping), budget))
+        st.session_state[VIEW_KEY] = state
+    return state[1]
+
+def render_level_of_detail(G):
+    """
+    Sidebar controls for large graphs. Returns G itself when it fits the
+    node budget, otherwise the current level-of-detail graph in which whole
+    groups of entities are drawn as one super-node.
+    """
+    st.sidebar.write("### Level of Detail")
+    budget = int(st.sidebar.number_input(
+        "Node budget",
+        min_value=100,
+        value=DEFAULT_NODE_BUDGET,
+        step=500,
+        help="Above this many entities, groups of entities are drawn as single nodes",
+        key='lod_budget'
+    ))
+    if len(G) <= budget:
+        return G
+
+    grouping = st.sidebar.selectbox("Group by", GROUPINGS, key='lod_grouping')
+    view = _detail_view(G, grouping, budget)
+
+    groups = view.visible_groups()
+    if groups:
+        labels = {cluster: f'{label} ({size:,})' for cluster, label, size in groups}
+        drop_stale_choice('lod_group', labels)
+        selected = st.sidebar.selectbox(
+            "Group",
+            list(labels),
+            format_func=labels.get,
+            key='lod_group'
+        )
+        expand_column, reset_column = st.sidebar.columns(2)
+        expand_column.button("Expand", on_click=view.expand, args=(selected,))
+        reset_column.button("Collapse all", on_click=st.session_state.pop, args=(VIEW_KEY, None))
+
+    st.info(
+        f"{len(G):,} entities exceed the node budget of {budget:,}: showing {view.item_count:,} nodes, "
+        f"{len(groups):,} of them groups. Expand groups from the sidebar."
+    )
+    return view.graph(G)
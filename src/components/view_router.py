@@ -0,0 +1,80 @@
+import streamlit as st
+from views.map_view import render_map_view
+from views.statistics_view import render_statistics_view
+from views.ubo_view import render_ubo_view
+from views.hierarchy_views import render_hierarchy_views
+from views.map_views import render_map_views
+from views.network_views import render_network_views
+from views.distribution_views import render_distribution_views
+from views.table_views import render_table_views
+
+# Top-level views in display order
+VIEWS = {
+    "Network Graph": render_network_views,
+    "Hierarchy View": render_hierarchy_views,
+    "Geographic View": render_map_views,
+    "Map View": render_map_view,
+    "Statistics": render_statistics_view,
+    "UBO Screening": render_ubo_view,
+    "Distribution": render_distribution_views,
+    "Table View": render_table_views,
+}
+
+# Widgets inside the views and the sidebar panels. Streamlit drops the state
+# of widgets that were not drawn on the last run, so these are re-assigned on
+# every run to survive while their view is hidden. Those whose options depend
+# on the data drop a stale choice before drawing (see drop_stale_choice).
+VIEW_WIDGET_KEYS = [
+    'network_viz_type',
+    'lod_budget',
+    'lod_grouping',
+    'lod_group',
+    'webgl_radius',
+    'hierarchy_viz_type',
+    'map_viz_type',
+    'distribution_viz_type',
+    'table_viz_type',
+    'entity_search',
+    'entity_search_fuzzy',
+    'entity_focus',
+    'entity_focus_radius',
+    'table_country',
+    'table_city',
+    'table_type',
+    'table_share_range',
+    'table_sort',
+    'table_descending',
+    'table_page_size',
+    'table_page',
+    'ubo_threshold',
+    'ubo_mode',
+    'ubo_entity',
+    'ubo_person',
+    'export_format',
+]
+
+def _keep_widget_state():
+    for key in VIEW_WIDGET_KEYS:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+def render_view_router(filtered_df):
+    """
+    Render only the selected view.
+
+    Unlike st.tabs, which runs every tab on every rerun, the views that are
+    not shown do no work at all. Their expensive results (graph, geocoding)
+    are cached on the fingerprint of the filtered data, so switching back to
+    a view with unchanged filters redraws it from cache.
+    """
+    _keep_widget_state()
+    
+    view = st.radio(
+        "View",
+        list(VIEWS),
+        horizontal=True,
+        key='active_view',
+        label_visibility='collapsed'
+    )
+    
+    VIEWS[view](filtered_df)
@@ -0,0 +1,10 @@
+import streamlit as st
+
+def drop_stale_choice(key, options):
+    """
+    Forget the kept choice of a selectbox whose options depend on the data
+    (search results, groups, filtered entities) once it is no longer among
+    them, so the widget falls back to its first option instead of failing
+    """
+    if key in st.session_state and st.session_state[key] not in options:
+        del st.session_state[key]
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+from logic.filter_engine import filter_state
+from logic.fingerprint import frame_fingerprint
+
+# Entity types, in category order
+ENTITY_TYPES = ['Natural Person', 'Corporate Entity']
+
+# Cube dimensions and the labels their groups are shown under
+DIMENSIONS = {
+    'country': 'Country',
+    'city': 'City',
+    'type': 'Entity Type',
+    'bucket': 'Share Bucket',
+    'depth': 'Depth',
+}
+
+# Share buckets are whole percents, so the integer 'Minimum Share %' filter
+# (share >= m) selects exactly the buckets from m up; a fractional threshold
+# rounds up to the next whole percent. Shares above 100 join the top bucket;
+# missing and negative shares get bucket -1, which no filter selects.
+N_SHARE_BUCKETS = 101
+_NO_SHARE = -1
+
+def ownership_depth(df):
+    """
+    Depth of every row's entity in the register's ownership hierarchy: 0 for
+    top-level owners, otherwise the fewest links from one. Entities owning
+    each other that nobody outside owns are top-level through their first
+    entity, which matches the tidy tree layout on ordinary registers.
+    """
+    if df.empty:
+        return np.zeros(0, dtype=np.int64)
+    entity_ids = df['Entity ID']
+    has_parent = df['Parent Entity ID'].notna().to_numpy()
+    codes, _ = pd.factorize(pd.concat([entity_ids, df['Parent Entity ID'][has_parent]], ignore_index=True))
+    n = int(codes.max()) + 1
+    entity_codes, parent_codes = codes[:len(df)], codes[len(df):]
+    child_codes = entity_codes[has_parent]
+
+    # Roots: the first entity of every strongly connected group (a single
+    # entity, or a cycle) that no entity outside the group owns
+    ownership = sp.csr_matrix((np.ones(len(child_codes)), (parent_codes, child_codes)), shape=(n, n))
+    _, groups = connected_components(ownership, directed=True, connection='strong')
+    owned_groups = np.zeros(groups.max() + 1, dtype=bool)
+    owned_groups[groups[child_codes][groups[parent_codes] != groups[child_codes]]] = True
+    first = pd.Series(groups).drop_duplicates()
+    roots = first.index.to_numpy()[~owned_groups[first.to_numpy()]]
+
+    # Breadth-first tree from a virtual root owning every root, then depths
+    # by pointer jumping up the tree (one pass per doubling of the depth)
+    links = sp.csr_matrix(
+        (np.ones(len(child_codes) + len(roots)),
+         (np.concatenate([parent_codes, np.full(len(roots), n)]), np.concatenate([child_codes, roots]))),
+        shape=(n + 1, n + 1)
+    )
+    _, ancestor = breadth_first_order(links, n, directed=True, return_predecessors=True)
+    ancestor[n] = n
+    depth = (ancestor != n).astype(np.int64)
+    while (ancestor != n).any():
+        depth += depth[ancestor]
+        ancestor = ancestor[ancestor]
+    return depth[entity_codes]
+
+class AggregateCube:
+    """
+    Row count and share total of a register for every observed combination
+    of country, city, entity type, share bucket and ownership depth.
+
+    Built in one pass per dataset, the cube answers any combination of the
+    sidebar filters, grouped by any of its dimensions, by masking and
+    summing its cells; it never goes back to the rows. Cells are stored
+    sparsely (one per observed combination), so the cube is at most as long
+    as the register and usually far shorter.
+    """
+
+    def __init__(self, df):
+        self.labels = {}
+        codes = {}
+
+        # Countries compare as strings, as in the filter engine
+        codes['country'], countries = pd.factorize(df['Country Code'].astype(str), sort=True)
+        self.labels['country'] = list(countries)
+
+        cities = df['City'].astype(object).fillna('N/A').astype(str) if 'City' in df.columns else pd.Series('N/A', index=df.index)
+        codes['city'], cities = pd.factorize(cities, sort=True)
+        self.labels['city'] = list(cities)
+
+        if 'Is Person' in df.columns:
+            is_person = df['Is Person'].to_numpy(dtype=bool)
+        else:
+            is_person = (df['Natural Person'].astype(str).str.lower() == 'yes').to_numpy()
+        codes['type'] = np.where(is_person, 0, 1)
+        self.labels['type'] = list(ENTITY_TYPES)
+
+        share = df['Share'].to_numpy(dtype='float64', na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            buckets = np.where(share >= 0, np.minimum(np.floor(share), N_SHARE_BUCKETS - 1), _NO_SHARE)
+        codes['bucket'] = buckets.astype(np.int64) + 1
+        self.labels['bucket'] = list(range(_NO_SHARE, N_SHARE_BUCKETS))
+
+        depth = ownership_depth(df)
+        codes['depth'] = depth
+        self.labels['depth'] = list(range(int(depth.max()) + 1 if len(depth) else 1))
+
+        # One cell per observed combination of codes
+        shape = tuple(max(len(self.labels[dimension]), 1) for dimension in DIMENSIONS)
+        keys = np.ravel_multi_index(tuple(codes[dimension] for dimension in DIMENSIONS), shape)
+        inverse, cells = pd.factorize(keys)
+        self.codes = dict(zip(DIMENSIONS, (axis.astype(np.int32) for axis in np.unravel_index(cells, shape))))
+        self.count = np.bincount(inverse, minlength=len(cells))
+        self.share = np.bincount(inverse, np.nan_to_num(share), minlength=len(cells))
+
+    def __len__(self):
+        return len(self.count)
+
+    def _mask(self, countries, min_share, show_persons):
+        mask = np.ones(len(self), dtype=bool)
+        if countries is not None:
+            selected = np.isin(self.labels['country'], list(countries))
+            mask &= selected[self.codes['country']]
+        if min_share is not None:
+            mask &= self.codes['bucket'] >= int(np.ceil(min_share)) + 1
+        if not show_persons:
+            mask &= self.codes['type'] == ENTITY_TYPES.index('Corporate Entity')
+        return mask
+
+    def aggregate(self, by, countries=None, min_share=None, show_persons=True):
+        """
+        Count, Share (total) and Mean Share of the rows passing the filters,
+        grouped by the `by` dimensions (keys of DIMENSIONS). Groups without
+        rows are left out.
+        """
+        mask = self._mask(countries, min_share, show_persons)
+        shape = tuple(max(len(self.labels[dimension]), 1) for dimension in by)
+        groups = np.ravel_multi_index(tuple(self.codes[dimension][mask] for dimension in by), shape)
+        size = int(np.prod(shape))
+        count = np.bincount(groups, self.count[mask], minlength=size).astype(np.int64)
+        share = np.bincount(groups, self.share[mask], minlength=size)
+
+        observed = np.flatnonzero(count)
+        group_codes = np.unravel_index(observed, shape)
+        index = pd.MultiIndex.from_arrays(
+            [np.asarray(self.labels[dimension], dtype=object)[codes] for dimension, codes in zip(by, group_codes)],
+            names=[DIMENSIONS[dimension] for dimension in by]
+        )
+        if len(by) == 1:
+            index = index.get_level_values(0)
+        return pd.DataFrame({
+            'Count': count[observed],
+            'Share': share[observed],
+            'Mean Share': share[observed] / count[observed],
+        }, index=index)
+
+# A new version of a register gets a cube built afresh rather than patched:
+# the build is one vectorized pass, and a changed owner moves the depth of
+# every entity below it, far beyond the rows that changed
+@st.cache_resource(max_entries=8, show_spinner="Aggregating register...")
+def _build_aggregate_cube(fingerprint, _df):
+    return AggregateCube(_df)
+
+def get_aggregate_cube(df):
+    """
+    Aggregate cube of a dataset, built once and shared by all sessions
+    """
+    return _build_aggregate_cube(frame_fingerprint(df), df)
+
+def aggregate(df, by):
+    """
+    AggregateCube.aggregate() for a (filtered) frame: a frame from the
+    filter engine is answered from its dataset's cube with the filters it
+    was made with, any other frame from a cube of its own
+    """
+    state = filter_state(df)
+    if state is None:
+        return get_aggregate_cube(df).aggregate(by)
+    dataset, countries, min_share, show_persons = state
+    return get_aggregate_cube(dataset).aggregate(by, countries, min_share, show_persons)
@@ -1,51 +1,288 @@
+import hashlib
+import os
+import numpy as np
 import pandas as pd
 import networkx as nx
 import streamlit as st
+from utils.cache_dir import cache_path
 
-@st.cache_data
-def load_data(uploaded_file):
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+REQUIRED_COLUMNS = ['Entity ID', 'Name', 'Country Code', 'Natural Person', 'Parent Entity ID', 'Share']
+
+# Bump when normalize_register changes so stale Excel sidecars are ignored
+SCHEMA_VERSION = 3
+
+# Units a register can store shares in; shares are always kept in percent
+SHARE_UNITS = ['percent', 'fraction']
+
+def _read_source(uploaded_file):
+    """
+    Read an uploaded register into a raw frame based on its file extension
+    """
+    name = uploaded_file.name.lower()
+    if name.endswith('.parquet'):
+        return pd.read_parquet(uploaded_file)
+    if name.endswith(('.arrow', '.feather', '.ipc')):
+        return pd.read_feather(uploaded_file)
+    if name.endswith('.xlsx'):
+        return pd.read_excel(uploaded_file, engine='openpyxl')
+    if HAS_PYARROW:
+        return pd.read_csv(uploaded_file, engine='pyarrow')
+    return pd.read_csv(uploaded_file)
+
+def _normalize_ids(entity_ids, parent_ids):
+    """
+    Give Entity ID and Parent Entity ID one shared type.
+
+    Purely numeric registers get nullable integers; registers that mix in
+    alphanumeric IDs (e.g. 'P1' for persons) get strings, with integral
+    numbers written without a trailing '.0' so parents still match entities.
+    """
+    numeric_entities = pd.to_numeric(entity_ids, errors='coerce')
+    numeric_parents = pd.to_numeric(parent_ids, errors='coerce')
+    all_numeric = (
+        numeric_entities.notna().eq(entity_ids.notna()).all()
+        and numeric_parents.notna().eq(parent_ids.notna()).all()
+        and (numeric_entities.dropna() % 1 == 0).all()
+        and (numeric_parents.dropna() % 1 == 0).all()
+    )
+    if all_numeric:
+        return numeric_entities.astype('Int64'), numeric_parents.astype('Int64')
+
+    def as_string(ids, numeric):
+        integral = numeric.where(numeric % 1 == 0)
+        ids = ids.astype('object').where(integral.isna(), integral.astype('Int64').astype('object'))
+        return ids.where(ids.isna(), ids.astype(str)).astype('string')
+
+    return as_string(entity_ids, numeric_entities), as_string(parent_ids, numeric_parents)
+
+def detect_share_unit(share):
+    """
+    Best guess at the unit of a register's shares: 'fraction' (1.0 = 100 %)
+    when every share is at most 1, otherwise 'percent'. A register of only
+    small percentage stakes looks like fractions, so the guess is reported.
+    """
+    share = pd.to_numeric(share, errors='coerce')
+    return 'fraction' if share.notna().any() and share.max() <= 1 else 'percent'
+
+def normalize_register(df, share_unit=None):
+    """
+    Map a raw register onto the fixed, typed schema every view expects.
+
+    share_unit is the unit the register stores shares in (see SHARE_UNITS),
+    detected when None. The unit used is kept in df.attrs['share_unit'], and
+    df.attrs['share_unit_detected'] tells whether it was a guess.
+    """
+    df = df.copy()
+    df.attrs['share_unit'] = share_unit or detect_share_unit(df['Share'])
+    df.attrs['share_unit_detected'] = share_unit is None
+    
+    # Fill missing values with appropriate defaults. Text columns go through
+    # object first: Parquet and Arrow uploads (the app's own exports among
+    # them) may bring them as categoricals, which reject a new fill value
+    df['Name'] = df['Name'].astype(object).fillna('Unnamed Entity').astype(str)
+    df['Country Code'] = df['Country Code'].astype(object).fillna('Unknown').astype(str).astype('category')
+    if 'City' in df.columns:
+        df['City'] = df['City'].astype(object).astype('category')
+    
+    # Natural Person stays as a normalized 'yes'/'no' label, Is Person is the boolean
+    natural_person = df['Natural Person'].astype(object).fillna('no').astype(str).str.strip().str.lower()
+    df['Natural Person'] = natural_person.astype(pd.CategoricalDtype(['no', 'yes']))
+    df['Is Person'] = natural_person.eq('yes')
+    
+    share = pd.to_numeric(df['Share'], errors='coerce')
+    if df.attrs['share_unit'] == 'fraction':
+        share = share * 100
+    df['Share'] = share.fillna(0).astype('float32')
+    df['Entity ID'], df['Parent Entity ID'] = _normalize_ids(df['Entity ID'], df['Parent Entity ID'])
+    
+    return df
+
+def _sidecar_path(raw_bytes, share_unit):
+    digest = hashlib.sha1(raw_bytes).hexdigest()
+    return cache_path('ingest', f'{digest}.{share_unit or "detect"}.v{SCHEMA_VERSION}.parquet')
+
+def _read_only(df):
+    """
+    The frame rebuilt on its own column arrays with their values marked
+    read-only, so writing into a cell raises instead of changing the data
+    other sessions see. String columns stay writable: pandas 2.0 cannot
+    slice a read-only StringArray. A nullable column's mask stays writable
+    too, as pandas' hash tables need it so; writes reach the values first.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column].array
+        if isinstance(values, pd.arrays.StringArray):
+            array = None
+        elif isinstance(values, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+            array = values._data
+        else:
+            array = getattr(values, '_ndarray', None)
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+        columns[column] = values
+    result = pd.DataFrame(columns, index=df.index, copy=False)
+    result.attrs = dict(df.attrs)
+    return result
+
+# Shared, read-only frame: returned as the same object on every rerun instead
+# of an unpickled copy, so per-dataset indexes can be looked up by identity.
+# Its arrays refuse writes; views that need to change values work on a copy.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_data(uploaded_file, share_unit=None):
+    # Excel is slow to parse, so a normalized Parquet sidecar keyed on the file
+    # content lets later loads of the same workbook skip openpyxl entirely
+    sidecar = None
+    if uploaded_file.name.lower().endswith('.xlsx') and HAS_PYARROW:
+        sidecar = _sidecar_path(uploaded_file.getvalue(), share_unit)
+        if os.path.exists(sidecar):
+            return _read_only(pd.read_parquet(sidecar))
+    
     # Load the data based on file type
-    if uploaded_file.name.endswith('.xlsx'):
-        df = pd.read_excel(uploaded_file, engine='openpyxl')
-    else:
-        df = pd.read_csv(uploaded_file)
+    df = _read_source(uploaded_file)
     
     # Ensure required columns exist
-    required_columns = ['Entity ID', 'Name', 'Country Code', 'Natural Person', 'Parent Entity ID', 'Share']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     
     if missing_columns:
         st.error(f"Missing required columns: {', '.join(missing_columns)}")
         return None
     
-    # Fill missing values with appropriate defaults
-    df['Name'] = df['Name'].fillna('Unnamed Entity')
-    df['Country Code'] = df['Country Code'].fillna('Unknown')
-    df['Natural Person'] = df['Natural Person'].fillna('no')
-    df['Share'] = df['Share'].fillna(0)
+    df = normalize_register(df, share_unit)
     
-    return df
+    if sidecar is not None:
+        df.to_parquet(sidecar, index=False)
+    
+    return _read_only(df)
+
+def _entity_attributes(entities):
+    """
+    (entity id, node attributes) for a frame indexed by Entity ID
+    """
+    cities = entities['City'].astype(object).fillna('N/A') if 'City' in entities else pd.Series('N/A', index=entities.index)
+    return (
+        (entity_id, {'name': name, 'city': city, 'country': country, 'is_person': is_person})
+        for entity_id, name, city, country, is_person in zip(
+            entities.index.tolist(),
+            entities['Name'].tolist(),
+            cities.tolist(),
+            entities['Country Code'].tolist(),
+            (entities['Natural Person'] == 'yes').tolist()
+        )
+    )
+
+def _placeholder_attributes(parent_id):
+    return {'name': f'Entity {parent_id}', 'city': 'N/A', 'country': 'Unknown', 'is_person': False}
 
 def build_graph(df):
     G = nx.DiGraph()
     
-    # First pass: add all nodes
-    entities = set(df['Entity ID'])
-    parent_entities = set(df['Parent Entity ID'].dropna())
-    all_entities = entities.union(parent_entities)
-    
-    for entity_id in all_entities:
-        # Find entity data if it exists in the dataframe
-        entity_data = df[df['Entity ID'] == entity_id].iloc[0] if entity_id in entities else None
-        
-        G.add_node(entity_id,
-                   name=entity_data['Name'] if entity_data is not None else f'Entity {entity_id}',
-                   country=entity_data['Country Code'] if entity_data is not None else 'Unknown',
-                   is_person=entity_data['Natural Person'] == 'yes' if entity_data is not None else False)
-    
-    # Second pass: add edges
-    for _, row in df.iterrows():
-        if pd.notna(row['Parent Entity ID']):
-            G.add_edge(row['Parent Entity ID'], row['Entity ID'], share=row['Share'])
-    
-    return G
\ No newline at end of file
+    # Index the frame once by Entity ID; the first row of an entity wins
+    entities = df.drop_duplicates(subset='Entity ID').set_index('Entity ID')
+    
+    # First pass: add all entity nodes in bulk
+    G.add_nodes_from(_entity_attributes(entities))
+    
+    # Parents that never appear as an entity get placeholder attributes
+    parent_ids = pd.Index(df['Parent Entity ID'].dropna().unique())
+    G.add_nodes_from(
+        (parent_id, _placeholder_attributes(parent_id))
+        for parent_id in parent_ids[~parent_ids.isin(entities.index)].tolist()
+    )
+    
+    # Second pass: add edges in bulk
+    edges = df[df['Parent Entity ID'].notna()]
+    G.add_edges_from(
+        (parent_id, entity_id, {'share': share})
+        for parent_id, entity_id, share in zip(
+            edges['Parent Entity ID'].tolist(),
+            edges['Entity ID'].tolist(),
+            edges['Share'].tolist()
+        )
+    )
+    
+    return G
+
+def update_graph(G, df, diff):
+    """
+    The graph build_graph(df) would return, patched from G, the graph of
+    the previous version of the register, using their RegisterDiff.
+
+    Work follows the number of touched entities: the new graph starts as a
+    shallow copy of G's node and adjacency tables and only the tables of
+    touched nodes are copied before they change, so G stays intact. Both
+    graphs share the attribute dicts of untouched nodes and edges and must
+    be treated as read-only. Nodes that are new to the graph come last in
+    node order, so it may differ from a fresh build.
+
+    networkx has no public way to share these tables (G.copy() copies every
+    node and edge, as long as a full build), so this sets DiGraph's private
+    _node, _succ and _pred; requirements.txt pins networkx to the versions
+    it was tested with.
+    """
+    H = nx.DiGraph()
+    H.graph.update(G.graph)
+    H._node = dict(G._node)
+    H._adj = H._succ = dict(G._succ)
+    H._pred = dict(G._pred)
+    owned_succ, owned_pred = set(), set()
+
+    def succ(node):
+        if node not in owned_succ:
+            owned_succ.add(node)
+            H._succ[node] = dict(H._succ.get(node, {}))
+        return H._succ[node]
+
+    def pred(node):
+        if node not in owned_pred:
+            owned_pred.add(node)
+            H._pred[node] = dict(H._pred.get(node, {}))
+        return H._pred[node]
+
+    # An entity's incoming edges all come from its own rows: drop those of
+    # every touched entity, then add back the rows of its new version
+    dropped_parents = set()
+    for entity_id in diff.removed.append(diff.changed).tolist():
+        for parent_id in list(H._pred.get(entity_id, ())):
+            del succ(parent_id)[entity_id]
+            del pred(entity_id)[parent_id]
+            dropped_parents.add(parent_id)
+
+    touched = df[df['Entity ID'].isin(diff.added.append(diff.changed))]
+    entities = touched.drop_duplicates(subset='Entity ID').set_index('Entity ID')
+    for entity_id, attributes in _entity_attributes(entities):
+        H._node[entity_id] = attributes
+        succ(entity_id)
+        pred(entity_id)
+
+    edges = touched[touched['Parent Entity ID'].notna()]
+    for parent_id, entity_id, share in zip(
+        edges['Parent Entity ID'].tolist(),
+        edges['Entity ID'].tolist(),
+        edges['Share'].tolist()
+    ):
+        if parent_id not in H._node:
+            H._node[parent_id] = _placeholder_attributes(parent_id)
+            pred(parent_id)
+        attributes = {'share': share}
+        succ(parent_id)[entity_id] = attributes
+        pred(entity_id)[parent_id] = attributes
+
+    # A removed entity that is still some entity's parent becomes a
+    # placeholder; a placeholder nobody refers to any more disappears
+    entity_ids = pd.Index(df['Entity ID'])
+    for node in diff.removed.tolist():
+        if node in H._node:
+            H._node[node] = _placeholder_attributes(node)
+    candidates = pd.Index(list(dropped_parents.union(diff.removed.tolist())))
+    for node in candidates[~candidates.isin(entity_ids)].tolist():
+        if node in H._node and not H._succ.get(node) and not H._pred.get(node):
+            del H._node[node], H._succ[node], H._pred[node]
+
+    return H
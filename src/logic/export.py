@@ -0,0 +1,278 @@
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from logic.fingerprint import frame_fingerprint
+from logic.graph_model import get_graph
+from utils.cache_dir import cache_path
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Bump when an export format changes so stale files are ignored
+EXPORT_VERSION = 3
+
+# Rows written per chunk, so no format ever holds the whole export in memory
+CHUNK_ROWS = 50_000
+
+# Data rows per Excel sheet (the format's limit, less the header row)
+EXCEL_MAX_ROWS = 1_048_575
+
+# Control characters XML 1.0 does not allow, dropped from exported text;
+# one of them joins values while they are escaped
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_SEPARATOR = '\x1e'
+_XML_ESCAPES = [('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;')]
+
+class ExportFormat:
+    """
+    A download format: file extension, MIME type, whether it exports the
+    ownership graph rather than the rows, and whether it needs pyarrow
+    """
+
+    def __init__(self, extension, mime, graph=False, needs_pyarrow=False):
+        self.extension = extension
+        self.mime = mime
+        self.graph = graph
+        self.needs_pyarrow = needs_pyarrow
+
+EXPORT_FORMATS = {
+    'CSV': ExportFormat('csv', 'text/csv'),
+    'Parquet': ExportFormat('parquet', 'application/vnd.apache.parquet', needs_pyarrow=True),
+    'Arrow IPC': ExportFormat('arrow', 'application/vnd.apache.arrow.file', needs_pyarrow=True),
+    'Excel': ExportFormat('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'GraphML': ExportFormat('graphml', 'application/graphml+xml', graph=True),
+    'GEXF': ExportFormat('gexf', 'application/gexf+xml', graph=True),
+}
+
+def available_formats():
+    """
+    Names of the export formats this installation can write
+    """
+    return [name for name, export_format in EXPORT_FORMATS.items() if HAS_PYARROW or not export_format.needs_pyarrow]
+
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[start:start + CHUNK_ROWS]
+
+def _write_lines(f, table, format_lines):
+    # Format and write one chunk of the table at a time
+    for chunk in _chunks(table):
+        f.write(format_lines(chunk).str.cat())
+
+def _write_csv(df, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        df.iloc[:0].to_csv(f, index=False)
+        for chunk in _chunks(df):
+            chunk.to_csv(f, index=False, header=False)
+
+def _plain_types(df):
+    """
+    Categorical columns as their plain values, so Parquet and Arrow exports
+    hold ordinary columns rather than dictionaries
+    """
+    categorical = [column for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)]
+    return df.astype({column: object for column in categorical}) if categorical else df
+
+def _arrow_schema(df):
+    # Schema of the whole frame, with dictionary columns as their value type
+    schema = pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(field.type.value_type))
+    return schema
+
+def _write_parquet(df, path):
+    schema = _arrow_schema(df)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(_plain_types(chunk), schema=schema, preserve_index=False))
+
+def _write_arrow(df, path):
+    schema = _arrow_schema(df)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(_plain_types(chunk), schema=schema, preserve_index=False))
+
+def _xml_text(values):
+    """
+    Values of a Series as XML-escaped strings (safe in text and attributes).
+    The chunk is escaped as one joined string, so each replacement is a
+    single pass in C rather than one call per value.
+    """
+    values = values.astype(str)
+    if values.empty:
+        return values
+    text = _SEPARATOR.join(values.tolist())
+    if _XML_ILLEGAL.search(text):
+        values = values.str.replace(_XML_ILLEGAL, '', regex=True)
+        text = _SEPARATOR.join(values.tolist())
+    for char, entity in _XML_ESCAPES:
+        if char in text:
+            text = text.replace(char, entity)
+    return pd.Series(text.split(_SEPARATOR), index=values.index, dtype=object)
+
+def _excel_rows(chunk):
+    """
+    Rows of one chunk as tuples of plain values, text cleaned of characters
+    Excel rejects and missing values as empty cells
+    """
+    # float32 shares are widened by their shortest decimal form, so 40.82
+    # is not written as 40.8199996948
+    for column in chunk.columns:
+        if chunk[column].dtype == 'float32':
+            chunk = chunk.assign(**{column: chunk[column].astype(str).astype('float64')})
+    chunk = chunk.astype(object)
+    for column in chunk.columns:
+        text = chunk[column].map(lambda value: isinstance(value, str))
+        if text.any():
+            chunk.loc[text, column] = chunk.loc[text, column].str.replace(_XML_ILLEGAL, '', regex=True)
+    return chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+def _write_excel(df, path):
+    """
+    Write a workbook in openpyxl's write-only mode, which streams rows to
+    disk chunk by chunk; registers longer than a sheet continue on further
+    sheets
+    """
+    n_sheets = max(-(-len(df) // EXCEL_MAX_ROWS), 1)
+    names = ['Entities'] if n_sheets == 1 else [f'Entities {i + 1}' for i in range(n_sheets)]
+
+    workbook = Workbook(write_only=True)
+    for i, name in enumerate(names):
+        sheet = workbook.create_sheet(name)
+        sheet.append(list(df.columns))
+        for chunk in _chunks(df.iloc[i * EXCEL_MAX_ROWS:(i + 1) * EXCEL_MAX_ROWS]):
+            for row in _excel_rows(chunk):
+                sheet.append(row)
+    workbook.save(path)
+
+def _graph_tables(df):
+    """
+    Node and edge tables of the frame's ownership graph:
+    (id, name, city, country, is_person) and (source, target, share)
+    """
+    G = get_graph(df)
+    ids, attributes = zip(*G.nodes(data=True)) if len(G) else ((), ())
+    nodes = pd.DataFrame({
+        'id': pd.Series(ids, dtype=object),
+        'name': [data['name'] for data in attributes],
+        'city': [data['city'] for data in attributes],
+        'country': [data['country'] for data in attributes],
+        'is_person': np.where([data['is_person'] for data in attributes], 'true', 'false'),
+    }, dtype=object)
+    edges = pd.DataFrame(list(G.edges(data='share')), columns=['source', 'target', 'share'], dtype=object)
+    return nodes, edges
+
+def _graphml_nodes(nodes):
+    return ('    <node id="' + _xml_text(nodes['id']) + '"><data key="d0">' + _xml_text(nodes['name'])
+            + '</data><data key="d1">' + _xml_text(nodes['city'])
+            + '</data><data key="d2">' + _xml_text(nodes['country'])
+            + '</data><data key="d3">' + nodes['is_person'] + '</data></node>\n')
+
+def _graphml_edges(edges):
+    return ('    <edge source="' + _xml_text(edges['source']) + '" target="' + _xml_text(edges['target'])
+            + '"><data key="d4">' + edges['share'].astype(str) + '</data></edge>\n')
+
+def _write_graphml(df, path):
+    nodes, edges = _graph_tables(df)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+            'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+            '  <key id="d0" for="node" attr.name="name" attr.type="string" />\n'
+            '  <key id="d1" for="node" attr.name="city" attr.type="string" />\n'
+            '  <key id="d2" for="node" attr.name="country" attr.type="string" />\n'
+            '  <key id="d3" for="node" attr.name="is_person" attr.type="boolean" />\n'
+            '  <key id="d4" for="edge" attr.name="share" attr.type="double" />\n'
+            '  <graph edgedefault="directed">\n'
+        )
+        _write_lines(f, nodes, _graphml_nodes)
+        _write_lines(f, edges, _graphml_edges)
+        f.write('  </graph>\n</graphml>\n')
+
+def _gexf_nodes(nodes):
+    return ('      <node id="' + _xml_text(nodes['id']) + '" label="' + _xml_text(nodes['name']) + '"><attvalues>'
+            + '<attvalue for="0" value="' + _xml_text(nodes['city']) + '" />'
+            + '<attvalue for="1" value="' + _xml_text(nodes['country']) + '" />'
+            + '<attvalue for="2" value="' + nodes['is_person'] + '" /></attvalues></node>\n')
+
+def _gexf_edges(edges):
+    edge_ids = pd.Series(edges.index.astype(str), index=edges.index)
+    return ('      <edge id="' + edge_ids + '" source="' + _xml_text(edges['source'])
+            + '" target="' + _xml_text(edges['target']) + '"><attvalues>'
+            + '<attvalue for="3" value="' + edges['share'].astype(str) + '" /></attvalues></edge>\n')
+
+def _write_gexf(df, path):
+    nodes, edges = _graph_tables(df)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+            '  <graph defaultedgetype="directed" mode="static">\n'
+            '    <attributes class="node" mode="static">\n'
+            '      <attribute id="0" title="city" type="string" />\n'
+            '      <attribute id="1" title="country" type="string" />\n'
+            '      <attribute id="2" title="is_person" type="boolean" />\n'
+            '    </attributes>\n'
+            '    <attributes class="edge" mode="static">\n'
+            '      <attribute id="3" title="share" type="double" />\n'
+            '    </attributes>\n'
+            '    <nodes>\n'
+        )
+        _write_lines(f, nodes, _gexf_nodes)
+        f.write('    </nodes>\n    <edges>\n')
+        _write_lines(f, edges, _gexf_edges)
+        f.write('    </edges>\n  </graph>\n</gexf>\n')
+
+WRITERS = {
+    'CSV': _write_csv,
+    'Parquet': _write_parquet,
+    'Arrow IPC': _write_arrow,
+    'Excel': _write_excel,
+    'GraphML': _write_graphml,
+    'GEXF': _write_gexf,
+}
+
+def _export_file(df, name):
+    return cache_path('exports', f'{frame_fingerprint(df)}.v{EXPORT_VERSION}.{EXPORT_FORMATS[name].extension}')
+
+def export_path(df, name):
+    """
+    Path of the `name` export of a (filtered) frame if it has been written
+    already, otherwise None
+    """
+    path = _export_file(df, name)
+    return path if os.path.exists(path) else None
+
+def write_export(df, name):
+    """
+    Write the `name` export of a (filtered) frame and return its path.
+
+    Exports live in the on-disk cache under the frame's fingerprint, so a
+    filter state is exported once per format for all sessions.
+    """
+    path = _export_file(df, name)
+    if not os.path.exists(path):
+        # Write to a temporary file of its own next to the target and rename,
+        # so a concurrent download never sees a partial file and sessions
+        # exporting the same filter state do not write into one file
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            WRITERS[name](df, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return path
@@ -0,0 +1,164 @@
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from logic.fingerprint import frame_fingerprint, derive_fingerprint, register_fingerprint
+from logic.register_diff import link_versions, previous_version
+
+# Share thresholds and filtered frames kept per dataset (the share slider has
+# 101 positions, but only recently used ones are worth their memory)
+SHARE_CACHE_SIZE = 16
+RESULT_CACHE_SIZE = 8
+
+# id(filtered frame) -> (weak reference, weak reference to the dataset,
+# (selected countries, min share, show persons))
+_filter_states = {}
+
+def _forget(frame_id):
+    _filter_states.pop(frame_id, None)
+
+def filter_state(df):
+    """
+    (dataset, selected countries, min share, show persons) a frame was
+    filtered with by a FilterEngine, or None for any other frame
+    """
+    known = _filter_states.get(id(df))
+    if known is None or known[0]() is not df:
+        return None
+    dataset = known[1]()
+    if dataset is None:
+        return None
+    return (dataset,) + known[2]
+
+class FilterEngine:
+    """
+    Sidebar filters answered from indexes built once per dataset.
+
+    Rows are tracked as packed bitmaps (one bit per row): one per country,
+    built on first use, one per share threshold from a sorted share array,
+    and one for corporate entities. A filter change is a handful of bitmap
+    ANDs; a country selection that differs from the previous one by fewer
+    countries than it contains is patched from the previous bitmap instead
+    of being rebuilt.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.fingerprint = frame_fingerprint(df)
+        self.n_rows = len(df)
+
+        codes, countries = pd.factorize(df['Country Code'].astype(str), sort=True)
+        self.countries = list(countries)
+        self._country_index = {country: i for i, country in enumerate(self.countries)}
+        self._country_codes = codes
+        self._country_bitmaps = {}
+
+        share = df['Share'].to_numpy(dtype='float64', na_value=np.nan)
+        self._share_order = np.argsort(share, kind='stable')
+        self._sorted_share = share[self._share_order]
+        self._share_count = int(np.count_nonzero(~np.isnan(share)))  # NaNs sort last
+        self._share_bitmaps = OrderedDict()
+
+        if 'Is Person' in df.columns:
+            is_person = df['Is Person'].to_numpy(dtype=bool)
+        else:
+            is_person = (df['Natural Person'].astype(str).str.lower() == 'yes').to_numpy()
+        self._entity_bitmap = np.packbits(~is_person)
+
+        self._last_countries = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _country_bitmap(self, country):
+        bitmap = self._country_bitmaps.get(country)
+        if bitmap is None:
+            bitmap = np.packbits(self._country_codes == self._country_index[country])
+            self._country_bitmaps[country] = bitmap
+        return bitmap
+
+    def _countries_mask(self, selected):
+        if self._last_countries is not None:
+            previous, previous_mask = self._last_countries
+            added, removed = selected - previous, previous - selected
+            if len(added) + len(removed) < len(selected):
+                mask = previous_mask.copy()
+                for country in added:
+                    mask |= self._country_bitmap(country)
+                for country in removed:
+                    mask &= ~self._country_bitmap(country)
+                self._last_countries = (selected, mask)
+                return mask
+
+        # Rebuild with a single lookup-table pass over the per-row country codes
+        lookup = np.zeros(len(self.countries), dtype=bool)
+        lookup[[self._country_index[country] for country in selected]] = True
+        mask = np.packbits(lookup[self._country_codes])
+        self._last_countries = (selected, mask)
+        return mask
+
+    def _share_mask(self, min_share):
+        mask = self._share_bitmaps.get(min_share)
+        if mask is None:
+            start = np.searchsorted(self._sorted_share[:self._share_count], min_share, side='left')
+            rows = np.zeros(self.n_rows, dtype=bool)
+            rows[self._share_order[start:self._share_count]] = True
+            mask = np.packbits(rows)
+            self._share_bitmaps[min_share] = mask
+            if len(self._share_bitmaps) > SHARE_CACHE_SIZE:
+                self._share_bitmaps.popitem(last=False)
+        else:
+            self._share_bitmaps.move_to_end(min_share)
+        return mask
+
+    def apply(self, selected_countries, min_share, show_persons):
+        """
+        Rows matching the sidebar filters, in their original order.
+
+        The result is memoized per filter state and carries a fingerprint
+        derived from the dataset and the state, so downstream caches can key
+        on it without rehashing the rows. When the dataset replaces an
+        earlier version, the result is linked to that version's result.
+        """
+        selected = frozenset(country for country in selected_countries if country in self._country_index)
+        key = (selected, min_share, show_persons)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+            mask = self._countries_mask(selected) & self._share_mask(min_share)
+            if not show_persons:
+                mask &= self._entity_bitmap
+            rows = np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+
+            result = self.df.iloc[rows]
+            register_fingerprint(result, derive_fingerprint(
+                self.fingerprint, sorted(selected), min_share, show_persons
+            ))
+            result_id = id(result)
+            _filter_states[result_id] = (
+                weakref.ref(result, lambda _: _forget(result_id)), weakref.ref(self.df), key
+            )
+            self._results[key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+
+        # Same filters on the previous version of the dataset, so whatever is
+        # derived from the result can be patched from the earlier one
+        previous = previous_version(self.df)
+        if previous is not None:
+            link_versions(get_filter_engine(previous).apply(selected_countries, min_share, show_persons), result)
+        return result
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_filter_engine(fingerprint, _df):
+    return FilterEngine(_df)
+
+def get_filter_engine(df):
+    """
+    Filter engine for a dataset, built once and shared by all sessions
+    """
+    return _build_filter_engine(frame_fingerprint(df), df)
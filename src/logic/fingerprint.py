@@ -0,0 +1,41 @@
+import hashlib
+import weakref
+import pandas as pd
+
+# id(frame) -> (weak reference, fingerprint). Cached frames come back as the
+# same object on every rerun, so an identity lookup avoids rehashing them.
+_known = {}
+
+def _forget(frame_id):
+    _known.pop(frame_id, None)
+
+def register_fingerprint(df, fingerprint):
+    """
+    Remember the fingerprint of a frame for as long as the frame lives
+    """
+    frame_id = id(df)
+    _known[frame_id] = (weakref.ref(df, lambda _: _forget(frame_id)), fingerprint)
+    return fingerprint
+
+def derive_fingerprint(parent_fingerprint, *parts):
+    """
+    Fingerprint of a frame derived from another one by a deterministic step
+    (e.g. a filter), without hashing the derived rows
+    """
+    digest = hashlib.sha1(parent_fingerprint.encode('utf-8'))
+    for part in parts:
+        digest.update(b'\x1f' + repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+def frame_fingerprint(df):
+    """
+    Content hash of a frame, stable across reruns and sessions
+    """
+    known = _known.get(id(df))
+    if known is not None and known[0]() is df:
+        return known[1]
+    
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    return register_fingerprint(df, digest.hexdigest())
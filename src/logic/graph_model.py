@@ -0,0 +1,64 @@
+import weakref
+import networkx as nx
+import streamlit as st
+from logic.data_processor import build_graph, update_graph
+from logic.fingerprint import frame_fingerprint, derive_fingerprint
+from logic.layout import graph_fingerprint
+from logic.register_diff import link_versions, version_diff
+
+# A new version of a register is patched from the previous version's graph
+# while it touches at most this fraction of the entities
+MAX_PATCH_FRACTION = 0.2
+
+# Frame fingerprint -> graph, for finding the graph of a previous version
+# without rebuilding it
+_graphs = weakref.WeakValueDictionary()
+
+def _patched_graph(fingerprint, df):
+    known = version_diff(df)
+    if known is None:
+        return None
+    previous, diff = known
+    previous_graph = _graphs.get(frame_fingerprint(previous))
+    if previous_graph is None or diff.fraction > MAX_PATCH_FRACTION:
+        return None
+
+    G = update_graph(previous_graph, df, diff)
+    # The node order may differ from a fresh build, so the graph gets its
+    # own fingerprint for layouts cached on disk
+    G.graph['fingerprint'] = derive_fingerprint(fingerprint, 'patched', previous_graph.graph['fingerprint'])
+    link_versions(previous_graph, G)
+    return G
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _build_cached_graph(fingerprint, _df):
+    # The frame itself is excluded from hashing (leading underscore); the
+    # fingerprint is the cache key, and travels with the graph so derived
+    # caches (layouts) can key on it too
+    G = _patched_graph(fingerprint, _df)
+    if G is None:
+        G = build_graph(_df)
+        G.graph['fingerprint'] = fingerprint
+    _graphs[fingerprint] = G
+    return G
+
+def get_graph(df):
+    """
+    Return the canonical ownership graph for a (filtered) register.
+
+    The graph is built once per frame content and the same object is handed
+    to every view, so callers must treat it as read-only. A frame linked to
+    its previous version (see register_diff) gets that version's graph
+    patched with the difference instead.
+    """
+    return _build_cached_graph(frame_fingerprint(df), df)
+
+def focus_graph(G, node, radius):
+    """
+    The part of G within `radius` links of `node`, in either direction, as
+    a graph of its own with a fingerprint derived from G's
+    """
+    distances = nx.single_source_shortest_path_length(G.to_undirected(as_view=True), node, cutoff=radius)
+    focused = G.subgraph(distances).copy()
+    focused.graph['fingerprint'] = derive_fingerprint(graph_fingerprint(G), 'focus', node, radius)
+    return focused
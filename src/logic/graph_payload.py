@@ -0,0 +1,135 @@
+import base64
+import json
+import numpy as np
+
+# Above this many nodes, columns are sent as base64 typed arrays rather than JSON lists
+BINARY_MIN_NODES = 5000
+
+# Node attributes sent as string tables plus an index per node
+STRING_COLUMNS = ['name', 'city', 'country']
+
+_DTYPES = {
+    np.dtype(np.uint8): 'uint8',
+    np.dtype(np.uint32): 'uint32',
+    np.dtype(np.int32): 'int32',
+    np.dtype(np.float32): 'float32',
+}
+
+def string_table(values):
+    """
+    Distinct strings in order of first appearance and a uint32 index into
+    them per value
+    """
+    table = {}
+    codes = np.fromiter((table.setdefault(value, len(table)) for value in values), dtype=np.uint32, count=len(values))
+    return list(table), codes
+
+def encode_array(array, binary):
+    """
+    A 1-d array as a JSON list, or as {'dtype', 'size', 'data'} with the raw
+    little-endian bytes in base64. An (n, k) array is sent flat either way,
+    with its row size k: {'size', 'values'} in JSON. Missing floats are sent
+    as null in JSON.
+    """
+    array = np.ascontiguousarray(array)
+    if not binary:
+        values = array.ravel().tolist()
+        if array.dtype.kind == 'f':
+            values = [None if value != value else value for value in values]
+        return {'size': array.shape[1], 'values': values} if array.ndim == 2 else values
+    return {
+        'dtype': _DTYPES[array.dtype],
+        'size': array.shape[1] if array.ndim == 2 else 1,
+        'data': base64.b64encode(array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()).decode('ascii'),
+    }
+
+def graph_payload(G, extra=None, binary=None):
+    """
+    Columnar browser payload of G:
+
+        nodes    number of nodes
+        strings  {column: distinct strings} for name, city and country
+        columns  {column: one value per node}: indexes into the string
+                 tables, is_person and is_group flags, and the `extra`
+                 arrays (1-d, or (n, k) such as positions)
+        source,
+        target   edge end points as node indexes
+        share    edge shares in percent (NaN or null where unknown)
+
+    Keys are sent once instead of once per node, and repeated cities and
+    countries once per table. `binary` defaults to base64 typed arrays for
+    graphs above BINARY_MIN_NODES. Decode with DECODER_JS.
+    """
+    if binary is None:
+        binary = len(G) > BINARY_MIN_NODES
+    attributes = [data for _, data in G.nodes(data=True)]
+    index = {node: i for i, node in enumerate(G)}
+    m = G.number_of_edges()
+
+    strings = {}
+    columns = {}
+    for column in STRING_COLUMNS:
+        strings[column], codes = string_table([str(data[column]) for data in attributes])
+        columns[column] = encode_array(codes, binary)
+    for column in ['is_person', 'is_group']:
+        flags = np.fromiter((bool(data.get(column)) for data in attributes), dtype=np.uint8, count=len(attributes))
+        columns[column] = encode_array(flags, binary)
+    for column, values in (extra or {}).items():
+        columns[column] = encode_array(values, binary)
+
+    return {
+        'nodes': len(G),
+        'strings': strings,
+        'columns': columns,
+        'source': encode_array(np.fromiter((index[u] for u, _ in G.edges()), dtype=np.uint32, count=m), binary),
+        'target': encode_array(np.fromiter((index[v] for _, v in G.edges()), dtype=np.uint32, count=m), binary),
+        'share': encode_array(np.fromiter(
+            (np.nan if share is None else share for _, _, share in G.edges(data='share')), dtype=np.float32, count=m
+        ), binary),
+    }
+
+def payload_json(payload):
+    """
+    JSON of a payload that is safe to inline in a <script> element
+    """
+    return json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+
+# Browser side of graph_payload(). decodeGraph(payload) returns
+#   columns  {column: per-node values}, string columns resolved; (n, k)
+#            columns are flat arrays of n * k values in both encodings
+#   source, target, share  edge end point indexes and shares
+#   nodes    one object per node with `index` and every 1-d column
+#   links    one {source, target, share} object per edge (node indexes,
+#            share NaN where unknown)
+DECODER_JS = """
+function decodeArray(column) {
+    if (Array.isArray(column)) return column;
+    if (column.values) return column.values;
+    const raw = atob(column.data);
+    const bytes = new Uint8Array(raw.length);
+    for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+    const types = {uint8: Uint8Array, uint32: Uint32Array, int32: Int32Array, float32: Float32Array};
+    return new types[column.dtype](bytes.buffer);
+}
+
+function decodeGraph(payload) {
+    const columns = {};
+    const flat = [];
+    for (const [name, column] of Object.entries(payload.columns)) {
+        const values = decodeArray(column);
+        const table = payload.strings[name];
+        columns[name] = table ? Array.from(values, code => table[code]) : values;
+        if ((column.size || 1) === 1) flat.push(name);
+    }
+    const source = decodeArray(payload.source);
+    const target = decodeArray(payload.target);
+    const share = decodeArray(payload.share);
+    const nodes = Array.from({length: payload.nodes}, (_, index) => {
+        const node = {index: index};
+        for (const name of flat) node[name] = columns[name][index];
+        return node;
+    });
+    const links = Array.from(source, (s, i) => ({source: s, target: target[i], share: share[i] ?? NaN}));
+    return {columns: columns, source: source, target: target, share: share, nodes: nodes, links: links};
+}
+"""
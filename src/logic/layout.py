@@ -0,0 +1,221 @@
+import hashlib
+import os
+import tempfile
+import networkx as nx
+import numpy as np
+import streamlit as st
+from logic.register_diff import previous_version
+from logic.tree_layout import tidy_tree_layout
+from utils.cache_dir import cache_path
+
+# Bump when force_layout changes so stale layouts on disk are ignored
+LAYOUT_VERSION = 1
+
+ITERATIONS = 50
+
+# A layout warm-started from the previous version of a graph only needs to
+# settle the nodes around the change, so it runs fewer and cooler iterations
+WARM_ITERATIONS = 8
+WARM_TEMPERATURE = 0.02
+
+# Up to this many nodes repulsion is summed over all pairs; above it, it is
+# approximated on a grid so an iteration stays linear in the node count
+EXACT_MAX_NODES = 500
+MAX_GRID_SIZE = 256
+
+def graph_fingerprint(G):
+    """
+    Fingerprint of a graph: the one it was built under (see graph_model), or
+    a hash of its nodes and edges
+    """
+    fingerprint = G.graph.get('fingerprint')
+    if fingerprint:
+        return fingerprint
+    digest = hashlib.sha1()
+    digest.update(repr(list(G.nodes)).encode('utf-8'))
+    digest.update(repr(list(G.edges)).encode('utf-8'))
+    return digest.hexdigest()
+
+def _exact_repulsion(pos, k):
+    dx = pos[:, 0, None] - pos[None, :, 0]
+    dy = pos[:, 1, None] - pos[None, :, 1]
+    strength = k * k / np.maximum(dx * dx + dy * dy, 1e-9)
+    return np.column_stack([(dx * strength).sum(axis=1), (dy * strength).sum(axis=1)])
+
+def _unit_kernel_fft(size):
+    """
+    FFT of the repulsion kernel d / |d|^2 for grid offsets in cell units,
+    laid out for a circular convolution of length 2 * size
+    """
+    steps = np.fft.fftfreq(2 * size, 1 / (2 * size))
+    dx, dy = np.meshgrid(steps, steps, indexing='ij')
+    distance2 = dx ** 2 + dy ** 2
+    distance2[0, 0] = np.inf
+    return np.fft.rfft2(dx / distance2), np.fft.rfft2(dy / distance2)
+
+def _grid_repulsion(pos, k, size, kernel_fft):
+    """
+    Particle-mesh repulsion: node masses are spread onto a size x size grid,
+    convolved with the k^2 / d force kernel by FFT and read back at each node
+    """
+    low = pos.min(axis=0)
+    cell = max(float((pos.max(axis=0) - low).max()), 1e-9) / (size - 1)
+    grid_pos = (pos - low) / cell
+    corner = np.minimum(np.floor(grid_pos).astype(np.int64), size - 2)
+    frac = grid_pos - corner
+
+    # Cloud-in-cell weights of the four grid points around each node
+    offsets = [(0, 0), (1, 0), (0, 1), (1, 1)]
+    cells = [(corner[:, 0] + dx) * size + corner[:, 1] + dy for dx, dy in offsets]
+    weights = [
+        (frac[:, 0] if dx else 1 - frac[:, 0]) * (frac[:, 1] if dy else 1 - frac[:, 1])
+        for dx, dy in offsets
+    ]
+    density = np.zeros(size * size)
+    for cell_index, weight in zip(cells, weights):
+        density += np.bincount(cell_index, weight, minlength=size * size)
+
+    shape = (2 * size, 2 * size)
+    density_fft = np.fft.rfft2(density.reshape(size, size), shape)
+    force = np.zeros_like(pos)
+    for axis in range(2):
+        field = np.fft.irfft2(density_fft * kernel_fft[axis], shape)[:size, :size].ravel() * (k * k / cell)
+        for cell_index, weight in zip(cells, weights):
+            force[:, axis] += field[cell_index] * weight
+    return force
+
+def force_layout(G, iterations=ITERATIONS, seed=0, initial=None, temperature=0.1):
+    """
+    Fruchterman-Reingold layout of G as a float32 (n, 2) array in node order,
+    scaled to [-1, 1].
+
+    Same model and cooling schedule as nx.spring_layout, but vectorized over
+    nodes and edges, seeded so a graph always gets the same picture, and
+    with grid-approximated repulsion on large graphs. `initial` positions in
+    [-1, 1] replace the random start, e.g. to refine an earlier layout.
+    """
+    n = len(G)
+    if n == 0:
+        return np.empty((0, 2), dtype=np.float32)
+    if n == 1:
+        return np.zeros((1, 2), dtype=np.float32)
+
+    index = {node: i for i, node in enumerate(G)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+
+    if initial is None:
+        pos = np.random.default_rng(seed).random((n, 2))
+    else:
+        pos = (np.asarray(initial, dtype=np.float64) + 1) / 2
+    k = 1 / np.sqrt(n)
+    if n > EXACT_MAX_NODES:
+        grid_size = int(min(MAX_GRID_SIZE, 2 ** np.ceil(np.log2(np.sqrt(n)))))
+        kernel_fft = _unit_kernel_fft(grid_size)
+
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        if n <= EXACT_MAX_NODES:
+            displacement = _exact_repulsion(pos, k)
+        else:
+            displacement = _grid_repulsion(pos, k, grid_size, kernel_fft)
+
+        # Attraction d^2 / k along every edge, applied to both ends
+        delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(edges[:, 0], pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(edges[:, 1], pull[:, axis], minlength=n)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 0.01)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos /= extent
+    return pos.astype(np.float32)
+
+def _save(path, positions):
+    # Write to a temporary file of its own next to the target and rename, so
+    # concurrent readers never see a partial file and sessions computing the
+    # same layout do not write into one file
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp.npy', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, positions)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# Layout algorithms by name; each maps a graph to float32 (n, 2) positions in node order
+LAYOUTS = {
+    'force': force_layout,
+    'tree': tidy_tree_layout,
+}
+
+def _layout_path(fingerprint, kind):
+    return cache_path('layouts', f'{fingerprint}.{kind}.v{LAYOUT_VERSION}.npy')
+
+def _warm_start(G, kind):
+    """
+    Initial force positions for G taken from the layout of the graph it was
+    patched from, when that layout has been computed; nodes new to G start
+    at the mean position of their placed neighbours
+    """
+    previous = previous_version(G)
+    if kind != 'force' or previous is None or not os.path.exists(_layout_path(graph_fingerprint(previous), kind)):
+        return None
+
+    previous_pos = dict(zip(previous, get_layout(previous, kind)))
+    pos = np.array([previous_pos.get(node, (np.nan, np.nan)) for node in G], dtype=np.float64)
+    index = {node: i for i, node in enumerate(G)}
+    missing = [node for node in G if node not in previous_pos]
+    # Two passes place chains of new nodes hanging off placed ones
+    for _ in range(2):
+        for node in missing:
+            neighbours = [index[other] for other in nx.all_neighbors(G, node)]
+            placed = pos[neighbours][~np.isnan(pos[neighbours, 0])] if neighbours else pos[:0]
+            if len(placed):
+                pos[index[node]] = placed.mean(axis=0)
+    unplaced = np.isnan(pos[:, 0])
+    pos[unplaced] = np.random.default_rng(0).uniform(-1, 1, (int(unplaced.sum()), 2))
+    return pos
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _cached_layout(fingerprint, kind, n_nodes, _G):
+    path = _layout_path(fingerprint, kind)
+    if os.path.exists(path):
+        positions = np.load(path)
+        if positions.shape == (n_nodes, 2):
+            positions.setflags(write=False)
+            return positions
+
+    initial = _warm_start(_G, kind)
+    if initial is not None:
+        positions = force_layout(_G, WARM_ITERATIONS, initial=initial, temperature=WARM_TEMPERATURE)
+    else:
+        positions = LAYOUTS[kind](_G)
+    _save(path, positions)
+    positions.setflags(write=False)
+    return positions
+
+def get_layout(G, kind='force'):
+    """
+    Positions of G as a read-only float32 (n, 2) array in node order:
+    'force' for a force-directed drawing scaled to [-1, 1], 'tree' for the
+    tidy hierarchy (x in sibling units, y = depth, see tree_layout).
+
+    Computed once per graph fingerprint and kept in memory and on disk, so
+    reruns, other sessions and restarts reuse the same picture. The force
+    layout of a graph patched from an earlier version starts from that
+    version's layout.
+    """
+    return _cached_layout(graph_fingerprint(G), kind, len(G), G)
+
+def layout_positions(G, kind='force'):
+    """
+    get_layout() as a {node: (x, y)} dict, for networkx and Bokeh drawing
+    """
+    return dict(zip(G, get_layout(G, kind)))
@@ -0,0 +1,306 @@
+import heapq
+from collections import Counter
+import networkx as nx
+import numpy as np
+import streamlit as st
+from community import community_louvain
+from logic.fingerprint import derive_fingerprint
+from logic.layout import graph_fingerprint
+from logic.tree_layout import spanning_forest
+
+# Entities a network view draws before it switches to super-nodes
+DEFAULT_NODE_BUDGET = 2000
+
+GROUPINGS = ['Subtree', 'Country', 'Community']
+
+class ClusterTree:
+    """
+    Nested groups of a graph's nodes, built once per graph and grouping.
+
+    Nodes are permuted so every group is a contiguous range of `order`
+    (start[c]:end[c]); a group's content is its sub-groups plus its direct
+    `members`. Node ids are positions in G's node order throughout.
+    """
+
+    def __init__(self, G, order, start, end, parent, labels, direct):
+        self.nodes = list(G)
+        self.n = len(self.nodes)
+        self.order = order
+        self.start = start
+        self.end = end
+        self.labels = labels
+        self.sizes = end - start
+
+        self.child_clusters = [[] for _ in labels]
+        for cluster, parent_cluster in enumerate(parent):
+            if parent_cluster >= 0:
+                self.child_clusters[parent_cluster].append(cluster)
+        self.top_clusters = [cluster for cluster, parent_cluster in enumerate(parent) if parent_cluster < 0]
+
+        # Direct members per group, from the deepest group of each position
+        by_group = np.argsort(direct, kind='stable')
+        bounds = np.searchsorted(direct[by_group], np.arange(-1, len(labels) + 1))
+        self.top_nodes = order[by_group[bounds[0]:bounds[1]]]
+        self.members = [order[by_group[bounds[c + 1]:bounds[c + 2]]] for c in range(len(labels))]
+
+        index = {node: i for i, node in enumerate(self.nodes)}
+        self.edge_source = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+        self.edge_target = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+        self.edge_share = np.array([share for _, _, share in G.edges(data='share')], dtype=np.float64)
+        self.countries = [data['country'] for _, data in G.nodes(data=True)]
+
+def _clusters_from_keys(G, keys, label_of):
+    """
+    ClusterTree from per-node group keys, one column per nesting level
+    (coarsest first). Groups of one node and groups identical to their
+    parent group are dropped.
+    """
+    n, levels = keys.shape
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+
+    start, end, parent, labels = [], [], [], []
+    direct = np.full(n, -1, dtype=np.int64)
+    for level in range(levels):
+        changes = np.any(sorted_keys[1:, :level + 1] != sorted_keys[:-1, :level + 1], axis=1)
+        bounds = np.concatenate([[0], np.flatnonzero(changes) + 1, [n]])
+        for run_start, run_end in zip(bounds[:-1], bounds[1:]):
+            if run_end - run_start < 2:
+                continue
+            enclosing = direct[run_start]
+            if enclosing >= 0 and (start[enclosing], end[enclosing]) == (run_start, run_end):
+                continue
+            parent.append(enclosing)
+            start.append(run_start)
+            end.append(run_end)
+            labels.append(label_of(level, sorted_keys[run_start]))
+            direct[run_start:run_end] = len(labels) - 1
+
+    return ClusterTree(G, order, np.array(start, dtype=np.int64), np.array(end, dtype=np.int64),
+                       parent, labels, direct)
+
+def _subtree_clusters(G):
+    """
+    One group per owner with subsidiaries: the owner and everything below
+    it in the spanning forest of the hierarchy
+    """
+    roots, children, _ = spanning_forest(G)
+    n = len(children)
+    order = np.empty(n, dtype=np.int64)
+    subtree_end = np.empty(n, dtype=np.int64)
+    position = 0
+    stack = [(root, False) for root in reversed(roots)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            subtree_end[node] = position
+            continue
+        order[position] = node
+        position += 1
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(children[node]))
+    pre = np.empty(n, dtype=np.int64)
+    pre[order] = np.arange(n)
+
+    names = [data['name'] for _, data in G.nodes(data=True)]
+    cluster_of = {}
+    start, end, parent, labels = [], [], [], []
+    direct = np.full(n, -1, dtype=np.int64)
+    for position in range(n):
+        node = order[position]
+        owner_cluster = direct[position]
+        if children[node]:
+            cluster_of[node] = len(labels)
+            parent.append(owner_cluster)
+            start.append(position)
+            end.append(subtree_end[node])
+            labels.append(f'{names[node]} and subsidiaries')
+            direct[position] = cluster_of[node]
+        for child in children[node]:
+            direct[pre[child]] = cluster_of[node]
+
+    return ClusterTree(G, order, np.array(start, dtype=np.int64), np.array(end, dtype=np.int64),
+                       parent, labels, direct)
+
+def _country_clusters(G):
+    countries, cities = [], []
+    for _, data in G.nodes(data=True):
+        countries.append(str(data['country']))
+        cities.append(str(data['city']))
+    country_codes, country_names = _codes(countries)
+    city_codes, city_names = _codes(cities)
+    keys = np.column_stack([country_codes, city_codes])
+    return _clusters_from_keys(G, keys, lambda level, key: (
+        country_names[key[0]] if level == 0 else f'{city_names[key[1]]}, {country_names[key[0]]}'
+    ))
+
+def _community_clusters(G):
+    dendrogram = community_louvain.generate_dendrogram(G.to_undirected(), random_state=0)
+    nodes = list(G)
+    # Community of every node at each level of the dendrogram, coarsest first
+    columns = []
+    for level in range(len(dendrogram)):
+        partition = community_louvain.partition_at_level(dendrogram, level)
+        columns.append([partition[node] for node in nodes])
+    keys = np.array(columns[::-1], dtype=np.int64).T.reshape(len(nodes), -1)
+    return _clusters_from_keys(G, keys, lambda level, key: f'Community {"-".join(map(str, key[:level + 1]))}')
+
+def _codes(values):
+    names = sorted(set(values))
+    lookup = {value: i for i, value in enumerate(names)}
+    return np.array([lookup[value] for value in values], dtype=np.int64), names
+
+_BUILDERS = {
+    'Subtree': _subtree_clusters,
+    'Country': _country_clusters,
+    'Community': _community_clusters,
+}
+
+@st.cache_resource(max_entries=16, show_spinner="Grouping entities...")
+def _cached_cluster_tree(fingerprint, grouping, _G):
+    return _BUILDERS[grouping](_G)
+
+def get_cluster_tree(G, grouping):
+    """
+    Groups of G for a level-of-detail view, computed once per graph and grouping
+    """
+    return _cached_cluster_tree(graph_fingerprint(G), grouping, G)
+
+class DetailView:
+    """
+    Which groups of a ClusterTree are currently drawn as super-nodes.
+
+    Every node maps to the visible item that contains it (itself, or a
+    collapsed group); expanding or collapsing a group only rewrites the
+    entries of that group's range, so refinement never rebuilds the view.
+    """
+
+    def __init__(self, tree, budget=DEFAULT_NODE_BUDGET):
+        self.tree = tree
+        self.owner = np.empty(tree.n, dtype=np.int64)
+        self.visible = set()
+        self.visible_nodes = len(tree.top_nodes)
+        self.owner[tree.top_nodes] = tree.top_nodes
+        for cluster in tree.top_clusters:
+            self._show(cluster)
+        self.refine(budget)
+
+    @property
+    def item_count(self):
+        return len(self.visible) + self.visible_nodes
+
+    def _show(self, cluster):
+        tree = self.tree
+        self.owner[tree.order[tree.start[cluster]:tree.end[cluster]]] = tree.n + cluster
+        self.visible.add(cluster)
+
+    def expand(self, cluster):
+        """
+        Replace a visible group by its sub-groups and direct members
+        """
+        if cluster not in self.visible:
+            return
+        self.visible.discard(cluster)
+        for child in self.tree.child_clusters[cluster]:
+            self._show(child)
+        members = self.tree.members[cluster]
+        self.owner[members] = members
+        self.visible_nodes += len(members)
+
+    def collapse(self, cluster):
+        """
+        Draw a group as one super-node again, whatever was expanded inside it
+        """
+        tree = self.tree
+        inside = self.owner[tree.order[tree.start[cluster]:tree.end[cluster]]]
+        items = np.unique(inside)
+        self.visible.difference_update((items[items >= tree.n] - tree.n).tolist())
+        self.visible_nodes -= int(np.count_nonzero(items < tree.n))
+        self._show(cluster)
+
+    def refine(self, budget):
+        """
+        Expand the largest groups first for as long as the view stays within budget
+        """
+        sizes = self.tree.sizes
+        heap = [(-sizes[cluster], cluster) for cluster in self.visible]
+        heapq.heapify(heap)
+        while heap:
+            _, cluster = heapq.heappop(heap)
+            cost = len(self.tree.child_clusters[cluster]) + len(self.tree.members[cluster]) - 1
+            if self.item_count + cost > budget:
+                continue
+            self.expand(cluster)
+            for child in self.tree.child_clusters[cluster]:
+                heapq.heappush(heap, (-sizes[child], child))
+
+    def visible_groups(self):
+        """
+        Visible super-nodes, largest first, as (cluster, label, size)
+        """
+        sizes = self.tree.sizes
+        return [
+            (cluster, self.tree.labels[cluster], int(sizes[cluster]))
+            for cluster in sorted(self.visible, key=lambda cluster: (-sizes[cluster], cluster))
+        ]
+
+    def graph(self, G):
+        """
+        The graph to draw: visible entities with their attributes, one node
+        per collapsed group, and ownership edges merged between them. The
+        share of a merged edge is the combined stake of its source side in
+        each entity it holds on the target side, averaged over those
+        entities; for a single edge that is the edge's own share. Edges
+        whose shares are all unknown get none.
+        """
+        tree = self.tree
+        H = nx.DiGraph()
+        H.graph['fingerprint'] = derive_fingerprint(graph_fingerprint(G), 'level-of-detail', sorted(self.visible))
+
+        for i in np.flatnonzero(self.owner == np.arange(tree.n)).tolist():
+            node = tree.nodes[i]
+            H.add_node(node, **G.nodes[node], is_group=False, size=1)
+
+        group_ids = {}
+        for cluster in sorted(self.visible):
+            members = tree.order[tree.start[cluster]:tree.end[cluster]]
+            country = Counter(tree.countries[i] for i in members.tolist()).most_common(1)[0][0]
+            group_ids[cluster] = f'group:{cluster}'
+            H.add_node(
+                group_ids[cluster],
+                name=f'{tree.labels[cluster]} ({len(members):,})',
+                city='N/A',
+                country=country,
+                is_person=False,
+                is_group=True,
+                size=len(members)
+            )
+
+        source = self.owner[tree.edge_source]
+        target = self.owner[tree.edge_target]
+        between = source != target
+        pairs, merged, counts = np.unique(
+            np.column_stack([source[between], target[between]]), axis=0, return_inverse=True, return_counts=True
+        )
+        merged = merged.ravel()
+
+        # Sum the known shares per merged edge and divide by the number of
+        # distinct target entities they are held in
+        edge_share = tree.edge_share[between]
+        known = ~np.isnan(edge_share)
+        share_sum = np.bincount(merged[known], weights=edge_share[known], minlength=len(pairs))
+        held = np.unique(np.column_stack([merged[known], tree.edge_target[between][known]]), axis=0)
+        n_held = np.bincount(held[:, 0], minlength=len(pairs))
+        shares = np.divide(share_sum, n_held, out=np.full(len(pairs), np.nan), where=n_held > 0)
+
+        def item_id(item):
+            return tree.nodes[item] if item < tree.n else group_ids[item - tree.n]
+
+        def edge_data(share, count):
+            return {'count': count} if np.isnan(share) else {'share': share, 'count': count}
+
+        H.add_edges_from(
+            (item_id(u), item_id(v), edge_data(share, count))
+            for (u, v), share, count in zip(pairs.tolist(), shares.tolist(), counts.tolist())
+        )
+        return H
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+from scipy.sparse.csgraph import connected_components
+from logic.layout import graph_fingerprint
+
+# Ownership paths are followed while their product stays at or above this
+# fraction (0.01 %), and never further than MAX_DEPTH links
+DEFAULT_THRESHOLD = 1e-4
+MAX_DEPTH = 64
+
+def ownership_matrix(G):
+    """
+    Direct ownership as a sparse (n, n) matrix over G's node order:
+    A[i, j] is the fraction of entity j held directly by owner i. Edges
+    without a share count as 0.
+    """
+    n = len(G)
+    index = {node: i for i, node in enumerate(G)}
+    m = G.number_of_edges()
+    owners = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=m)
+    entities = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=m)
+    shares = np.array([share for _, _, share in G.edges(data='share')], dtype=np.float64) / 100
+    shares = np.nan_to_num(shares, nan=0.0)
+    return sp.csr_matrix((shares, (owners, entities)), shape=(n, n))
+
+def _cycles(A):
+    """
+    Strongly connected groups of more than one node, and nodes owning
+    themselves, as arrays of node positions
+    """
+    _, labels = connected_components(A, directed=True, connection='strong')
+    sizes = np.bincount(labels)
+    in_cycle = (sizes[labels] > 1) | (A.diagonal() > 0)
+    return [
+        np.flatnonzero(in_cycle & (labels == label))
+        for label in np.unique(labels[in_cycle])
+    ]
+
+class EffectiveOwnership:
+    """
+    Effective (indirect) ownership between every pair of nodes of a graph.
+
+    `matrix` is a sparse (n, n) matrix over `nodes`: matrix[i, j] is the
+    fraction of j held by i summed over every ownership path, each path
+    contributing the product of its shares. `cycles` lists the cross-holding
+    groups (as lists of node ids). `converged` is False when paths above the
+    threshold were still being extended at MAX_DEPTH, which only happens when
+    a cycle holds 100 % or more of itself.
+    """
+
+    def __init__(self, nodes, matrix, cycles, converged):
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.matrix = matrix
+        self.cycles = [[nodes[i] for i in cycle.tolist()] for cycle in cycles]
+        self.converged = converged
+        self._by_entity = None
+
+    @property
+    def by_entity(self):
+        """
+        The matrix in CSC form, for per-entity (column) lookups
+        """
+        if self._by_entity is None:
+            self._by_entity = self.matrix.tocsc()
+        return self._by_entity
+
+    def share(self, owner, entity):
+        """
+        Effective share in percent of `owner` in `entity`
+        """
+        return float(self.matrix[self.index[owner], self.index[entity]]) * 100
+
+    def owners_of(self, entity):
+        """
+        (owner ids, effective shares in percent) of everyone holding part of `entity`
+        """
+        column = self.by_entity[:, self.index[entity]]
+        return [self.nodes[i] for i in column.indices.tolist()], column.data * 100
+
+    def holdings_of(self, owner):
+        """
+        (entity ids, effective shares in percent) of everything `owner` holds part of
+        """
+        row = self.matrix[self.index[owner]]
+        return [self.nodes[i] for i in row.indices.tolist()], row.data * 100
+
+    def to_frame(self, min_share=0.0):
+        """
+        Every (owner, entity) pair at or above `min_share` percent, largest first
+        """
+        pairs = self.matrix.tocoo()
+        keep = pairs.data * 100 >= min_share
+        frame = pd.DataFrame({
+            'Owner ID': [self.nodes[i] for i in pairs.row[keep].tolist()],
+            'Entity ID': [self.nodes[j] for j in pairs.col[keep].tolist()],
+            'Effective Share': (pairs.data[keep] * 100).astype(np.float32),
+        })
+        return frame.sort_values('Effective Share', ascending=False, ignore_index=True)
+
+def effective_ownership(G, threshold=DEFAULT_THRESHOLD, max_depth=MAX_DEPTH):
+    """
+    Effective ownership of G from the truncated series A + A^2 + A^3 + ...
+    (which equals A (I - A)^-1 where that converges).
+
+    Each step extends the surviving paths by one link with a sparse product
+    and drops path sums below `threshold`, so the work follows the number of
+    significant (owner, entity) pairs rather than n^2. On an acyclic register
+    the series ends after as many steps as the hierarchy is deep; cross-
+    holdings add a geometrically shrinking term per trip around the cycle.
+    """
+    nodes = list(G)
+    A = ownership_matrix(G)
+    total = sp.csr_matrix(A.shape)
+    paths = A.copy()
+    for _ in range(max_depth):
+        paths.data[paths.data < threshold] = 0
+        paths.eliminate_zeros()
+        if paths.nnz == 0:
+            break
+        total = total + paths
+        paths = paths @ A
+    else:
+        paths.data[paths.data < threshold] = 0
+        paths.eliminate_zeros()
+
+    total.sum_duplicates()
+    return EffectiveOwnership(nodes, total.tocsr(), _cycles(A), paths.nnz == 0)
+
+@st.cache_resource(max_entries=8, show_spinner="Computing effective ownership...")
+def _cached_effective_ownership(fingerprint, threshold, _G):
+    return effective_ownership(_G, threshold)
+
+def get_effective_ownership(G, threshold=DEFAULT_THRESHOLD):
+    """
+    effective_ownership() computed once per graph; treat the result as read-only
+    """
+    return _cached_effective_ownership(graph_fingerprint(G), threshold, G)
@@ -0,0 +1,150 @@
+import weakref
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Odd 64-bit multiplier mixing NA flags and a row's position within its entity
+# into row hashes, so reordering an entity's rows (the first one supplies its
+# attributes) counts as a change
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# id(object) -> (weak reference, weak reference to the version it replaces,
+# diff against that version or None until first asked for)
+_versions = {}
+
+# id(frame) -> (weak reference, per-entity content hashes)
+_entity_hash_cache = {}
+
+def _forget(registry, object_id):
+    registry.pop(object_id, None)
+
+class RegisterDiff:
+    """
+    Entity IDs added, removed and changed between two versions of a
+    register. An entity counts as changed when any of its rows differs,
+    including the order of its rows.
+    """
+
+    def __init__(self, added, removed, changed, n_entities):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.n_entities = n_entities
+
+    @property
+    def touched(self):
+        """
+        Every entity whose rows were added, removed or changed
+        """
+        return self.added.append(self.removed).append(self.changed)
+
+    @property
+    def fraction(self):
+        """
+        Touched entities as a fraction of the new version's entities
+        """
+        return len(self.touched) / max(self.n_entities, 1)
+
+    def __repr__(self):
+        return (f'RegisterDiff(added={len(self.added)}, removed={len(self.removed)}, '
+                f'changed={len(self.changed)})')
+
+def _row_hashes(df):
+    """
+    One uint64 per row over all columns. Nullable integer columns are hashed
+    from their values and NA mask, which pandas would otherwise box into objects.
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values.dtype) and pd.api.types.is_extension_array_dtype(values.dtype):
+            column_hashes = pd.util.hash_array(values.to_numpy('int64', na_value=0))
+            column_hashes ^= values.isna().to_numpy().astype(np.uint64) * _MIX
+        else:
+            column_hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        hashes = hashes * np.uint64(1000003) ^ column_hashes
+    return hashes
+
+def _entity_hashes(df):
+    known = _entity_hash_cache.get(id(df))
+    if known is not None and known[0]() is df:
+        return known[1]
+
+    ids = df['Entity ID']
+    rows = _row_hashes(df)
+    rank = ids.groupby(ids, sort=False, dropna=False).cumcount().to_numpy().astype(np.uint64)
+    hashes = pd.Series(rows ^ (rank * _MIX), index=pd.Index(ids))
+    hashes = hashes.groupby(level=0, sort=False, dropna=False).sum()
+
+    frame_id = id(df)
+    _entity_hash_cache[frame_id] = (weakref.ref(df, lambda _: _forget(_entity_hash_cache, frame_id)), hashes)
+    return hashes
+
+def diff_registers(old, new):
+    """
+    RegisterDiff from `old` to `new`, keyed by Entity ID, or None when the
+    two have different columns or ID types and cannot be compared
+    """
+    if list(old.columns) != list(new.columns) or old['Entity ID'].dtype != new['Entity ID'].dtype:
+        return None
+
+    old_hashes, new_hashes = _entity_hashes(old), _entity_hashes(new)
+    common = old_hashes.index.intersection(new_hashes.index)
+    differs = old_hashes.reindex(common).to_numpy() != new_hashes.reindex(common).to_numpy()
+    return RegisterDiff(
+        added=new_hashes.index.difference(old_hashes.index),
+        removed=old_hashes.index.difference(new_hashes.index),
+        changed=common[differs],
+        n_entities=len(new_hashes),
+    )
+
+def link_versions(previous, current):
+    """
+    Record that `current` (a register frame or a graph built from one)
+    replaces `previous`, for as long as both are alive
+    """
+    if previous is current:
+        return
+    current_id = id(current)
+    _versions[current_id] = (
+        weakref.ref(current, lambda _: _forget(_versions, current_id)),
+        weakref.ref(previous),
+        None,
+    )
+
+def previous_version(current):
+    """
+    The object `current` replaces (see link_versions), if still alive
+    """
+    known = _versions.get(id(current))
+    if known is None or known[0]() is not current:
+        return None
+    return known[1]()
+
+def version_diff(df):
+    """
+    (previous frame, RegisterDiff) for a frame linked to an earlier version
+    of itself, or None. The diff is computed once per pair.
+    """
+    previous = previous_version(df)
+    if previous is None:
+        return None
+
+    ref, previous_ref, diff = _versions[id(df)]
+    if diff is None:
+        diff = diff_registers(previous, df)
+        if diff is None:
+            return None
+        _versions[id(df)] = (ref, previous_ref, diff)
+    return previous, diff
+
+def track_upload(df):
+    """
+    Link a freshly loaded register to the one this session showed before,
+    so derived data (graph, layouts, geocodes) is patched rather than rebuilt
+    """
+    previous = st.session_state.get('register_version')
+    if previous is not None:
+        link_versions(previous, df)
+    st.session_state['register_version'] = df
+    return df
@@ -0,0 +1,205 @@
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from logic.filter_engine import filter_state
+from logic.fingerprint import frame_fingerprint
+
+# Columns whose words are searchable
+SEARCH_COLUMNS = ['Name', 'City', 'Country Code', 'Entity ID']
+
+# Query results kept per dataset, so retyping or paging is free
+QUERY_CACHE_SIZE = 16
+
+# Fuzzy matching applies to query words of at least this many characters;
+# longer words tolerate more typos
+MIN_FUZZY_LENGTH = 3
+LONG_WORD_LENGTH = 7
+
+_WORD = re.compile(r'\w+')
+
+# Sorts after every word that starts with a given prefix
+_PREFIX_END = '\U0010ffff'
+
+def tokenize(text):
+    """
+    Lowercase words of a search query
+    """
+    return _WORD.findall(str(text).lower())
+
+def _edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 once it exceeds limit
+    """
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def _column_words(values):
+    """
+    (row position, word) arrays for a column. Words are taken from each
+    distinct value once and then spread to the rows holding it.
+    """
+    if pd.api.types.is_integer_dtype(values.dtype):
+        # An integer (an ID) is a single word: its digits
+        codes, uniques = pd.factorize(values)
+        words = pd.Series(np.abs(np.asarray(uniques, dtype=np.int64)).astype(str), dtype=object)
+    else:
+        present = values.notna().to_numpy()
+        codes, uniques = pd.factorize(values.astype(object).where(present).astype(str).where(present))
+        words = pd.Series(uniques, dtype=object).str.lower().str.findall(_WORD).explode().dropna()
+    value_codes = words.index.to_numpy()
+
+    # Rows of every distinct value as contiguous runs of `order`
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    counts = bounds[value_codes + 1] - bounds[value_codes]
+    total = int(counts.sum())
+    run_offsets = np.repeat(bounds[value_codes] - (np.cumsum(counts) - counts), counts)
+    rows = order[run_offsets + np.arange(total)]
+    return rows, np.repeat(words.to_numpy(), counts)
+
+class SearchIndex:
+    """
+    Inverted index from the words of a register's searchable columns to the
+    rows containing them.
+
+    The vocabulary is sorted, so all words starting with a prefix form one
+    range of it and their posting lists one contiguous slice of `rows`: a
+    prefix query is two binary searches and a slice. Fuzzy queries also
+    accept vocabulary words within one or two edits of a query word; their
+    candidates come from a trigram index over the vocabulary (not the rows),
+    built on the first fuzzy query. Every word of a query has to match, in
+    any of the columns.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        found = [_column_words(df[column]) for column in SEARCH_COLUMNS if column in df.columns]
+        rows = np.concatenate([rows for rows, _ in found]) if found else np.zeros(0, dtype=np.int64)
+        words = np.concatenate([words for _, words in found]) if found else np.zeros(0, dtype=object)
+
+        # Posting lists: one sorted run of row positions per vocabulary word
+        word_codes, vocabulary = pd.factorize(words, sort=True)
+        keys = np.unique(word_codes.astype(np.int64) * max(self.n_rows, 1) + rows)
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.rows = keys % max(self.n_rows, 1)
+        self.offsets = np.searchsorted(keys // max(self.n_rows, 1), np.arange(len(self.vocabulary) + 1))
+
+        self._trigrams = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _word_range(self, prefix):
+        lo = np.searchsorted(self.vocabulary, prefix, side='left')
+        hi = np.searchsorted(self.vocabulary, prefix + _PREFIX_END, side='left')
+        return lo, hi
+
+    def _trigram_index(self):
+        # (trigram -> code, owners grouped by trigram, offsets, word lengths)
+        if self._trigrams is None:
+            grams, owners = [], []
+            for word_code, word in enumerate(self.vocabulary.tolist()):
+                padded = f' {word} '
+                for gram in {padded[k:k + 3] for k in range(len(padded) - 2)}:
+                    grams.append(gram)
+                    owners.append(word_code)
+            gram_codes, gram_labels = pd.factorize(pd.Series(grams, dtype=object))
+            order = np.argsort(gram_codes, kind='stable')
+            self._trigrams = (
+                {gram: code for code, gram in enumerate(gram_labels)},
+                np.asarray(owners, dtype=np.int64)[order],
+                np.searchsorted(gram_codes[order], np.arange(len(gram_labels) + 1)),
+                np.fromiter((len(word) for word in self.vocabulary), dtype=np.int64, count=len(self.vocabulary)),
+            )
+        return self._trigrams
+
+    def _similar_words(self, word):
+        """
+        Vocabulary codes of the words within one (two for long words) edits
+        of `word`. An edit changes at most three of a word's trigrams, which
+        bounds the trigrams a match must share.
+        """
+        max_edits = 2 if len(word) >= LONG_WORD_LENGTH else 1
+        gram_index, owners, offsets, lengths = self._trigram_index()
+        padded = f' {word} '
+        codes = [gram_index[gram] for gram in {padded[k:k + 3] for k in range(len(padded) - 2)} if gram in gram_index]
+        if not codes:
+            return np.zeros(0, dtype=np.int64)
+
+        shared = np.bincount(
+            np.concatenate([owners[offsets[code]:offsets[code + 1]] for code in codes]),
+            minlength=len(self.vocabulary)
+        )
+        candidates = np.flatnonzero(
+            (shared >= max(len(word) - 3 * max_edits, 1)) & (np.abs(lengths - len(word)) <= max_edits)
+        )
+        return np.array([
+            code for code in candidates.tolist()
+            if _edit_distance(word, self.vocabulary[code], max_edits) <= max_edits
+        ], dtype=np.int64)
+
+    def _word_rows(self, word, fuzzy):
+        lo, hi = self._word_range(word)
+        runs = [self.rows[self.offsets[lo]:self.offsets[hi]]]
+        if fuzzy and len(word) >= MIN_FUZZY_LENGTH:
+            runs.extend(self.rows[self.offsets[code]:self.offsets[code + 1]] for code in self._similar_words(word))
+        return np.unique(np.concatenate(runs))
+
+    def search(self, query, fuzzy=False):
+        """
+        Positions of the rows matching every word of `query` (sorted), where
+        a query word matches the words it is a prefix of and, when fuzzy, the
+        words it is a typo or two away from. An empty query matches nothing.
+        """
+        words = tuple(dict.fromkeys(tokenize(query)))
+        key = (words, fuzzy)
+        with self._lock:
+            rows = self._results.get(key)
+            if rows is not None:
+                self._results.move_to_end(key)
+                return rows
+
+            rows = np.zeros(0, dtype=np.int64)
+            for i, word in enumerate(words):
+                matches = self._word_rows(word, fuzzy)
+                rows = matches if i == 0 else np.intersect1d(rows, matches, assume_unique=True)
+                if not len(rows):
+                    break
+
+            self._results[key] = rows
+            if len(self._results) > QUERY_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return rows
+
+@st.cache_resource(max_entries=8, show_spinner="Indexing entities for search...")
+def _build_search_index(fingerprint, _df):
+    return SearchIndex(_df)
+
+def get_search_index(df):
+    """
+    Search index of a dataset, built once and shared by all sessions
+    """
+    return _build_search_index(frame_fingerprint(df), df)
+
+def search_rows(df, query, fuzzy=False):
+    """
+    SearchIndex.search() for a (filtered) frame: positions in `df` of its
+    matching rows. A frame from the filter engine is searched through its
+    dataset's index, any other frame through an index of its own.
+    """
+    state = filter_state(df)
+    if state is None:
+        return get_search_index(df).search(query, fuzzy)
+    dataset = state[0]
+    rows = get_search_index(dataset).search(query, fuzzy)
+    positions = df.index.get_indexer(dataset.index[rows])
+    return positions[positions >= 0]
@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from logic.fingerprint import frame_fingerprint
+
+# Row selections (filters + sort) kept per frame, so paging through one
+# selection only slices it
+QUERY_CACHE_SIZE = 8
+
+# Columns the paginated table filters on by exact value
+FILTER_COLUMNS = ['Country Code', 'City', 'Natural Person']
+
+def format_share(shares):
+    """
+    Shares as '12.50%' strings ('N/A' where missing), formatted in one
+    vectorized pass
+    """
+    values = pd.to_numeric(shares, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    formatted = np.char.mod('%.2f%%', np.nan_to_num(values)).astype(object)
+    formatted[np.isnan(values)] = 'N/A'
+    return pd.Series(formatted, index=shares.index, name=shares.name)
+
+class TableIndex:
+    """
+    Server-side rows for a paginated table.
+
+    Exact-value filters compare per-row codes of the filter columns, the
+    share range is cut from the share sort order by binary search, and
+    sorting reuses a stable sort order per column and direction. All of
+    them are built on first use. A selection is kept as an array of row
+    positions, so a page is a slice of it and only the rows on that page
+    are ever formatted.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self._codes = {}
+        self._orders = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _column_codes(self, column):
+        known = self._codes.get(column)
+        if known is None:
+            codes, labels = pd.factorize(self.df[column].astype(object).fillna('N/A').astype(str), sort=True)
+            known = (codes, {label: i for i, label in enumerate(labels)})
+            self._codes[column] = known
+        return known
+
+    def labels(self, column):
+        """
+        Distinct values of a filter column, sorted
+        """
+        return list(self._column_codes(column)[1])
+
+    def _order(self, column, ascending=True):
+        """
+        Row positions sorted by `column`, missing values last. Extra register
+        columns may mix numbers and text, which do not compare; those sort
+        by their text.
+        """
+        key = (column, ascending)
+        order = self._orders.get(key)
+        if order is None:
+            values = self.df[column].reset_index(drop=True)
+            try:
+                order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            except TypeError:
+                text = values.where(values.isna(), values.astype(str))
+                order = text.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            self._orders[key] = order
+        return order
+
+    def _share_mask(self, low, high):
+        order = self._order('Share')
+        shares = self.df['Share'].to_numpy(dtype='float64', na_value=np.nan)[order]
+        count = int(np.count_nonzero(~np.isnan(shares)))
+        start = np.searchsorted(shares[:count], low, side='left')
+        stop = np.searchsorted(shares[:count], high, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def rows(self, equals=None, share_range=None, sort_by=None, ascending=True):
+        """
+        Positions of the rows matching every filter, in display order.
+
+        equals maps filter columns to a value and share_range is an inclusive
+        (low, high) pair. Without sort_by the rows keep their order.
+        """
+        equals = tuple(sorted((equals or {}).items()))
+        key = (equals, share_range, sort_by, ascending)
+        with self._lock:
+            rows = self._results.get(key)
+            if rows is not None:
+                self._results.move_to_end(key)
+                return rows
+
+            mask = np.ones(self.n_rows, dtype=bool)
+            for column, value in equals:
+                codes, index = self._column_codes(column)
+                mask &= codes == index.get(value, -1)
+            if share_range is not None:
+                mask &= self._share_mask(*share_range)
+
+            if sort_by is None:
+                rows = np.flatnonzero(mask)
+            else:
+                order = self._order(sort_by, ascending)
+                rows = order[mask[order]]
+
+            self._results[key] = rows
+            if len(self._results) > QUERY_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return rows
+
+    def page(self, rows, page, page_size):
+        """
+        The rows of one page of a selection, with Share formatted for display
+        """
+        frame = self.df.iloc[rows[page * page_size:(page + 1) * page_size]].copy()
+        if 'Share' in frame.columns:
+            frame['Share'] = format_share(frame['Share'])
+        return frame
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _build_table_index(fingerprint, _df):
+    return TableIndex(_df)
+
+def get_table_index(df):
+    """
+    Table index of a (filtered) frame, built once and shared by all sessions
+    """
+    return _build_table_index(frame_fingerprint(df), df)
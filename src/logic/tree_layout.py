@@ -0,0 +1,179 @@
+from collections import deque
+import numpy as np
+
+def spanning_forest(G):
+    """
+    Breadth-first spanning forest of the ownership graph.
+
+    Returns (roots, children, depth) over node positions in G's node order:
+    every top-level owner (no incoming edge) roots a tree, each entity hangs
+    below the first owner that reaches it at the smallest depth, and a
+    cycle nobody owns from outside is rooted at its first node.
+    """
+    nodes = list(G)
+    index = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    children = [[] for _ in range(n)]
+    depth = np.zeros(n, dtype=np.int64)
+    visited = bytearray(n)
+    roots = []
+
+    top_level = [index[node] for node, degree in G.in_degree() if degree == 0]
+    for start in top_level + list(range(n)):
+        if visited[start]:
+            continue
+        visited[start] = 1
+        roots.append(start)
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for successor in G.successors(nodes[i]):
+                j = index[successor]
+                if not visited[j]:
+                    visited[j] = 1
+                    depth[j] = depth[i] + 1
+                    children[i].append(j)
+                    queue.append(j)
+    return roots, children, depth
+
+def tidy_tree_layout(G, distance=1.0):
+    """
+    Tidy drawing of the ownership hierarchy as a float32 (n, 2) array in
+    node order: x is the horizontal position in units of `distance`, y the
+    depth below the top-level owner.
+
+    Walker's algorithm with Buchheim et al.'s linear-time fixes, run
+    iteratively so deep chains cannot hit the recursion limit. Parents are
+    centred over their children, subtrees are packed as closely as their
+    contours allow and identical subtrees are drawn identically. The trees
+    of a forest are laid out as children of one virtual root, so they pack
+    side by side the same way.
+    """
+    n = len(G)
+    if n == 0:
+        return np.empty((0, 2), dtype=np.float32)
+
+    roots, children, depth = spanning_forest(G)
+    root = n
+    children = children + [roots]
+    size = n + 1
+
+    parent = [-1] * size
+    number = [0] * size  # 1-based position among siblings
+    for v in range(size):
+        for position, w in enumerate(children[v], 1):
+            parent[w] = v
+            number[w] = position
+
+    prelim = [0.0] * size
+    mod = [0.0] * size
+    shift = [0.0] * size
+    change = [0.0] * size
+    thread = [-1] * size
+    ancestor = list(range(size))
+
+    def left_sibling(v):
+        return children[parent[v]][number[v] - 2] if parent[v] >= 0 and number[v] > 1 else -1
+
+    def next_left(v):
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v):
+        return children[v][-1] if children[v] else thread[v]
+
+    def move_subtree(left, right, amount):
+        subtrees = number[right] - number[left]
+        change[right] -= amount / subtrees
+        shift[right] += amount
+        change[left] += amount / subtrees
+        prelim[right] += amount
+        mod[right] += amount
+
+    def execute_shifts(v):
+        total_shift = total_change = 0.0
+        for w in reversed(children[v]):
+            prelim[w] += total_shift
+            mod[w] += total_shift
+            total_change += change[w]
+            total_shift += shift[w] + total_change
+
+    def apportion(v, default_ancestor):
+        # Push v's subtree right until its left contour clears the right
+        # contour of the subtrees to its left, spreading the shift over the
+        # siblings in between
+        w = left_sibling(v)
+        if w < 0:
+            return default_ancestor
+        inner_right = outer_right = v
+        inner_left = w
+        outer_left = children[parent[v]][0]
+        sum_inner_right = sum_outer_right = mod[v]
+        sum_inner_left = mod[inner_left]
+        sum_outer_left = mod[outer_left]
+        while next_right(inner_left) >= 0 and next_left(inner_right) >= 0:
+            inner_left = next_right(inner_left)
+            inner_right = next_left(inner_right)
+            outer_left = next_left(outer_left)
+            outer_right = next_right(outer_right)
+            ancestor[outer_right] = v
+            amount = (prelim[inner_left] + sum_inner_left) - (prelim[inner_right] + sum_inner_right) + distance
+            if amount > 0:
+                left = ancestor[inner_left]
+                if parent[left] != parent[v]:
+                    left = default_ancestor
+                move_subtree(left, v, amount)
+                sum_inner_right += amount
+                sum_outer_right += amount
+            sum_inner_left += mod[inner_left]
+            sum_inner_right += mod[inner_right]
+            sum_outer_left += mod[outer_left]
+            sum_outer_right += mod[outer_right]
+        if next_right(inner_left) >= 0 and next_right(outer_right) < 0:
+            thread[outer_right] = next_right(inner_left)
+            mod[outer_right] += sum_inner_left - sum_outer_right
+        if next_left(inner_right) >= 0 and next_left(outer_left) < 0:
+            thread[outer_left] = next_left(inner_right)
+            mod[outer_left] += sum_inner_right - sum_outer_left
+            default_ancestor = v
+        return default_ancestor
+
+    # First walk, post-order: preliminary x of every node relative to its siblings.
+    # A frame is [node, next child to visit, default ancestor for apportion].
+    stack = [[root, 0, -1]]
+    while stack:
+        frame = stack[-1]
+        v = frame[0]
+        kids = children[v]
+        if frame[1] < len(kids):
+            if frame[1] == 0:
+                frame[2] = kids[0]
+            stack.append([kids[frame[1]], 0, -1])
+            frame[1] += 1
+            continue
+
+        stack.pop()
+        w = left_sibling(v)
+        if kids:
+            execute_shifts(v)
+            midpoint = (prelim[kids[0]] + prelim[kids[-1]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + distance
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        else:
+            prelim[v] = prelim[w] + distance if w >= 0 else 0.0
+        if stack:
+            stack[-1][2] = apportion(v, stack[-1][2])
+
+    # Second walk, pre-order: final x is the preliminary x plus the mods of all ancestors
+    x = np.zeros(size)
+    stack = [(root, -prelim[root])]
+    while stack:
+        v, offset = stack.pop()
+        x[v] = prelim[v] + offset
+        for w in children[v]:
+            stack.append((w, offset + mod[v]))
+
+    x = x[:n] - x[:n].min()
+    return np.column_stack([x, depth]).astype(np.float32)
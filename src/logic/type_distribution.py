@@ -0,0 +1,53 @@
+import pandas as pd
+import streamlit as st
+from logic.aggregate_cube import ENTITY_TYPES, aggregate
+from logic.fingerprint import frame_fingerprint
+
+# Colour of each entity type in every distribution view
+TYPE_COLORS = {'Natural Person': '#ff7f7f', 'Corporate Entity': '#7f7fff'}
+
+# Country selection meaning every country
+ALL_COUNTRIES = 'All'
+
+class TypeDistribution:
+    """
+    Entity type counts of a register by country.
+
+    `cube` is a (country x entity type) frame of row counts with countries
+    sorted, read off the dataset's aggregate cube; table() answers a country
+    selection from it without touching the rows.
+    """
+
+    def __init__(self, counts):
+        self.cube = counts.reindex(columns=pd.Index(ENTITY_TYPES, name='Entity Type'), fill_value=0)
+
+    @property
+    def countries(self):
+        return self.cube.index.tolist()
+
+    def table(self, country=ALL_COUNTRIES):
+        """
+        Ready-to-plot counts for one country (or all of them): Entity Type,
+        Count, Percentage, Country and Color, largest count first, types
+        without entities left out
+        """
+        counts = self.cube.sum() if country == ALL_COUNTRIES else self.cube.loc[country]
+        counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+        return pd.DataFrame({
+            'Entity Type': counts.index.tolist(),
+            'Count': counts.to_numpy(),
+            'Percentage': (counts.to_numpy() / max(counts.sum(), 1) * 100).round(1),
+            'Country': 'All Countries' if country == ALL_COUNTRIES else country,
+            'Color': [TYPE_COLORS[entity_type] for entity_type in counts.index],
+        })
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _build_type_distribution(fingerprint, _df):
+    return TypeDistribution(aggregate(_df, ['country', 'type'])['Count'].unstack(fill_value=0))
+
+def get_type_distribution(df):
+    """
+    Entity type distribution of a (filtered) register, built once per frame
+    and shared by all distribution views
+    """
+    return _build_type_distribution(frame_fingerprint(df), df)
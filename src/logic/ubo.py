@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from logic.layout import graph_fingerprint
+from logic.ownership import get_effective_ownership
+
+# Effective share (percent) from which a natural person counts as ultimate beneficial owner
+DEFAULT_UBO_THRESHOLD = 25.0
+
+def _sorted_groups(groups, members, shares, n_groups):
+    """
+    CSR-style index: for group g, members[start[g]:start[g + 1]] and their
+    shares, largest share first
+    """
+    order = np.lexsort((-shares, groups))
+    start = np.searchsorted(groups[order], np.arange(n_groups + 1))
+    return start, members[order], shares[order]
+
+class UBOIndex:
+    """
+    Effective holdings of natural persons, indexed both ways.
+
+    Per entity, its natural-person owners are stored by descending
+    effective share, and per person, its holdings likewise, so a threshold
+    query is a binary search plus a slice.
+    """
+
+    def __init__(self, ownership, is_person):
+        self.nodes = ownership.nodes
+        self.index = ownership.index
+        self.persons = np.flatnonzero(is_person)
+        self.cycles = ownership.cycles
+
+        pairs = ownership.matrix[self.persons].tocoo()
+        persons = self.persons[pairs.row]
+        entities = pairs.col
+        shares = (pairs.data * 100).astype(np.float64)
+        n = len(self.nodes)
+        self._entity_start, self._entity_persons, self._entity_shares = _sorted_groups(entities, persons, shares, n)
+        self._person_start, self._person_entities, self._person_shares = _sorted_groups(persons, entities, shares, n)
+
+    def _slice(self, start, members, shares, position, threshold):
+        lo, hi = start[position], start[position + 1]
+        # Shares are descending, so those at or above the threshold are a prefix
+        count = np.searchsorted(-shares[lo:hi], -threshold, side='right')
+        return members[lo:lo + count], shares[lo:lo + count]
+
+    def ubos_of(self, entity, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        [(person id, effective share %)] of the natural persons holding at
+        least `threshold` percent of `entity`, largest first
+        """
+        persons, shares = self._slice(
+            self._entity_start, self._entity_persons, self._entity_shares, self.index[entity], threshold
+        )
+        return [(self.nodes[i], share) for i, share in zip(persons.tolist(), shares.tolist())]
+
+    def entities_of(self, person, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        [(entity id, effective share %)] of the entities `person` holds at
+        least `threshold` percent of, largest first
+        """
+        entities, shares = self._slice(
+            self._person_start, self._person_entities, self._person_shares, self.index[person], threshold
+        )
+        return [(self.nodes[i], share) for i, share in zip(entities.tolist(), shares.tolist())]
+
+    def _batch(self, start, members, shares, ids, threshold, key, other):
+        keys, found, found_shares = [], [], []
+        for node in ids:
+            nodes, node_shares = self._slice(start, members, shares, self.index[node], threshold)
+            keys.extend([node] * len(nodes))
+            found.append(nodes)
+            found_shares.append(node_shares)
+        found = np.concatenate(found) if found else np.array([], dtype=np.int64)
+        return pd.DataFrame({
+            key: keys,
+            other: [self.nodes[i] for i in found.tolist()],
+            'Effective Share': np.concatenate(found_shares) if found_shares else np.array([]),
+        })
+
+    def ubos_of_many(self, entities, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        UBOs of several entities as a frame: Entity ID, Person ID, Effective Share
+        """
+        return self._batch(
+            self._entity_start, self._entity_persons, self._entity_shares,
+            entities, threshold, 'Entity ID', 'Person ID'
+        )
+
+    def entities_of_many(self, persons, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        Entities held by several persons as a frame: Person ID, Entity ID, Effective Share
+        """
+        return self._batch(
+            self._person_start, self._person_entities, self._person_shares,
+            persons, threshold, 'Person ID', 'Entity ID'
+        )
+
+    def all_ubos(self, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        Every (entity, UBO) pair at or above `threshold` as a frame:
+        Entity ID, Person ID, Effective Share
+        """
+        keep = self._entity_shares >= threshold
+        entities = np.repeat(np.arange(len(self.nodes)), np.diff(self._entity_start))[keep]
+        return pd.DataFrame({
+            'Entity ID': [self.nodes[i] for i in entities.tolist()],
+            'Person ID': [self.nodes[i] for i in self._entity_persons[keep].tolist()],
+            'Effective Share': self._entity_shares[keep],
+        })
+
+    def entities_without_ubo(self, threshold=DEFAULT_UBO_THRESHOLD):
+        """
+        Ids of the corporate entities no natural person holds `threshold` percent of
+        """
+        top = np.zeros(len(self.nodes))
+        has_owner = np.diff(self._entity_start) > 0
+        top[has_owner] = self._entity_shares[self._entity_start[:-1][has_owner]]
+        is_entity = np.ones(len(self.nodes), dtype=bool)
+        is_entity[self.persons] = False
+        return [self.nodes[i] for i in np.flatnonzero(is_entity & (top < threshold)).tolist()]
+
+def build_ubo_index(G):
+    """
+    UBO index of an ownership graph from build_graph(), using the
+    'is_person' node flag
+    """
+    is_person = np.fromiter((bool(person) for _, person in G.nodes(data='is_person')), dtype=bool, count=len(G))
+    return UBOIndex(get_effective_ownership(G), is_person)
+
+@st.cache_resource(max_entries=8, show_spinner="Indexing beneficial owners...")
+def _cached_ubo_index(fingerprint, _G):
+    return build_ubo_index(_G)
+
+def get_ubo_index(G):
+    """
+    The UBO index of G, built once per graph; treat it as read-only.
+
+        index = get_ubo_index(get_graph(df))
+        index.ubos_of(entity_id, threshold=25)
+        index.entities_of(person_id, threshold=10)
+    """
+    return _cached_ubo_index(graph_fingerprint(G), G)
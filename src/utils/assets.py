@@ -0,0 +1,182 @@
+import importlib.util
+import os
+import re
+import threading
+import bokeh
+from bokeh.resources import CDN
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Third-party bundles fetched by tools/fetch_assets.py for hosts without internet access
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'static', 'vendor')
+
+# Set on hosts without internet access: a page referring to a bundle that
+# has not been fetched then fails instead of falling back to the CDN
+REQUIRE_LOCAL_ASSETS = os.environ.get('GT_ANALYZER_OFFLINE_ASSETS', '0') == '1'
+
+FETCH_COMMAND = 'python tools/fetch_assets.py'
+
+def _package_dir(package, *parts):
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(spec.submodule_search_locations[0], *parts)
+
+# Directories served to the browser, by route name. Besides the vendored
+# bundles, the JS that installed packages already ship is served in place.
+ASSET_ROOTS = {
+    'vendor': VENDOR_DIR,
+    'bokeh': _package_dir('bokeh', 'server', 'static', 'js'),
+    'pyvis': _package_dir('pyvis', 'lib'),
+    'dash': _package_dir('dash', 'deps'),
+}
+
+# CDN URL referenced by a renderer (or by the HTML a library generates for
+# it) -> (asset root, file). File names carry the library version, so a URL
+# never changes content and browsers may cache it indefinitely.
+ASSETS = {
+    # D3.js views
+    'https://d3js.org/d3.v7.min.js': ('vendor', 'd3.v7.min.js'),
+    # Cytoscape view
+    'https://cdnjs.cloudflare.com/ajax/libs/cytoscape/3.23.0/cytoscape.min.js': ('vendor', 'cytoscape-3.23.0.min.js'),
+    # WebGL view
+    'https://unpkg.com/deck.gl@8.9.35/dist.min.js': ('vendor', 'deck.gl-8.9.35.min.js'),
+    # PyVis page template
+    'https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js': ('pyvis', 'vis-9.1.2/vis-network.min.js'),
+    'https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css': ('pyvis', 'vis-9.1.2/vis-network.css'),
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/css/bootstrap.min.css': ('vendor', 'bootstrap-5.0.0-beta3.min.css'),
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/js/bootstrap.bundle.min.js': ('vendor', 'bootstrap-5.0.0-beta3.bundle.min.js'),
+    # PyEcharts embed
+    'https://assets.pyecharts.org/assets/v6/echarts.min.js': ('vendor', 'echarts-6.min.js'),
+    # Kepler.gl page
+    'https://unpkg.com/react@18.2.0/umd/react.production.min.js': ('dash', 'react@18.2.0.min.js'),
+    'https://unpkg.com/react-dom@18.2.0/umd/react-dom.production.min.js': ('dash', 'react-dom@18.2.0.min.js'),
+    'https://unpkg.com/redux@4.2.1/dist/redux.js': ('vendor', 'redux-4.2.1.js'),
+    'https://unpkg.com/react-redux@8.0.5/dist/react-redux.min.js': ('vendor', 'react-redux-8.0.5.min.js'),
+    'https://unpkg.com/react-intl@4.7.6/dist/react-intl.min.js': ('vendor', 'react-intl-4.7.6.min.js'),
+    'https://unpkg.com/react-copy-to-clipboard@5.0.2/build/react-copy-to-clipboard.min.js': ('vendor', 'react-copy-to-clipboard-5.0.2.min.js'),
+    'https://unpkg.com/styled-components@6.1.8/dist/styled-components.min.js': ('vendor', 'styled-components-6.1.8.min.js'),
+    'https://unpkg.com/maplibre-gl@^3/dist/maplibre-gl.css': ('vendor', 'maplibre-gl-3.css'),
+    'https://api.tiles.mapbox.com/mapbox-gl-js/v1.1.1/mapbox-gl.css': ('vendor', 'mapbox-gl-1.1.1.css'),
+    'https://d1a3f4spazzrp4.cloudfront.net/kepler.gl/uber-fonts/4.0.0/superfine.css': ('vendor', 'uber-fonts-4.0.0-superfine.css'),
+    'http://d1a3f4spazzrp4.cloudfront.net/kepler.gl/uber-fonts/4.0.0/superfine.css': ('vendor', 'uber-fonts-4.0.0-superfine.css'),
+    'http://api.tiles.mapbox.com/mapbox-gl-js/v1.1.1/mapbox-gl.css': ('vendor', 'mapbox-gl-1.1.1.css'),
+    'https://api.mapbox.com/mapbox-gl-js/plugins/mapbox-gl-rtl-text/v0.2.3/mapbox-gl-rtl-text.js': ('vendor', 'mapbox-gl-rtl-text-0.2.3.js'),
+    # Kepler.gl's map export template, which builds the kepler.gl bundle URL
+    # from its version (see ASSET_PREFIXES)
+    'https://unpkg.com/react@16.8.4/umd/react.production.min.js': ('vendor', 'react-16.8.4.min.js'),
+    'https://unpkg.com/react-dom@16.8.4/umd/react-dom.production.min.js': ('vendor', 'react-dom-16.8.4.min.js'),
+    'https://unpkg.com/redux@3.7.2/dist/redux.js': ('vendor', 'redux-3.7.2.js'),
+    'https://unpkg.com/react-redux@7.1.3/dist/react-redux.min.js': ('vendor', 'react-redux-7.1.3.min.js'),
+    'https://unpkg.com/styled-components@4.1.3/dist/styled-components.min.js': ('vendor', 'styled-components-4.1.3.min.js'),
+    'https://unpkg.com/kepler.gl@3.0.0/umd/keplergl.min.js': ('vendor', 'kepler.gl@3.0.0/umd/keplergl.min.js'),
+    # Folium and Leaflet maps
+    'https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js': ('vendor', 'leaflet-1.9.3.js'),
+    'https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css': ('vendor', 'leaflet-1.9.3.css'),
+    'https://code.jquery.com/jquery-3.7.1.min.js': ('vendor', 'jquery-3.7.1.min.js'),
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.2.2/dist/js/bootstrap.bundle.min.js': ('vendor', 'bootstrap-5.2.2.bundle.min.js'),
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.2.2/dist/css/bootstrap.min.css': ('vendor', 'bootstrap-5.2.2.min.css'),
+    'https://netdna.bootstrapcdn.com/bootstrap/3.0.0/css/bootstrap-glyphicons.css': ('vendor', 'bootstrap-glyphicons-3.0.0.css'),
+    'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.2.0/css/all.min.css': ('vendor', 'fontawesome-free-6.2.0.min.css'),
+    'https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js': ('vendor', 'leaflet.awesome-markers-2.0.2.js'),
+    'https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css': ('vendor', 'leaflet.awesome-markers-2.0.2.css'),
+    'https://cdn.jsdelivr.net/gh/python-visualization/folium/folium/templates/leaflet.awesome.rotate.min.css': ('vendor', 'leaflet.awesome.rotate.min.css'),
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/leaflet.markercluster.js': ('vendor', 'leaflet.markercluster-1.1.0.js'),
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.css': ('vendor', 'MarkerCluster-1.1.0.css'),
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.Default.css': ('vendor', 'MarkerCluster.Default-1.1.0.css'),
+    'https://cdn.jsdelivr.net/npm/leaflet.fullscreen@3.0.0/Control.FullScreen.min.js': ('vendor', 'Control.FullScreen-3.0.0.min.js'),
+    'https://cdn.jsdelivr.net/npm/leaflet.fullscreen@3.0.0/Control.FullScreen.css': ('vendor', 'Control.FullScreen-3.0.0.css'),
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet-minimap/3.6.1/Control.MiniMap.js': ('vendor', 'Control.MiniMap-3.6.1.js'),
+    'https://cdnjs.cloudflare.com/ajax/libs/leaflet-minimap/3.6.1/Control.MiniMap.css': ('vendor', 'Control.MiniMap-3.6.1.css'),
+    'https://cdn.jsdelivr.net/npm/leaflet-search@2.9.7/dist/leaflet-search.min.js': ('vendor', 'leaflet-search-2.9.7.min.js'),
+    'https://cdn.jsdelivr.net/npm/leaflet-search@2.9.7/dist/leaflet-search.min.css': ('vendor', 'leaflet-search-2.9.7.min.css'),
+    'https://cdn.jsdelivr.net/gh/python-visualization/folium@main/folium/templates/leaflet_heat.min.js': ('vendor', 'leaflet_heat.min.js'),
+}
+
+# URL prefixes that page scripts complete at run time (so the full URL never
+# appears in the HTML) -> (asset root, local prefix). Each is only rewritten
+# once every ASSETS entry under it has a local copy.
+ASSET_PREFIXES = {
+    'https://unpkg.com/kepler.gl@': ('vendor', 'kepler.gl@'),
+}
+
+# Bokeh's CDN resources for the installed version, e.g. bokeh-gl-3.4.1.min.js -> bokeh-gl.min.js
+for _url in CDN.js_files:
+    ASSETS[_url] = ('bokeh', os.path.basename(_url).replace(f'-{bokeh.__version__}', ''))
+
+# Streamlit serves a declared component's directory (with Cache-Control:
+# public and ETag revalidation) at component/<component name>/<file>. Routes
+# are declared on first use, so bundles fetched after startup are picked up.
+_routes = {}
+_routes_lock = threading.Lock()
+
+def _route(root):
+    path = ASSET_ROOTS.get(root)
+    if not path or not os.path.isdir(path):
+        return None
+    with _routes_lock:
+        if root not in _routes:
+            _routes[root] = components.declare_component(f'assets_{root}', path=path).name
+        return _routes[root]
+
+def _local_url(root, name):
+    route = _route(root)
+    if route is None or not os.path.isfile(os.path.join(ASSET_ROOTS[root], name)):
+        return None
+    return f'component/{route}/{name}'
+
+def asset_url(url):
+    """
+    URL of the local copy of a CDN asset, or the CDN URL itself when no
+    local copy is available. The path is relative, so it resolves against
+    the app's own address (and base path) inside components.html iframes.
+    """
+    root, name = ASSETS.get(url, (None, None))
+    return (root and _local_url(root, name)) or url
+
+class MissingAssetsError(FileNotFoundError):
+    """
+    A page refers to bundles without a local copy on a host that must not
+    load them from public CDNs
+    """
+
+# Subresource-integrity and CORS attributes of tags pointing at a local copy,
+# which need not be byte-identical to the CDN build
+_INTEGRITY = re.compile(r'(<(?:script|link)\b[^>]*?component/[^>]*?)\s+(?:integrity|crossorigin)(?:="[^"]*")?')
+
+def localize_assets(html):
+    """
+    Point every known CDN script and stylesheet in a page at its local copy.
+    Bundles without one are reported: with REQUIRE_LOCAL_ASSETS the page
+    fails, otherwise it shows a warning and they load from the CDN.
+    """
+    missing = []
+    for url, (root, name) in ASSETS.items():
+        if url in html:
+            local = _local_url(root, name)
+            if local is None:
+                missing.append(name)
+            else:
+                html = html.replace(url, local)
+    for prefix, (root, local_prefix) in ASSET_PREFIXES.items():
+        if prefix not in html:
+            continue
+        names = [name for url, (_, name) in ASSETS.items() if url.startswith(prefix)]
+        if all(_local_url(root, name) for name in names):
+            html = html.replace(prefix, f'component/{_route(root)}/{local_prefix}')
+        else:
+            missing.extend(name for name in names if not _local_url(root, name))
+
+    if missing:
+        message = (
+            f"{len(missing)} bundle(s) of this view have no local copy ({', '.join(sorted(set(missing)))}). "
+            f"Run `{FETCH_COMMAND}` to serve them from the app."
+        )
+        if REQUIRE_LOCAL_ASSETS:
+            raise MissingAssetsError(message)
+        st.warning(message + " Loading them from public CDNs for now.")
+
+    previous = None
+    while previous != html:
+        previous, html = html, _INTEGRITY.sub(r'\1', html)
+    return html
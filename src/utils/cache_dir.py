@@ -0,0 +1,16 @@
+import os
+
+# Root of every on-disk cache the app keeps (ingest sidecars, geocodes, layouts).
+# Point GT_ANALYZER_CACHE_DIR at shared storage to share caches between workers.
+CACHE_ROOT = os.environ.get(
+    'GT_ANALYZER_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'gt-analyzer')
+)
+
+def cache_path(*parts):
+    """
+    Return a path inside the on-disk cache, creating its directory if needed
+    """
+    path = os.path.join(CACHE_ROOT, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
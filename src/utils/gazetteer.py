@@ -0,0 +1,98 @@
+import csv
+import hashlib
+import os
+import re
+import unicodedata
+from functools import lru_cache
+import numpy as np
+
+GAZETTEER_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'gazetteer')
+
+# Cities a gazetteer lookup can resolve to, built by tools/build_gazetteer.py
+CITY_KEYS_FILE = 'city_keys.npy'
+CITY_COORDS_FILE = 'city_coords.npy'
+COUNTRY_CENTROIDS_FILE = 'country_centroids.csv'
+
+def fold_name(name):
+    """
+    Accent-, case- and whitespace-insensitive form of a place name
+    """
+    decomposed = unicodedata.normalize('NFKD', str(name))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', stripped).strip().casefold()
+
+def city_key(country_code, city):
+    """
+    64-bit key of a city in the bundled table, hashed from "CC|folded name"
+    """
+    text = f'{country_code.upper()}|{fold_name(city)}'.encode('utf-8')
+    return np.uint64(int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), 'little'))
+
+class Gazetteer:
+    """
+    Offline resolver for ISO country centroids and city coordinates.
+
+    The city table is a pair of memory-mapped arrays: sorted uint64 name
+    hashes and float32 (lat, lon) rows, so loading is instant and lookups
+    are a binary search that only touches the pages it needs.
+    """
+
+    def __init__(self, directory=GAZETTEER_DIR):
+        self.countries = {}
+        with open(os.path.join(directory, COUNTRY_CENTROIDS_FILE), encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.countries[row['country_code']] = (float(row['latitude']), float(row['longitude']))
+
+        keys_path = os.path.join(directory, CITY_KEYS_FILE)
+        if os.path.exists(keys_path):
+            self.city_keys = np.load(keys_path, mmap_mode='r')
+            self.city_coords = np.load(os.path.join(directory, CITY_COORDS_FILE), mmap_mode='r')
+        else:
+            self.city_keys = np.array([], dtype=np.uint64)
+            self.city_coords = np.empty((0, 2), dtype=np.float32)
+
+    def country(self, country_code):
+        """
+        Centroid of an ISO 3166-1 alpha-2 country, or None
+        """
+        return self.countries.get(str(country_code).strip().upper())
+
+    def city(self, country_code, city):
+        """
+        Coordinates of a city within a country, or None
+        """
+        key = city_key(country_code, city)
+        idx = np.searchsorted(self.city_keys, key)
+        if idx < len(self.city_keys) and self.city_keys[idx] == key:
+            lat, lon = self.city_coords[idx]
+            return float(lat), float(lon)
+        return None
+
+    def resolve(self, location):
+        """
+        Resolve "City, CC" or a bare "CC" to (coords, level).
+
+        level is 'city' or 'country' for an exact match, 'approximate' when
+        the city is unknown and its country's centroid stands in, and None
+        when nothing matched.
+        """
+        parts = [part.strip() for part in str(location).split(',') if part.strip()]
+        if not parts:
+            return None, None
+        country_code = parts[-1].upper()
+        if len(parts) == 1:
+            coords = self.country(country_code)
+            return (coords, 'country') if coords else (None, None)
+        if country_code not in self.countries:
+            return None, None
+        coords = self.city(country_code, ', '.join(parts[:-1]))
+        if coords:
+            return coords, 'city'
+        return self.countries[country_code], 'approximate'
+
+@lru_cache(maxsize=1)
+def get_gazetteer():
+    """
+    Process-wide gazetteer, loaded on first use
+    """
+    return Gazetteer()
@@ -0,0 +1,120 @@
+import re
+import sqlite3
+import time
+from contextlib import closing
+from utils.cache_dir import cache_path
+
+# Lookup outcomes stored alongside the coordinates
+STATUS_OK = 'ok'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_ERROR = 'error'
+
+# Negative results are only trusted for a while: a location the geocoder did
+# not know may be added upstream, and a timeout says nothing about the location.
+# Either may still carry approximate coordinates (e.g. a country centroid).
+NEGATIVE_TTL_SECONDS = {
+    STATUS_NOT_FOUND: 30 * 24 * 3600,
+    STATUS_ERROR: 3600,
+}
+
+# SQLite caps the number of host parameters per statement
+_BATCH_SIZE = 500
+
+def normalize_location(location):
+    """
+    Canonical cache key for a free-text location such as "München, DE"
+    """
+    if location is None:
+        return ''
+    parts = [re.sub(r'\s+', ' ', part).strip() for part in str(location).split(',')]
+    parts = [part for part in parts if part and part.lower() not in ('nan', 'none', 'n/a')]
+    return ', '.join(parts).casefold()
+
+class GeocodeCache:
+    """
+    Persistent "City, Country" -> (lat, lon, status) store backed by SQLite.
+
+    The database survives restarts and can be shared between worker
+    processes; WAL mode lets readers proceed while another worker writes.
+    """
+
+    def __init__(self, path=None, negative_ttl=None):
+        self.path = path or cache_path('geocode.sqlite3')
+        self.negative_ttl = dict(NEGATIVE_TTL_SECONDS, **(negative_ttl or {}))
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS geocodes ('
+                ' location TEXT PRIMARY KEY,'
+                ' lat REAL,'
+                ' lon REAL,'
+                ' status TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _is_fresh(self, status, updated_at, now):
+        ttl = self.negative_ttl.get(status)
+        return ttl is None or now - updated_at < ttl
+
+    def get_many(self, locations):
+        """
+        Look up many normalized locations at once.
+
+        Returns {location: (lat, lon) or None} for every fresh entry; keys
+        that are missing or whose negative result has expired are left out.
+        """
+        keys = list(dict.fromkeys(locations))
+        now = time.time()
+        found = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(keys), _BATCH_SIZE):
+                batch = keys[start:start + _BATCH_SIZE]
+                rows = conn.execute(
+                    'SELECT location, lat, lon, status, updated_at FROM geocodes'
+                    f' WHERE location IN ({",".join("?" * len(batch))})',
+                    batch
+                )
+                for location, lat, lon, status, updated_at in rows:
+                    if self._is_fresh(status, updated_at, now):
+                        found[location] = (lat, lon) if lat is not None else None
+        return found
+
+    def get(self, location):
+        """
+        Return (hit, coords) for a single normalized location
+        """
+        found = self.get_many([location])
+        return location in found, found.get(location)
+
+    def put_many(self, results):
+        """
+        Store {location: (coords or None, status)} in one transaction
+        """
+        now = time.time()
+        rows = [
+            (location, coords[0] if coords else None, coords[1] if coords else None, status, now)
+            for location, (coords, status) in results.items()
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO geocodes (location, lat, lon, status, updated_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def put(self, location, coords, status=STATUS_OK):
+        self.put_many({location: (coords, status)})
+
+_geocode_cache = None
+
+def get_geocode_cache():
+    """
+    Process-wide persistent geocode cache
+    """
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = GeocodeCache()
+    return _geocode_cache
@@ -1,87 +1,120 @@
+import threading
+from collections import OrderedDict
 import streamlit as st
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
-from geopy.extra.rate_limiter import RateLimiter
-import time
 import pandas as pd
+from utils.geocode_cache import normalize_location
+from utils.geocoding_engine import get_geocoding_engine
+from logic.fingerprint import frame_fingerprint
+from logic.register_diff import previous_version
 
-@st.cache_data
-def get_coordinates(location):
+# Resolved locations of recently geocoded frames, by frame fingerprint, so a
+# new version of a register only resolves the locations it adds
+RESOLVED_CACHE_SIZE = 8
+_resolved_by_frame = OrderedDict()
+_resolved_lock = threading.Lock()
+
+def stream_locations(locations, engine=None):
     """
-    Get coordinates for a location using geopy with retry logic
+    Yield (normalized location, coords or None) as each location resolves.
+
+    Locations are deduplicated before any lookup; cached ones come first and
+    the rest arrive in completion order while the engine keeps working in
+    the background, so callers can redraw in between.
     """
-    if pd.isna(location) or location.strip() == '':
-        return None
+    engine = engine or get_geocoding_engine()
+    return engine.iter_stream(locations)
 
-    geolocator = Nominatim(
-        user_agent="corporate_structure_app",
-        timeout=10
-    )
-    # Create rate-limited geocoding function
-    geocode = RateLimiter(
-        geolocator.geocode,
-        min_delay_seconds=1,
-        max_retries=3,
-        error_wait_seconds=2.0
-    )
-    
-    max_retries = 3
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
-        try:
-            location_data = geocode(location)
-            if location_data:
-                return location_data.latitude, location_data.longitude
-            return None
-        except (GeocoderTimedOut, GeocoderUnavailable) as e:
-            if attempt == max_retries - 1:  # Last attempt
-                st.warning(f"Could not geocode location: {location}. Error: {str(e)}")
-                return None
-            time.sleep(retry_delay)
-    
-    return None
+def prefetch_locations(locations, engine=None, on_progress=None):
+    """
+    Resolve many locations at once, each distinct place at most once.
+
+    on_progress(done, total) is called as results arrive. Returns
+    {normalized location: (lat, lon) or None}.
+    """
+    total = len({key for key in map(normalize_location, locations) if key})
+    resolved = {}
+    for key, coords in stream_locations(locations, engine):
+        resolved[key] = coords
+        if on_progress is not None:
+            on_progress(len(resolved), total)
+    return resolved
+
+def location_strings(df):
+    """
+    "City, Country Code" lookup string for every row of a register
+    """
+    cities = df['City'].astype(str) if 'City' in df.columns else pd.Series('', index=df.index)
+    countries = df['Country Code'].astype(str) if 'Country Code' in df.columns else pd.Series('', index=df.index)
+    return cities + ', ' + countries
 
-@st.cache_data
 def get_location_data(df):
     """
-    Get location data for all entities with progress bar and error handling
+    Get location data for all entities with progress bar and error handling.
+    
+    Results are cached on the fingerprint of the frame, so returning to a
+    map view with unchanged filters does not rehash or regeocode the rows.
     """
-    locations = []
+    return _get_location_data(frame_fingerprint(df), df)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _get_location_data(fingerprint, _df):
+    df = _df
     total_rows = len(df)
     
+    # Geocode each distinct location once, then join the coordinates back;
+    # those the previous version of the register resolved are reused
+    locations = location_strings(df)
+    unique_locations = pd.Series(locations.unique())
+    previous = previous_version(df)
+    with _resolved_lock:
+        known = _resolved_by_frame.get(frame_fingerprint(previous)) if previous is not None else None
+    known = known or {}
+    new_locations = unique_locations[~unique_locations.isin(list(known))]
+    location_keys = new_locations.map(normalize_location)
+    
     # Create progress bar
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    for idx, row in df.iterrows():
-        # Update progress
-        progress = (idx + 1) / total_rows
-        progress_bar.progress(progress)
-        status_text.text(f"Processing {idx + 1}/{total_rows} entities...")
-        
-        location_str = f"{row.get('City', '')}, {row.get('Country Code', '')}"
-        coords = get_coordinates(location_str)
-        
-        if coords:
-            locations.append({
-                'name': row['Name'],
-                'city': row.get('City', 'N/A'),
-                'country': row.get('Country Code', 'N/A'),
-                'is_person': row.get('Natural Person', 'no').lower() == 'yes',
-                'lat': coords[0],
-                'lon': coords[1],
-                'latitude': coords[0],  # For compatibility with different libraries
-                'longitude': coords[1],
-                'size': 20,  # For plotly visualization
-                'elevation': 1000 if row.get('Natural Person', 'no').lower() == 'yes' else 2000  # For pydeck
-            })
+    def on_progress(done, total):
+        progress_bar.progress(done / total)
+        status_text.text(f"Geocoding {done}/{total} locations...")
+    
+    resolved = prefetch_locations(location_keys, on_progress=on_progress)
     
     # Clear progress bar and status text
     progress_bar.empty()
     status_text.empty()
     
-    result_df = pd.DataFrame(locations)
+    # Locations without a usable key ("nan, nan") are not looked up; .get
+    # keeps them None instead of the NaN a dict lookup would give
+    coords_by_location = dict(zip(new_locations, location_keys.map(lambda key: resolved.get(key))))
+    coords_by_location.update((location, known[location]) for location in unique_locations if location in known)
+    with _resolved_lock:
+        _resolved_by_frame[fingerprint] = coords_by_location
+        if len(_resolved_by_frame) > RESOLVED_CACHE_SIZE:
+            _resolved_by_frame.popitem(last=False)
+    lat_by_location = {location: c[0] if c else None for location, c in coords_by_location.items()}
+    lon_by_location = {location: c[1] if c else None for location, c in coords_by_location.items()}
+    
+    if 'Is Person' in df.columns:
+        is_person = df['Is Person'].astype(bool)
+    else:
+        is_person = df['Natural Person'].astype(str).str.lower().eq('yes')
+    
+    result_df = pd.DataFrame({
+        'name': df['Name'],
+        'city': df['City'] if 'City' in df.columns else 'N/A',
+        'country': df['Country Code'] if 'Country Code' in df.columns else 'N/A',
+        'is_person': is_person,
+        'lat': locations.map(lat_by_location).astype(float),
+        'lon': locations.map(lon_by_location).astype(float),
+    })
+    result_df = result_df.dropna(subset=['lat', 'lon']).reset_index(drop=True)
+    result_df['latitude'] = result_df['lat']  # For compatibility with different libraries
+    result_df['longitude'] = result_df['lon']
+    result_df['size'] = 20  # For plotly visualization
+    result_df['elevation'] = result_df['is_person'].map({True: 1000, False: 2000})  # For pydeck
     
     if result_df.empty:
         st.error("No valid location data found. Please check if the City and Country Code columns contain valid data.")
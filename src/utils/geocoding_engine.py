@@ -0,0 +1,266 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from functools import lru_cache
+from geopy.geocoders import Nominatim
+from geopy.exc import GeopyError
+from utils.gazetteer import get_gazetteer
+from utils.geocode_cache import (
+    get_geocode_cache, normalize_location, STATUS_OK, STATUS_NOT_FOUND, STATUS_ERROR
+)
+
+# Set GT_ANALYZER_ONLINE_GEOCODING=0 on air-gapped hosts to resolve from the
+# bundled gazetteer only
+ONLINE_GEOCODING = os.environ.get('GT_ANALYZER_ONLINE_GEOCODING', '1') != '0'
+
+# Point at a self-hosted Nominatim (e.g. "http://nominatim.internal:8080") and
+# raise its rate; the public instance allows one request per second
+NOMINATIM_URL = os.environ.get('GT_ANALYZER_NOMINATIM_URL', 'https://nominatim.openstreetmap.org')
+NOMINATIM_RATE = float(os.environ.get('GT_ANALYZER_NOMINATIM_RATE', '1'))
+
+# Misses are written back in batches so an interrupted stream keeps its progress
+_FLUSH_EVERY = 50
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Reservations are taken under a lock and turned into a wait, so one
+    bucket enforces its rate across every event loop and session using it.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token and return how many seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class GeocodingBackend:
+    """
+    One source of coordinates. geocode() returns (coords or None, status);
+    STATUS_ERROR marks a transient failure the engine may retry. A backend
+    with a rate has a token bucket shared by all of its callers.
+    """
+    name = 'backend'
+
+    def __init__(self, rate=None, capacity=1):
+        self.bucket = TokenBucket(rate, capacity) if rate else None
+
+    async def geocode(self, location):
+        raise NotImplementedError
+
+class GazetteerBackend(GeocodingBackend):
+    """
+    Bundled offline gazetteer; answers in microseconds and needs no budget.
+    An unknown city comes back as its country centroid with STATUS_NOT_FOUND
+    so later backends still get a chance to do better.
+    """
+    name = 'gazetteer'
+
+    async def geocode(self, location):
+        coords, level = get_gazetteer().resolve(location)
+        if level in ('city', 'country'):
+            return coords, STATUS_OK
+        return coords, STATUS_NOT_FOUND
+
+class NominatimBackend(GeocodingBackend):
+    """
+    Public or self-hosted Nominatim through one shared geopy client
+    """
+    name = 'nominatim'
+
+    def __init__(self, url=NOMINATIM_URL, rate=NOMINATIM_RATE, timeout=10):
+        super().__init__(rate=rate)
+        scheme, _, domain = url.partition('://')
+        self.client = Nominatim(
+            user_agent="corporate_structure_app",
+            domain=domain.rstrip('/'),
+            scheme=scheme,
+            timeout=timeout
+        )
+
+    async def geocode(self, location):
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(None, self.client.geocode, location)
+        except GeopyError:
+            return None, STATUS_ERROR
+        if result:
+            return (result.latitude, result.longitude), STATUS_OK
+        return None, STATUS_NOT_FOUND
+
+class MockBackend(GeocodingBackend):
+    """
+    Local stand-in for tests and benchmarks: answers from a dict after an
+    optional simulated latency. `errors` maps locations to how many lookups
+    fail with STATUS_ERROR before one succeeds; every lookup is recorded in
+    `calls` as (location, monotonic time).
+    """
+    name = 'mock'
+
+    def __init__(self, results=None, latency=0.0, rate=None, errors=None):
+        super().__init__(rate=rate)
+        self.results = {normalize_location(key): value for key, value in (results or {}).items()}
+        self.errors = {normalize_location(key): count for key, count in (errors or {}).items()}
+        self.latency = latency
+        self.calls = []
+
+    async def geocode(self, location):
+        self.calls.append((location, time.monotonic()))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.errors.get(location, 0) > 0:
+            self.errors[location] -= 1
+            return None, STATUS_ERROR
+        coords = self.results.get(location)
+        return (coords, STATUS_OK) if coords else (None, STATUS_NOT_FOUND)
+
+class GeocodingEngine:
+    """
+    Concurrent, tiered geocoder in front of the persistent cache.
+
+    Each location is tried against the backends in order until one returns
+    STATUS_OK; if none does, the first approximate coordinates seen are
+    kept. Lookups run concurrently up to `concurrency`, each backend paced
+    by its own token bucket, and transient errors are retried with
+    exponential backoff without blocking other lookups.
+    """
+
+    def __init__(self, backends, cache=None, concurrency=16, max_retries=3, retry_delay=2.0):
+        self.backends = list(backends)
+        self.cache = cache
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    async def _query(self, backend, location):
+        for attempt in range(self.max_retries):
+            if backend.bucket:
+                await backend.bucket.acquire()
+            coords, status = await backend.geocode(location)
+            if status != STATUS_ERROR:
+                return coords, status
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        return None, STATUS_ERROR
+
+    async def resolve(self, location):
+        """
+        Resolve one normalized location to (coords, status)
+        """
+        fallback, last_status = None, STATUS_NOT_FOUND
+        for backend in self.backends:
+            coords, status = await self._query(backend, location)
+            if status == STATUS_OK:
+                return coords, status
+            fallback = fallback or coords
+            last_status = status
+        return fallback, last_status
+
+    async def stream(self, locations):
+        """
+        Async generator of (normalized location, coords or None).
+
+        Locations are deduplicated first; cache hits are yielded at once and
+        misses as soon as each one resolves, in completion order.
+        """
+        keys = [key for key in dict.fromkeys(map(normalize_location, locations)) if key]
+        cached = self.cache.get_many(keys) if self.cache else {}
+        for key in keys:
+            if key in cached:
+                yield key, cached[key]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(key):
+            async with semaphore:
+                return key, await self.resolve(key)
+
+        tasks = [asyncio.ensure_future(run(key)) for key in keys if key not in cached]
+        pending = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, (coords, status) = await next_done
+                pending[key] = (coords, status)
+                if self.cache and len(pending) >= _FLUSH_EVERY:
+                    self.cache.put_many(pending)
+                    pending = {}
+                yield key, coords
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.cache and pending:
+                self.cache.put_many(pending)
+
+    def iter_stream(self, locations):
+        """
+        Synchronous view of stream() for the Streamlit script thread.
+
+        The event loop runs on a background thread and hands results over a
+        queue, so the caller can redraw between results. Closing the
+        generator early stops outstanding lookups.
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        done = object()
+
+        async def produce():
+            agen = self.stream(locations)
+            try:
+                async for item in agen:
+                    results.put(item)
+                    if stop.is_set():
+                        break
+            finally:
+                await agen.aclose()
+
+        def run():
+            try:
+                asyncio.run(produce())
+            except BaseException as exc:  # surfaced in the consuming thread
+                results.put(exc)
+            finally:
+                results.put(done)
+
+        worker = threading.Thread(target=run, name='geocoding-engine', daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+@lru_cache(maxsize=1)
+def get_geocoding_engine():
+    """
+    Process-wide engine: offline gazetteer first, then Nominatim if allowed.
+    Backends are shared, so their rate budgets hold across all sessions.
+    """
+    backends = [GazetteerBackend()]
+    if ONLINE_GEOCODING:
+        backends.append(NominatimBackend())
+    return GeocodingEngine(backends, cache=get_geocode_cache())
@@ -14,7 +14,8 @@ def render_distribution_views(df):
     viz_type = st.radio(
         "Select Distribution Visualization Type",
         ["Seaborn", "Plotly", "Altair", "Bokeh", "Matplotlib"],
-        help="Choose different visualization libraries to view entity type distribution"
+        help="Choose different visualization libraries to view entity type distribution",
+        key='distribution_viz_type'
     )
     
     st.write("---")
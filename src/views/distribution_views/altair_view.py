@@ -1,6 +1,6 @@
 import streamlit as st
 import altair as alt
-import pandas as pd
+from logic.type_distribution import ALL_COUNTRIES, get_type_distribution
 
 def render_altair_distribution(df):
     """Render entity type distribution using Altair"""
@@ -8,34 +8,14 @@ def render_altair_distribution(df):
     st.write("📊 Declarative visualization with interactive features")
     
     # Prepare data
-    entity_types = df['Natural Person'].apply(lambda x: 'Natural Person' if str(x).lower() == 'yes' else 'Corporate Entity')
-    country_codes = df['Country Code'].fillna('Unknown')
-    
-    # Create DataFrame for visualization
-    plot_df = pd.DataFrame({
-        'Entity Type': entity_types,
-        'Country': country_codes
-    })
-    
-    # Calculate counts and percentages
-    type_counts = plot_df.groupby(['Entity Type', 'Country']).size().reset_index(name='Count')
-    total_by_country = type_counts.groupby('Country')['Count'].sum().reset_index()
-    type_counts = type_counts.merge(total_by_country, on='Country', suffixes=('', '_total'))
-    type_counts['Percentage'] = (type_counts['Count'] / type_counts['Count_total'] * 100).round(1)
+    distribution = get_type_distribution(df)
     
     # Add country filter
-    countries = ['All'] + sorted(type_counts['Country'].unique().tolist())
+    countries = [ALL_COUNTRIES] + distribution.countries
     selected_country = st.selectbox('Select Country', countries)
     
-    # Filter data based on selection
-    if selected_country != 'All':
-        display_df = type_counts[type_counts['Country'] == selected_country]
-    else:
-        # If 'All' is selected, sum up counts across countries
-        display_df = type_counts.groupby('Entity Type')['Count'].sum().reset_index()
-        total = display_df['Count'].sum()
-        display_df['Percentage'] = (display_df['Count'] / total * 100).round(1)
-        display_df['Country'] = 'All Countries'
+    # Counts for the selection, straight from the country x type cube
+    display_df = distribution.table(selected_country)
     
     # Add percentage text to display
     display_df['PercentageLabel'] = display_df['Percentage'].apply(lambda x: f'{x:.1f}%')
@@ -89,7 +69,7 @@ def render_altair_distribution(df):
         width=600,
         height=400,
         title=alt.Title(
-            text=f'Entity Type Distribution {f"in {selected_country}" if selected_country != "All" else ""}',
+            text=f'Entity Type Distribution {f"in {selected_country}" if selected_country != ALL_COUNTRIES else ""}',
             fontSize=16,
             anchor='middle'
         )
@@ -2,10 +2,11 @@ import streamlit as st
 from bokeh.plotting import figure
 from bokeh.models import ColumnDataSource, HoverTool, Label, LabelSet
 from bokeh.palettes import Spectral6
-import pandas as pd
+from logic.type_distribution import ALL_COUNTRIES, get_type_distribution
 import streamlit.components.v1 as components
 from bokeh.embed import file_html
 from bokeh.resources import CDN
+from utils.assets import localize_assets
 
 def render_bokeh_distribution(df):
     """Render entity type distribution using Bokeh"""
@@ -13,37 +14,14 @@ def render_bokeh_distribution(df):
     st.write("📊 Interactive bar chart with tooltips")
     
     # Prepare data
-    entity_types = df['Natural Person'].apply(lambda x: 'Natural Person' if str(x).lower() == 'yes' else 'Corporate Entity')
-    country_codes = df['Country Code'].fillna('Unknown')
-    
-    # Create DataFrame for visualization
-    plot_df = pd.DataFrame({
-        'Entity Type': entity_types,
-        'Country': country_codes
-    })
-    
-    # Calculate counts and percentages
-    type_counts = plot_df.groupby(['Entity Type', 'Country']).size().reset_index(name='Count')
-    total_by_country = type_counts.groupby('Country')['Count'].sum().reset_index()
-    type_counts = type_counts.merge(total_by_country, on='Country', suffixes=('', '_total'))
-    type_counts['Percentage'] = (type_counts['Count'] / type_counts['Count_total'] * 100).round(1)
+    distribution = get_type_distribution(df)
     
     # Add country filter
-    countries = ['All'] + sorted(type_counts['Country'].unique().tolist())
+    countries = [ALL_COUNTRIES] + distribution.countries
     selected_country = st.selectbox('Select Country', countries)
     
-    # Filter data based on selection
-    if selected_country != 'All':
-        display_df = type_counts[type_counts['Country'] == selected_country]
-    else:
-        display_df = type_counts.groupby('Entity Type')['Count'].sum().reset_index()
-        total = display_df['Count'].sum()
-        display_df['Percentage'] = (display_df['Count'] / total * 100).round(1)
-        display_df['Country'] = 'All Countries'
-    
-    # Create color map
-    colors = {'Natural Person': '#ff7f7f', 'Corporate Entity': '#7f7fff'}
-    display_df['color'] = display_df['Entity Type'].map(colors)
+    # Counts for the selection, straight from the country x type cube
+    display_df = distribution.table(selected_country)
     
     # Add label text
     display_df['count_label'] = display_df['Count'].apply(lambda x: f'{x:,}')
@@ -55,7 +33,7 @@ def render_bokeh_distribution(df):
     # Create figure
     p = figure(
         height=500,
-        title=f'Distribution of Entity Types {f"in {selected_country}" if selected_country != "All" else ""}',
+        title=f'Distribution of Entity Types {f"in {selected_country}" if selected_country != ALL_COUNTRIES else ""}',
         toolbar_location='above',
         tools='pan,box_zoom,reset,save',
         x_range=display_df['Entity Type'].tolist(),
@@ -68,7 +46,7 @@ def render_bokeh_distribution(df):
         top='Count',
         width=0.5,
         source=source,
-        color='color',
+        color='Color',
         line_color='white',
         line_width=1
     )
@@ -135,7 +113,7 @@ def render_bokeh_distribution(df):
     st.sidebar.write("- 📸 Download as PNG")
     
     # Display the plot
-    components.html(html, height=600)
+    components.html(localize_assets(html), height=600)
     
     # Display summary statistics
     st.write("### Summary Statistics")
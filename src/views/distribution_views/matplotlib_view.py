@@ -1,7 +1,6 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
+from logic.type_distribution import get_type_distribution
 
 def render_matplotlib_distribution(df):
     """Render entity type distribution using Matplotlib"""
@@ -9,18 +8,18 @@ def render_matplotlib_distribution(df):
     st.write("📊 Basic bar chart with customizations")
     
     # Prepare data
-    entity_types = df['Natural Person'].apply(lambda x: 'Natural Person' if str(x).lower() == 'yes' else 'Corporate Entity')
-    type_counts = entity_types.value_counts()
+    table = get_type_distribution(df).table()
+    total = table['Count'].sum()
     
     # Create figure and axis
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Create bars
     bars = ax.bar(
-        range(len(type_counts)),
-        type_counts.values,
-        color=['#ff7f7f', '#7f7fff'],
-        tick_label=type_counts.index
+        range(len(table)),
+        table['Count'],
+        color=table['Color'],
+        tick_label=table['Entity Type']
     )
     
     # Customize plot
@@ -40,7 +39,7 @@ def render_matplotlib_distribution(df):
             va='bottom'
         )
         # Add percentage label
-        percentage = (height / type_counts.sum()) * 100
+        percentage = (height / total) * 100
         ax.text(
             bar.get_x() + bar.get_width()/2.,
             height/2,
@@ -65,11 +64,7 @@ def render_matplotlib_distribution(df):
     
     # Display summary statistics
     st.write("### Summary Statistics")
-    summary_df = pd.DataFrame({
-        'Entity Type': type_counts.index,
-        'Count': type_counts.values,
-        'Percentage': (type_counts.values / type_counts.sum() * 100).round(1)
-    })
+    summary_df = table[['Entity Type', 'Count', 'Percentage']]
     st.write(summary_df.style.format({
         'Count': '{:,}',
         'Percentage': '{:.1f}%'
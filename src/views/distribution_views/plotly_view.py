@@ -1,7 +1,7 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
+from logic.type_distribution import ALL_COUNTRIES, get_type_distribution
 
 def render_plotly_distribution(df):
     """Render entity type distribution using Plotly"""
@@ -9,26 +9,14 @@ def render_plotly_distribution(df):
     st.write("📊 Interactive bar chart with filtering options")
     
     # Prepare data
-    entity_types = df['Natural Person'].apply(lambda x: 'Natural Person' if str(x).lower() == 'yes' else 'Corporate Entity')
-    country_codes = df['Country Code'].fillna('Unknown')
-    
-    # Create DataFrame for visualization
-    plot_df = pd.DataFrame({
-        'Entity Type': entity_types,
-        'Country': country_codes
-    })
+    distribution = get_type_distribution(df)
     
     # Add country filter
-    countries = ['All'] + sorted(plot_df['Country'].unique().tolist())
+    countries = [ALL_COUNTRIES] + distribution.countries
     selected_country = st.selectbox('Select Country', countries)
     
-    # Filter data based on selection
-    if selected_country != 'All':
-        plot_df = plot_df[plot_df['Country'] == selected_country]
-    
-    # Calculate counts
-    type_counts = plot_df['Entity Type'].value_counts().reset_index()
-    type_counts.columns = ['Entity Type', 'Count']
+    # Counts for the selection, straight from the country x type cube
+    type_counts = distribution.table(selected_country)
     
     # Create bar chart
     fig = go.Figure()
@@ -38,18 +26,18 @@ def render_plotly_distribution(df):
         go.Bar(
             x=type_counts['Entity Type'],
             y=type_counts['Count'],
-            marker_color=['#ff7f7f' if t == 'Natural Person' else '#7f7fff' for t in type_counts['Entity Type']],
+            marker_color=type_counts['Color'],
             text=type_counts['Count'],
             textposition='auto',
             hovertemplate='%{x}<br>Count: %{y}<br>Percentage: %{customdata:.1f}%<extra></extra>',
-            customdata=[(count/type_counts['Count'].sum()*100) for count in type_counts['Count']]
+            customdata=type_counts['Percentage']
         )
     )
     
     # Update layout
     fig.update_layout(
         title={
-            'text': f'Distribution of Entity Types {f"in {selected_country}" if selected_country != "All" else ""}',
+            'text': f'Distribution of Entity Types {f"in {selected_country}" if selected_country != ALL_COUNTRIES else ""}',
             'y': 0.95,
             'x': 0.5,
             'xanchor': 'center',
@@ -85,8 +73,7 @@ def render_plotly_distribution(df):
     
     # Display summary statistics
     st.write("### Summary Statistics")
-    summary_df = type_counts.copy()
-    summary_df['Percentage'] = summary_df['Count'] / summary_df['Count'].sum() * 100
+    summary_df = type_counts[['Entity Type', 'Count', 'Percentage']]
     st.write(summary_df.style.format({
         'Count': '{:,}',
         'Percentage': '{:.1f}%'
@@ -1,7 +1,7 @@
 import streamlit as st
 import seaborn as sns
 import matplotlib.pyplot as plt
-import pandas as pd
+from logic.type_distribution import get_type_distribution
 
 def render_seaborn_distribution(df):
     """Render entity type distribution using Seaborn"""
@@ -9,9 +9,8 @@ def render_seaborn_distribution(df):
     st.write("📊 Statistical visualization with confidence intervals")
     
     # Prepare data
-    entity_types = df['Natural Person'].apply(lambda x: 'Natural Person' if str(x).lower() == 'yes' else 'Corporate Entity')
-    type_counts = entity_types.value_counts().reset_index()
-    type_counts.columns = ['Entity Type', 'Count']
+    table = get_type_distribution(df).table()
+    type_counts = table[['Entity Type', 'Count']]
     
     # Set style
     sns.set_style("whitegrid")
@@ -22,7 +21,9 @@ def render_seaborn_distribution(df):
         data=type_counts,
         x='Entity Type',
         y='Count',
-        palette=['#ff7f7f', '#7f7fff']
+        hue='Entity Type',
+        palette=table['Color'].tolist(),
+        legend=False
     )
     
     # Customize plot
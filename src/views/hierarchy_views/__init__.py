@@ -3,6 +3,8 @@ from .plotly_view import render_plotly_hierarchy
 from .d3_view import render_d3_hierarchy
 from .graphviz_view import render_graphviz_hierarchy
 from .pyecharts_view import render_pyecharts_hierarchy
+from logic.graph_model import get_graph
+from components.entity_search import render_graph_search
 
 def render_hierarchy_views(df):
     """
@@ -10,23 +12,30 @@ def render_hierarchy_views(df):
     """
     import streamlit as st
     
+    # Shared ownership graph, built once per filtered dataset
+    G = get_graph(df)
+    
     # Create tabs for different visualizations
     viz_type = st.radio(
         "Select Visualization Type",
         ["PyVis", "Plotly", "D3.js", "Graphviz", "PyEcharts"],
-        help="Choose different visualization libraries to view the hierarchy"
+        help="Choose different visualization libraries to view the hierarchy",
+        key='hierarchy_viz_type'
     )
     
     st.write("---")
     
+    # Shared entity search: a match narrows the graph to its neighbourhood
+    G = render_graph_search(G, df)
+    
     # Render selected visualization
     if viz_type == "PyVis":
-        render_pyvis_hierarchy(df)
+        render_pyvis_hierarchy(G)
     elif viz_type == "Plotly":
-        render_plotly_hierarchy(df)
+        render_plotly_hierarchy(G)
     elif viz_type == "D3.js":
-        render_d3_hierarchy(df)
+        render_d3_hierarchy(G)
     elif viz_type == "Graphviz":
-        render_graphviz_hierarchy(df)
+        render_graphviz_hierarchy(G)
     else:  # PyEcharts
-        render_pyecharts_hierarchy(df)
+        render_pyecharts_hierarchy(G)
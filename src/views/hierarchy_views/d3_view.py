@@ -1,48 +1,32 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import json
-import pandas as pd
+import numpy as np
+from logic.graph_payload import DECODER_JS, graph_payload, payload_json
+from logic.layout import get_layout
+from utils.assets import localize_assets
 
-def render_d3_hierarchy(df):
+# Pixels between hierarchy levels and between neighbouring entities
+LEVEL_WIDTH = 200
+ROW_HEIGHT = 40
+
+def render_d3_hierarchy(G):
     """
     Render ownership hierarchy using D3.js
     """
-    # Convert data to hierarchical structure
-    def build_tree(df):
-        nodes = {}
-        root = None
-        
-        # First pass: create all nodes
-        for _, row in df.iterrows():
-            node = {
-                'id': row['Entity ID'],
-                'name': row['Name'],
-                'city': row.get('City', 'N/A'),
-                'country': row.get('Country Code', 'N/A'),
-                'is_person': row.get('Natural Person', 'no').lower() == 'yes',
-                'children': []
-            }
-            nodes[row['Entity ID']] = node
-            
-            if pd.isna(row.get('Parent Entity ID')):
-                root = node
-        
-        # Second pass: build relationships
-        for _, row in df.iterrows():
-            if pd.notna(row.get('Parent Entity ID')):
-                parent = nodes.get(row['Parent Entity ID'])
-                if parent:
-                    parent['children'].append(nodes[row['Entity ID']])
-        
-        return root if root else nodes[list(nodes.keys())[0]]
-
-    # Convert data to hierarchical JSON
-    tree_data = build_tree(df)
+    # Positions come from the cached tidy-tree layout, so the browser only draws
+    pos = get_layout(G, 'tree')
+    has_children = np.fromiter((degree > 0 for _, degree in G.out_degree()), dtype=np.uint8, count=len(G))
+    payload = payload_json(graph_payload(G, extra={
+        'x': pos[:, 1] * LEVEL_WIDTH,
+        'y': pos[:, 0] * ROW_HEIGHT,
+        'has_children': has_children,
+    }))
     
-    # Calculate dimensions based on data size
-    node_count = len(df)
-    height = max(600, node_count * 40)
-    width = max(800, node_count * 50)
+    # Calculate dimensions based on the layout extent
+    margin = {'top': 20, 'right': 120, 'bottom': 20, 'left': 120}
+    width = max(800, int(pos[:, 1].max(initial=0)) * LEVEL_WIDTH + margin['left'] + margin['right'])
+    height = max(600, int(pos[:, 0].max(initial=0)) * ROW_HEIGHT + margin['top'] + margin['bottom'])
 
     # D3.js visualization code
     d3_code = f"""
@@ -78,15 +62,17 @@ def render_d3_hierarchy(df):
     <body>
         <div id="tree-container"></div>
         <script>
+            {DECODER_JS}
+            
             // Data
-            const data = {json.dumps(tree_data)};
+            const graph = decodeGraph({payload});
+            const nodes = graph.nodes;
+            const links = graph.links.map(({{source, target}}) => ({{source: nodes[source], target: nodes[target]}}));
             
             // Dimensions
             const width = {width};
             const height = {height};
-            const margin = {{top: 20, right: 120, bottom: 20, left: 120}};
-            const innerWidth = width - margin.left - margin.right;
-            const innerHeight = height - margin.top - margin.bottom;
+            const margin = {json.dumps(margin)};
             
             // Create the SVG container
             const svg = d3.select("#tree-container")
@@ -96,16 +82,6 @@ def render_d3_hierarchy(df):
                 .append("g")
                 .attr("transform", `translate(${{margin.left}},${{margin.top}})`);
             
-            // Create the tree layout
-            const tree = d3.tree()
-                .size([innerHeight, innerWidth]);
-            
-            // Create the root node
-            const root = d3.hierarchy(data);
-            
-            // Generate the tree layout
-            tree(root);
-            
             // Create tooltip
             const tooltip = d3.select("body")
                 .append("div")
@@ -114,32 +90,32 @@ def render_d3_hierarchy(df):
             
             // Add the links
             svg.selectAll(".link")
-                .data(root.links())
+                .data(links)
                 .join("path")
                 .attr("class", "link")
                 .attr("d", d3.linkHorizontal()
-                    .x(d => d.y)
-                    .y(d => d.x));
+                    .x(d => d.x)
+                    .y(d => d.y));
             
             // Add the nodes
-            const nodes = svg.selectAll(".node")
-                .data(root.descendants())
+            const nodeGroups = svg.selectAll(".node")
+                .data(nodes)
                 .join("g")
                 .attr("class", "node")
-                .attr("transform", d => `translate(${{d.y}},${{d.x}})`);
+                .attr("transform", d => `translate(${{d.x}},${{d.y}})`);
             
             // Add circles to nodes
-            nodes.append("circle")
+            nodeGroups.append("circle")
                 .attr("r", 6)
-                .style("stroke", d => d.data.is_person ? "#ff9999" : "#99ccff")
-                .style("fill", d => d.data.is_person ? "#ff9999" : "#99ccff")
+                .style("stroke", d => d.is_person ? "#ff9999" : "#99ccff")
+                .style("fill", d => d.is_person ? "#ff9999" : "#99ccff")
                 .on("mouseover", function(event, d) {{
                     tooltip.transition()
                         .duration(200)
                         .style("opacity", .9);
-                    tooltip.html(`Name: ${{d.data.name}}<br/>` +
-                               `City: ${{d.data.city}}<br/>` +
-                               `Country: ${{d.data.country}}`)
+                    tooltip.html(`Name: ${{d.name}}<br/>` +
+                               `City: ${{d.city}}<br/>` +
+                               `Country: ${{d.country}}`)
                         .style("left", (event.pageX + 10) + "px")
                         .style("top", (event.pageY - 28) + "px");
                 }})
@@ -150,11 +126,11 @@ def render_d3_hierarchy(df):
                 }});
             
             // Add labels to nodes
-            nodes.append("text")
+            nodeGroups.append("text")
                 .attr("dy", ".35em")
-                .attr("x", d => d.children ? -12 : 12)
-                .style("text-anchor", d => d.children ? "end" : "start")
-                .text(d => d.data.name)
+                .attr("x", d => d.has_children ? -12 : 12)
+                .style("text-anchor", d => d.has_children ? "end" : "start")
+                .text(d => d.name)
                 .each(function(d) {{
                     const bbox = this.getBBox();
                     d3.select(this.parentNode)
@@ -187,4 +163,4 @@ def render_d3_hierarchy(df):
     # Display the visualization
     st.write("### D3.js Hierarchy Visualization")
     st.write("🔍 Interactive features: Hover for details, zoom and pan")
-    components.html(d3_code, height=height, width=width)
+    components.html(localize_assets(d3_code), height=height, width=width)
@@ -1,36 +1,43 @@
 import streamlit as st
 import graphviz
 import pandas as pd
+from logic.layout import get_layout
 
-def render_graphviz_hierarchy(df):
+# Inches between neighbouring entities and between hierarchy levels
+COLUMN_WIDTH = 2.5
+LEVEL_HEIGHT = 1.5
+
+def render_graphviz_hierarchy(G):
     """
     Render ownership hierarchy using Graphviz
     """
     # Create a new directed graph
     dot = graphviz.Digraph()
-    dot.attr(rankdir='TB')  # Top to bottom layout
+    # Nodes are pinned to the cached tidy-tree layout; neato only routes the edges
+    dot.attr(layout='neato')
+    pos = get_layout(G, 'tree')
     
-    # Add nodes and edges
-    for _, row in df.iterrows():
+    # Add nodes
+    for (node, data), (x, depth) in zip(G.nodes(data=True), pos):
         # Node attributes
         node_attrs = {
-            'label': f"{row['Name']}\n{row.get('City', 'N/A')}\n{row.get('Country Code', 'N/A')}",
+            'label': f"{data['name']}\n{data['city']}\n{data['country']}",
             'shape': 'box',
             'style': 'filled',
-            'fillcolor': '#ff9999' if row.get('Natural Person', 'no').lower() == 'yes' else '#99ccff',
-            'tooltip': f"Name: {row['Name']}\nCity: {row.get('City', 'N/A')}\nCountry: {row.get('Country Code', 'N/A')}"
+            'fillcolor': '#ff9999' if data['is_person'] else '#99ccff',
+            'tooltip': f"Name: {data['name']}\nCity: {data['city']}\nCountry: {data['country']}",
+            'pos': f"{x * COLUMN_WIDTH:.2f},{-depth * LEVEL_HEIGHT:.2f}!"
+        }
+        dot.node(str(node), **node_attrs)
+    
+    # Add edges
+    for parent, child, share in G.edges(data='share'):
+        share_label = f'{share:g}' if pd.notna(share) else '?'
+        edge_attrs = {
+            'label': f" {share_label}%",
+            'tooltip': f"Ownership: {share_label}%"
         }
-        
-        # Add node
-        dot.node(str(row['Entity ID']), **node_attrs)
-        
-        # Add edge if there's a parent
-        if pd.notna(row.get('Parent Entity ID')):
-            edge_attrs = {
-                'label': f" {row.get('Share', '?')}%",
-                'tooltip': f"Ownership: {row.get('Share', '?')}%"
-            }
-            dot.edge(str(row['Parent Entity ID']), str(row['Entity ID']), **edge_attrs)
+        dot.edge(str(parent), str(child), **edge_attrs)
     
     st.write("### Graphviz Hierarchy Visualization")
     st.write("📊 Clean hierarchical layout with ownership percentages")
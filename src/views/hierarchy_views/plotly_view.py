@@ -1,31 +1,13 @@
 import streamlit as st
-import networkx as nx
 import plotly.graph_objects as go
-import pandas as pd
+from logic.layout import layout_positions
 
-def render_plotly_hierarchy(df):
+def render_plotly_hierarchy(G):
     """
     Render ownership hierarchy using Networkx + Plotly
     """
-    # Create directed graph
-    G = nx.DiGraph()
-    
-    # Add nodes and edges
-    for _, row in df.iterrows():
-        # Add node
-        G.add_node(row['Entity ID'], 
-                  name=row['Name'],
-                  city=row.get('City', 'N/A'),
-                  country=row.get('Country Code', 'N/A'),
-                  is_person=row.get('Natural Person', 'no').lower() == 'yes')
-        
-        # Add edge if there's a parent
-        if pd.notna(row.get('Parent Entity ID')):
-            G.add_edge(row['Parent Entity ID'], row['Entity ID'], 
-                      weight=row.get('Share', 0))
-
-    # Use hierarchical layout
-    pos = nx.spring_layout(G)
+    # Cached tidy-tree layout, top-level owners at the top
+    pos = {node: (x, -depth) for node, (x, depth) in layout_positions(G, 'tree').items()}
     
     # Create edge trace
     edge_x = []
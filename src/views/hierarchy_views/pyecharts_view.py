@@ -1,75 +1,63 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from pyecharts import options as opts
-from pyecharts.charts import Tree
-import pandas as pd
+from pyecharts.charts import Graph
+from logic.layout import get_layout
+from utils.assets import localize_assets
 
-def render_pyecharts_hierarchy(df):
+# Pixels between neighbouring entities and between hierarchy levels
+COLUMN_WIDTH = 60
+LEVEL_HEIGHT = 100
+
+def render_pyecharts_hierarchy(G):
     """
     Render ownership hierarchy using PyEcharts
     """
-    def build_tree(df):
-        nodes = {}
-        root = None
-        
-        # First pass: create all nodes
-        for _, row in df.iterrows():
-            node = {
-                'name': row['Name'],
-                'value': [
-                    row.get('City', 'N/A'),
-                    row.get('Country Code', 'N/A'),
-                    'Natural Person' if row.get('Natural Person', 'no').lower() == 'yes' else 'Corporate Entity'
-                ],
-                'itemStyle': {
-                    'color': '#ff9999' if row.get('Natural Person', 'no').lower() == 'yes' else '#99ccff'
-                },
-                'children': [],
-                'collapsed': False
+    # Nodes are pinned to the cached tidy-tree layout, so ECharts only draws
+    pos = get_layout(G, 'tree')
+    index = {node: i for i, node in enumerate(G)}
+    
+    def make_node(data, x, depth):
+        entity_type = 'Natural Person' if data['is_person'] else 'Corporate Entity'
+        return {
+            'name': data['name'],
+            'x': float(x) * COLUMN_WIDTH,
+            'y': float(depth) * LEVEL_HEIGHT,
+            'itemStyle': {
+                'color': '#ff9999' if data['is_person'] else '#99ccff'
+            },
+            'tooltip': {
+                'formatter': f"Name: {data['name']}<br/>City: {data['city']}<br/>"
+                             f"Country: {data['country']}<br/>Type: {entity_type}"
             }
-            nodes[row['Entity ID']] = node
-            
-            if pd.isna(row.get('Parent Entity ID')):
-                root = node
-        
-        # Second pass: build relationships
-        for _, row in df.iterrows():
-            if pd.notna(row.get('Parent Entity ID')):
-                parent = nodes.get(row['Parent Entity ID'])
-                if parent:
-                    parent['children'].append(nodes[row['Entity ID']])
-        
-        return root if root else nodes[list(nodes.keys())[0]]
-
-    # Build the tree data
-    data = build_tree(df)
+        }
+    
+    # Build the graph data
+    nodes = [make_node(data, x, depth) for (_, data), (x, depth) in zip(G.nodes(data=True), pos)]
+    links = [{'source': index[parent], 'target': index[child]} for parent, child in G.edges()]
     
-    # Calculate appropriate height based on number of nodes
-    num_nodes = len(df)
-    height = max(600, num_nodes * 50)
+    # Calculate appropriate height based on the number of levels
+    height = max(600, (int(pos[:, 1].max(initial=0)) + 1) * LEVEL_HEIGHT)
     
-    # Create the tree chart
-    tree = (
-        Tree(init_opts=opts.InitOpts(width="100%", height=f"{height}px"))
+    # Create the chart
+    chart = (
+        Graph(init_opts=opts.InitOpts(width="100%", height=f"{height}px"))
         .add(
             series_name="",
-            data=[data],
-            pos_top="2%",
-            pos_bottom="2%",
-            pos_left="15%",
-            pos_right="15%",
-            layout="orthogonal",
-            orient="TB",
-            initial_tree_depth=-1,
+            nodes=nodes,
+            links=links,
+            layout="none",
             symbol_size=10,
             is_roam=True,
+            edge_symbol=["none", "arrow"],
+            edge_symbol_size=6,
+            linestyle_opts=opts.LineStyleOpts(color="#ccc", width=1),
             label_opts=opts.LabelOpts(
+                is_show=True,
                 position="right",
-                horizontal_align="left",
-                vertical_align="middle",
+                formatter="{b}",
                 font_size=12,
                 distance=15,
-                rotate=0,
                 font_weight="bold",
                 padding=[5, 7, 5, 7],
                 border_width=1,
@@ -86,13 +74,7 @@ def render_pyecharts_hierarchy(df):
             ),
             tooltip_opts=opts.TooltipOpts(
                 trigger="item",
-                trigger_on="mousemove",
-                formatter="""
-                    Name: {b}<br/>
-                    City: {c0}<br/>
-                    Country: {c1}<br/>
-                    Type: {c2}
-                """
+                trigger_on="mousemove"
             )
         )
     )
@@ -113,7 +95,7 @@ def render_pyecharts_hierarchy(df):
         }}
         </style>
         <div class="chart-container">
-            {tree.render_embed()}
+            {localize_assets(chart.render_embed())}
         </div>
         """,
         height=height
@@ -2,47 +2,65 @@ import streamlit as st
 import streamlit.components.v1 as components
 from pyvis.network import Network
 import pandas as pd
-import tempfile
+from logic.layout import get_layout, graph_fingerprint
+from utils.assets import localize_assets
 
-def render_pyvis_hierarchy(df):
+# Pixels between neighbouring entities and between hierarchy levels
+COLUMN_WIDTH = 150
+LEVEL_HEIGHT = 120
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _pyvis_hierarchy_html(fingerprint, _G):
     """
-    Render ownership hierarchy using PyVis
+    Page of the PyVis hierarchy, generated in memory once per graph
     """
+    G = _G
+    
     # Create a PyVis network
     net = Network(height="600px", width="100%", bgcolor="#ffffff", 
-                 font_color="black", directed=True)
+                 font_color="black", directed=True, cdn_resources="remote")
+    
+    # Nodes are pinned to the cached tidy-tree layout instead of settling
+    # under browser-side physics
+    net.toggle_physics(False)
+    pos = get_layout(G, 'tree')
     
     # Add nodes
-    for _, row in df.iterrows():
+    for (node, data), (x, depth) in zip(G.nodes(data=True), pos):
         # Determine node color based on whether it's a natural person
-        color = "#ff9999" if row.get('Natural Person', 'no').lower() == 'yes' else "#99ccff"
+        color = "#ff9999" if data['is_person'] else "#99ccff"
         
         # Create tooltip
         tooltip = f"""
-        Name: {row['Name']}
-        City: {row.get('City', 'N/A')}
-        Country: {row.get('Country Code', 'N/A')}
+        Name: {data['name']}
+        City: {data['city']}
+        Country: {data['country']}
         """
         
         # Add node
-        net.add_node(row['Entity ID'], 
-                    label=row['Name'], 
+        net.add_node(node, 
+                    label=data['name'], 
                     title=tooltip,
-                    color=color)
-        
-        # Add edge if there's a parent
-        if pd.notna(row.get('Parent Entity ID')):
-            net.add_edge(row['Parent Entity ID'], 
-                        row['Entity ID'],
-                        title=f"Ownership: {row.get('Share', '?')}%")
+                    color=color,
+                    x=float(x) * COLUMN_WIDTH,
+                    y=float(depth) * LEVEL_HEIGHT)
+    
+    # Add edges
+    for parent, child, share in G.edges(data='share'):
+        net.add_edge(parent, 
+                    child,
+                    title=f"Ownership: {f'{share:g}' if pd.notna(share) else '?'}%")
+
+    return net.generate_html()
 
-    # Generate HTML file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp_file:
-        net.save_graph(tmp_file.name)
-        with open(tmp_file.name, 'r', encoding='utf-8') as f:
-            html_data = f.read()
+def render_pyvis_hierarchy(G):
+    """
+    Render ownership hierarchy using PyVis
+    """
+    # Cached page: no temporary file, and reruns reuse the HTML
+    html_data = _pyvis_hierarchy_html(graph_fingerprint(G), G)
 
     # Display the network
     st.write("### PyVis Hierarchy Visualization")
     st.write("🔍 Interactive features: Zoom, drag nodes, hover for details")
-    components.html(html_data, height=600)
+    components.html(localize_assets(html_data), height=600)
@@ -1,33 +1,58 @@
+import time
 import streamlit as st
 import pydeck as pdk
+from utils.geocoding import stream_locations, normalize_location
 
-def render_map_view(filtered_df, get_coordinates):
-    # Prepare data for map
+# Minimum seconds between map redraws while coordinates are still arriving
+REDRAW_INTERVAL = 0.5
+
+def _draw_map(placeholder, filtered_df, location_keys, coordinates):
+    """
+    Draw every row whose location has resolved so far; False if none has
+    """
     map_data = filtered_df.copy()
-    map_data['coordinates'] = map_data['Country Code'].apply(get_coordinates)
-    map_data['lat'] = map_data['coordinates'].apply(lambda x: x[0] if x else None)
-    map_data['lon'] = map_data['coordinates'].apply(lambda x: x[1] if x else None)
+    map_data['lat'] = location_keys.map({key: coords[0] for key, coords in coordinates.items() if coords})
+    map_data['lon'] = location_keys.map({key: coords[1] for key, coords in coordinates.items() if coords})
     map_data = map_data.dropna(subset=['lat', 'lon'])
     
-    if not map_data.empty:
-        # Create map layer
-        layer = pdk.Layer(
-            "ScatterplotLayer",
-            map_data,
-            get_position=["lon", "lat"],
-            get_color=["255 if Natural Person == 'yes' else 0", "255 if Natural Person == 'yes' else 0", "255 if Natural Person != 'yes' else 0"],
-            get_radius=100000,
-            pickable=True
-        )
-        
-        # Set the initial view state
-        view_state = pdk.ViewState(
-            latitude=map_data['lat'].mean(),
-            longitude=map_data['lon'].mean(),
-            zoom=3
-        )
-        
-        # Create and display the deck
-        st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state))
-    else:
-        st.warning("No valid coordinates available for the selected entities.")
\ No newline at end of file
+    if map_data.empty:
+        return False
+    
+    # Create map layer
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        map_data,
+        get_position=["lon", "lat"],
+        get_color=["255 if Natural Person == 'yes' else 0", "255 if Natural Person == 'yes' else 0", "255 if Natural Person != 'yes' else 0"],
+        get_radius=100000,
+        pickable=True
+    )
+    
+    # Set the initial view state
+    view_state = pdk.ViewState(
+        latitude=map_data['lat'].mean(),
+        longitude=map_data['lon'].mean(),
+        zoom=3
+    )
+    
+    # Create and display the deck
+    placeholder.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state))
+    return True
+
+def render_map_view(filtered_df):
+    # Prepare data for map
+    country_codes = filtered_df['Country Code'].astype(str)
+    location_keys = country_codes.map({code: normalize_location(code) for code in country_codes.unique()})
+    placeholder = st.empty()
+    
+    # Redraw progressively while the geocoding engine resolves each distinct country
+    coordinates = {}
+    last_draw = 0.0
+    for location, coords in stream_locations(country_codes.unique()):
+        coordinates[location] = coords
+        if time.monotonic() - last_draw >= REDRAW_INTERVAL:
+            last_draw = time.monotonic()
+            _draw_map(placeholder, filtered_df, location_keys, coordinates)
+    
+    if not _draw_map(placeholder, filtered_df, location_keys, coordinates):
+        placeholder.warning("No valid coordinates available for the selected entities.")
@@ -14,7 +14,8 @@ def render_map_views(df):
     viz_type = st.radio(
         "Select Map Visualization Type",
         ["Folium", "Plotly", "PyDeck", "Leaflet", "Kepler.gl"],
-        help="Choose different visualization libraries to view the geographic distribution"
+        help="Choose different visualization libraries to view the geographic distribution",
+        key='map_viz_type'
     )
     
     st.write("---")
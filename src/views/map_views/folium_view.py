@@ -1,8 +1,9 @@
 import streamlit as st
 import folium
 from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
 import pandas as pd
+from utils.assets import localize_assets
 from utils.geocoding import get_location_data
 
 def render_folium_map(df):
@@ -51,4 +52,6 @@ def render_folium_map(df):
     folium.plugins.Fullscreen().add_to(m)
     
     # Display the map
-    folium_static(m, width=800, height=600)
+    # Embed the page with its Leaflet bundles served locally
+    html = folium.Figure().add_child(m).render()
+    components.html(localize_assets(html), height=610, width=800)
@@ -1,19 +1,16 @@
 import streamlit as st
 import pandas as pd
+from logic.fingerprint import frame_fingerprint
 from utils.geocoding import get_location_data
 import keplergl
+from utils.assets import localize_assets
 
-def render_kepler_map(df):
-    """Render geographic distribution using Kepler.gl"""
-    st.write("### Kepler.gl Map Visualization")
-    st.write("🗺️ Advanced geospatial visualization with multiple layers")
-    
-    # Get location data
-    location_df = get_location_data(df)
-    
-    if location_df.empty:
-        st.warning("No valid location data found.")
-        return
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _kepler_html(fingerprint, _location_df):
+    """
+    Page of the Kepler.gl map, generated in memory once per filtered dataset
+    """
+    location_df = _location_df
     
     # Create Kepler map configuration
     config = {
@@ -111,15 +108,23 @@ def render_kepler_map(df):
     # Create Kepler map
     map_1 = keplergl.KeplerGl(height=600, data={"data": location_df}, config=config)
     
-    # Display the map
-    keplergl.KeplerGl.save_to_html(
-        map_1,
-        file_name='kepler_map.html',
-        read_only=True
-    )
+    # Generate the page in memory
+    html = map_1._repr_html_(read_only=True)
+    return html.decode('utf-8')
+
+def render_kepler_map(df):
+    """Render geographic distribution using Kepler.gl"""
+    st.write("### Kepler.gl Map Visualization")
+    st.write("🗺️ Advanced geospatial visualization with multiple layers")
+    
+    # Get location data
+    location_df = get_location_data(df)
+    
+    if location_df.empty:
+        st.warning("No valid location data found.")
+        return
     
-    # Read the generated HTML and display it
-    with open('kepler_map.html', 'r') as f:
-        html_content = f.read()
+    # Cached page: no file is written, and reruns reuse the HTML
+    html_content = _kepler_html(frame_fingerprint(df), location_df)
     
-    st.components.v1.html(html_content, height=600)
+    st.components.v1.html(localize_assets(html_content), height=600)
\ No newline at end of file
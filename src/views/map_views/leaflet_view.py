@@ -1,7 +1,8 @@
 import streamlit as st
 import folium
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
 from folium.plugins import MarkerCluster, HeatMap, MiniMap
+from utils.assets import localize_assets
 from utils.geocoding import get_location_data
 
 def render_leaflet_map(df):
@@ -111,4 +112,6 @@ def render_leaflet_map(df):
         st.write("- 🗺️ Multiple base maps")
     
     # Display the map
-    folium_static(m, width=800, height=600)
+    # Embed the page with its Leaflet bundles served locally
+    html = folium.Figure().add_child(m).render()
+    components.html(localize_assets(html), height=610, width=800)
@@ -4,30 +4,48 @@ from .d3_network_view import render_d3_network
 from .plotly_network_view import render_plotly_network
 from .pyvis_network_view import render_pyvis_network
 from .networkx_view import render_networkx_network
+from .webgl_network_view import render_webgl_network
+from logic.graph_model import get_graph
+from components.entity_search import render_graph_search
+from components.level_of_detail import render_level_of_detail
 
 def render_network_views(df):
     """Render all available network views"""
     import streamlit as st
     
+    # Shared ownership graph, built once per filtered dataset
+    G = get_graph(df)
+    
     # Create tabs for different visualizations
     viz_type = st.radio(
         "Select Network Visualization Type",
-        ["Plotly", "PyVis", "Cytoscape", "D3.js", "Bokeh", "NetworkX"],
-        help="Choose different visualization libraries to view the entity network"
+        ["Plotly", "PyVis", "Cytoscape", "D3.js", "Bokeh", "NetworkX", "WebGL"],
+        help="Choose different visualization libraries to view the entity network",
+        key='network_viz_type'
     )
     
     st.write("---")
     
+    # Shared entity search: a match narrows the graph to its neighbourhood
+    G = render_graph_search(G, df)
+    
+    # WebGL draws every entity; the other libraries get groups of entities
+    # collapsed into super-nodes once the graph is too large for them
+    if viz_type == "WebGL":
+        render_webgl_network(G)
+        return
+    G = render_level_of_detail(G)
+    
     # Render selected visualization
     if viz_type == "Plotly":
-        render_plotly_network(df)
+        render_plotly_network(G)
     elif viz_type == "PyVis":
-        render_pyvis_network(df)
+        render_pyvis_network(G)
     elif viz_type == "Cytoscape":
-        render_cytoscape_network(df)
+        render_cytoscape_network(G)
     elif viz_type == "D3.js":
-        render_d3_network(df)
+        render_d3_network(G)
     elif viz_type == "Bokeh":
-        render_bokeh_network(df)
+        render_bokeh_network(G)
     else:  # NetworkX
-        render_networkx_network(df)
+        render_networkx_network(G)
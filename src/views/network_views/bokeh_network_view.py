@@ -4,37 +4,21 @@ from bokeh.models import (
     Circle, MultiLine, HoverTool, ResetTool,
     NodesAndLinkedEdges, EdgesAndLinkedNodes
 )
-import networkx as nx
-import pandas as pd
-import numpy as np
 from bokeh.embed import file_html
 from bokeh.resources import CDN
 import streamlit.components.v1 as components
+from logic.layout import layout_positions
+from utils.assets import localize_assets
 
-def render_bokeh_network(df):
+def render_bokeh_network(G):
     """Render network graph using Bokeh"""
     st.write("### Bokeh Network Graph")
     st.write(" Web-ready network graph with advanced interactions")
     
-    # Create graph
-    G = nx.DiGraph()
-    
-    # Add nodes with attributes
-    for _, row in df.iterrows():
-        is_person = row.get('Natural Person', 'no').lower() == 'yes'
-        G.add_node(
-            row['Name'],
-            is_person=is_person,
-            city=row.get('City', 'N/A'),
-            country=row.get('Country Code', 'N/A'),
-            node_color='#ff7f7f' if is_person else '#7f7fff'
-        )
-    
-    # Add edges
-    for _, row in df.iterrows():
-        if pd.notna(row.get('Parent Entity ID')) and row.get('Parent Entity ID') in df.index:
-            parent = df.loc[row['Parent Entity ID']]['Name']
-            G.add_edge(parent, row['Name'])
+    # Node colour is the only attribute Bokeh needs on top of the shared graph
+    G = G.copy()
+    for node, data in G.nodes(data=True):
+        data['node_color'] = '#ff7f7f' if data['is_person'] else '#7f7fff'
     
     # Create plot
     plot = figure(
@@ -52,7 +36,7 @@ def render_bokeh_network(df):
     plot.axis.visible = False
     
     # Create network graph renderer
-    graph_layout = nx.spring_layout(G, k=1/np.sqrt(len(G.nodes())), iterations=50)
+    graph_layout = layout_positions(G)
     graph_renderer = from_networkx(G, graph_layout)
     
     # Configure node appearance
@@ -74,7 +58,7 @@ def render_bokeh_network(df):
     # Add hover tool
     node_hover_tool = HoverTool(
         tooltips=[
-            ('Name', '@index'),
+            ('Name', '@name'),
             ('Type', '@is_person{Natural Person if True else Corporate Entity}'),
             ('City', '@city'),
             ('Country', '@country')
@@ -102,4 +86,4 @@ def render_bokeh_network(df):
     html = file_html(plot, CDN, "Entity Network Graph")
     
     # Display the plot
-    components.html(html, height=600)
+    components.html(localize_assets(html), height=600)
@@ -1,35 +1,15 @@
 import streamlit as st
-import pandas as pd
 import streamlit.components.v1 as components
+from logic.graph_payload import DECODER_JS, graph_payload, payload_json
+from utils.assets import localize_assets
 
-def render_cytoscape_network(df):
+def render_cytoscape_network(G):
     """Render network graph using Cytoscape"""
     st.write("### Cytoscape Network Graph")
     st.write("🔍 Highly interactive graph with advanced layout options")
     
-    # Prepare data for cytoscape
-    nodes = []
-    edges = []
-    
-    # Add nodes
-    for _, row in df.iterrows():
-        is_person = row.get('Natural Person', 'no').lower() == 'yes'
-        nodes.append({
-            'id': row['Name'],
-            'label': row['Name'],
-            'type': 'person' if is_person else 'entity',
-            'city': row.get('City', 'N/A'),
-            'country': row.get('Country Code', 'N/A')
-        })
-    
-    # Add edges
-    for _, row in df.iterrows():
-        if pd.notna(row.get('Parent Entity ID')) and row.get('Parent Entity ID') in df.index:
-            parent = df.loc[row['Parent Entity ID']]['Name']
-            edges.append({
-                'source': parent,
-                'target': row['Name']
-            })
+    # Columnar payload, expanded into Cytoscape elements in the browser
+    payload = payload_json(graph_payload(G))
     
     # Create Cytoscape HTML
     cytoscape_html = f"""
@@ -47,25 +27,30 @@ def render_cytoscape_network(df):
     <body>
         <div id="cy"></div>
         <script>
+            {DECODER_JS}
+            
+            const graph = decodeGraph({payload});
+            const elements = {{
+                nodes: graph.nodes.map(node => ({{
+                    data: {{
+                        id: 'n' + node.index,
+                        label: node.name,
+                        type: node.is_group ? 'group' : node.is_person ? 'person' : 'entity',
+                        city: node.city,
+                        country: node.country
+                    }}
+                }})),
+                edges: graph.links.map(link => ({{
+                    data: {{
+                        source: 'n' + link.source,
+                        target: 'n' + link.target
+                    }}
+                }}))
+            }};
+            
             var cy = cytoscape({{
                 container: document.getElementById('cy'),
-                elements: {{
-                    nodes: {str([{
-                        'data': {
-                            'id': node['id'],
-                            'label': node['label'],
-                            'type': node['type'],
-                            'city': node['city'],
-                            'country': node['country']
-                        }
-                    } for node in nodes])},
-                    edges: {str([{
-                        'data': {
-                            'source': edge['source'],
-                            'target': edge['target']
-                        }
-                    } for edge in edges])}
-                }},
+                elements: elements,
                 style: [
                     {{
                         selector: 'node',
@@ -92,6 +77,13 @@ def render_cytoscape_network(df):
                             'shape': 'rectangle'
                         }}
                     }},
+                    {{
+                        selector: 'node[type = "group"]',
+                        style: {{
+                            'background-color': '#7fbf7f',
+                            'shape': 'round-rectangle'
+                        }}
+                    }},
                     {{
                         selector: 'edge',
                         style: {{
@@ -134,4 +126,4 @@ def render_cytoscape_network(df):
     st.sidebar.write("- 🎮 Double-click to center")
     
     # Display the graph
-    components.html(cytoscape_html, height=600)
+    components.html(localize_assets(cytoscape_html), height=600)
@@ -1,37 +1,15 @@
 import streamlit as st
-import pandas as pd
-import json
 import streamlit.components.v1 as components
+from logic.graph_payload import DECODER_JS, graph_payload, payload_json
+from utils.assets import localize_assets
 
-def render_d3_network(df):
+def render_d3_network(G):
     """Render network graph using D3.js"""
     st.write("### D3.js Network Graph")
     st.write("🔍 Customizable force-directed graph with smooth animations")
     
-    # Prepare data
-    nodes = []
-    links = []
-    
-    # Add nodes
-    for _, row in df.iterrows():
-        is_person = row.get('Natural Person', 'no').lower() == 'yes'
-        nodes.append({
-            'id': row['Name'],
-            'group': 1 if is_person else 2,
-            'city': row.get('City', 'N/A'),
-            'country': row.get('Country Code', 'N/A'),
-            'type': 'Natural Person' if is_person else 'Corporate Entity'
-        })
-    
-    # Add links
-    for _, row in df.iterrows():
-        if pd.notna(row.get('Parent Entity ID')) and row.get('Parent Entity ID') in df.index:
-            parent = df.loc[row['Parent Entity ID']]['Name']
-            links.append({
-                'source': parent,
-                'target': row['Name'],
-                'value': 1
-            })
+    # Columnar payload: string tables and index arrays instead of one object per node
+    payload = payload_json(graph_payload(G))
     
     # Create D3.js visualization
     html = f"""
@@ -62,7 +40,13 @@ def render_d3_network(df):
     </head>
     <body>
         <script>
-            const data = {json.dumps({'nodes': nodes, 'links': links})};
+            {DECODER_JS}
+            
+            const data = decodeGraph({payload});
+            for (const node of data.nodes) {{
+                node.group = node.is_person ? 1 : 2;
+                node.type = node.is_person ? 'Natural Person' : 'Corporate Entity';
+            }}
             
             const width = 800;
             const height = 600;
@@ -72,7 +56,7 @@ def render_d3_network(df):
                 .range(['#ff7f7f', '#7f7fff']);
             
             const simulation = d3.forceSimulation(data.nodes)
-                .force('link', d3.forceLink(data.links).id(d => d.id))
+                .force('link', d3.forceLink(data.links))
                 .force('charge', d3.forceManyBody().strength(-100))
                 .force('center', d3.forceCenter(width / 2, height / 2));
             
@@ -102,7 +86,7 @@ def render_d3_network(df):
                         .duration(200)
                         .style('opacity', .9);
                     tooltip.html(
-                        `<strong>Name:</strong> ${{d.id}}<br>` +
+                        `<strong>Name:</strong> ${{d.name}}<br>` +
                         `<strong>Type:</strong> ${{d.type}}<br>` +
                         `<strong>City:</strong> ${{d.city}}<br>` +
                         `<strong>Country:</strong> ${{d.country}}`
@@ -165,4 +149,4 @@ def render_d3_network(df):
     st.sidebar.write("- 🎨 Smooth force-directed layout")
     
     # Display the graph
-    components.html(html, height=600, width=800)
+    components.html(localize_assets(html), height=600, width=800)
@@ -1,52 +1,26 @@
 import streamlit as st
 import networkx as nx
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 from community import community_louvain
 import io
+from logic.layout import layout_positions
 
-def render_networkx_network(df):
+def render_networkx_network(graph):
     """Render network visualization using NetworkX"""
     st.write("### NetworkX Network Visualization")
     st.write("📊 Interactive network visualization with community detection")
     
-    # Create a new graph
+    # Undirected copy of the shared graph with the attributes this view draws
     G = nx.Graph()
-    
-    # Add nodes with attributes
-    for _, row in df.iterrows():
-        entity_id = row['Entity ID']
-        parent_id = row['Parent Entity ID']
-        
-        # Add entity node
-        if not G.has_node(entity_id):
-            G.add_node(entity_id, 
-                      name=row['Name'],
-                      type='Natural Person' if str(row['Natural Person']).lower() == 'yes' else 'Corporate Entity',
-                      country=row['Country Code'],
-                      size=float(row['Share']) if pd.notna(row['Share']) else 1.0)
-        
-        # Add parent node and edge if parent exists
-        if pd.notna(parent_id):
-            if not G.has_node(parent_id):
-                parent_data = df[df['Entity ID'] == parent_id]
-                if not parent_data.empty:
-                    parent_row = parent_data.iloc[0]
-                    G.add_node(parent_id,
-                              name=parent_row['Name'],
-                              type='Natural Person' if str(parent_row['Natural Person']).lower() == 'yes' else 'Corporate Entity',
-                              country=parent_row['Country Code'],
-                              size=float(parent_row['Share']) if pd.notna(parent_row['Share']) else 1.0)
-                else:
-                    G.add_node(parent_id,
-                              name=f'Entity {parent_id}',
-                              type='Corporate Entity',
-                              country='Unknown',
-                              size=1.0)
-            
-            # Add edge
-            G.add_edge(parent_id, entity_id)
+    for node, data in graph.nodes(data=True):
+        shares = [share for _, _, share in graph.in_edges(node, data='share') if pd.notna(share)]
+        G.add_node(node,
+                  name=data['name'],
+                  type='Natural Person' if data['is_person'] else 'Corporate Entity',
+                  country=data['country'],
+                  size=float(shares[0]) if shares else 1.0)
+    G.add_edges_from(graph.edges())
     
     if len(G.nodes()) == 0:
         st.error("No valid nodes found in the data. Please check the data structure.")
@@ -82,8 +56,8 @@ def render_networkx_network(df):
         st.warning("No nodes match the selected filters.")
         return
     
-    # Layout
-    pos = nx.spring_layout(filtered_G, k=1/np.sqrt(len(filtered_G)), iterations=50)
+    # Layout of the whole graph, so nodes keep their place when filtering
+    pos = layout_positions(graph)
     
     # Create figure
     plt.figure(figsize=(12, 8))
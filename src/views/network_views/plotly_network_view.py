@@ -1,43 +1,23 @@
 import streamlit as st
 import plotly.graph_objects as go
-import networkx as nx
-import pandas as pd
 import numpy as np
+from logic.layout import get_layout
 
-def render_plotly_network(df):
+def render_plotly_network(G):
     """Render network graph using Plotly"""
     st.write("### Plotly Network Graph")
     st.write("🔍 Interactive force-directed graph with hover information")
     
-    # Create graph
-    G = nx.DiGraph()
+    # Cached force-directed positions, one float32 row per node
+    pos = get_layout(G)
+    index = {node: i for i, node in enumerate(G)}
     
-    # Add nodes
-    for _, row in df.iterrows():
-        G.add_node(
-            row['Name'],
-            is_person=row.get('Natural Person', 'no').lower() == 'yes',
-            city=row.get('City', 'N/A'),
-            country=row.get('Country Code', 'N/A')
-        )
-    
-    # Add edges
-    for _, row in df.iterrows():
-        if pd.notna(row.get('Parent Entity ID')) and row.get('Parent Entity ID') in df.index:
-            parent = df.loc[row['Parent Entity ID']]['Name']
-            G.add_edge(parent, row['Name'])
-    
-    # Get node positions using spring layout
-    pos = nx.spring_layout(G, k=1/np.sqrt(len(G.nodes())), iterations=50)
-    
-    # Create edge trace
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
+    # Create edge trace: (x0, x1, NaN) per edge, so each one is a separate line
+    sources = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    targets = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    gaps = np.full(len(sources), np.nan, dtype=np.float32)
+    edge_x = np.column_stack([pos[sources, 0], pos[targets, 0], gaps]).ravel()
+    edge_y = np.column_stack([pos[sources, 1], pos[targets, 1], gaps]).ravel()
     
     edge_trace = go.Scatter(
         x=edge_x, y=edge_y,
@@ -47,18 +27,15 @@ def render_plotly_network(df):
     )
     
     # Create node trace
-    node_x = []
-    node_y = []
+    node_x = pos[:, 0]
+    node_y = pos[:, 1]
     node_colors = []
     node_text = []
     
     for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
         node_colors.append('#ff7f7f' if G.nodes[node]['is_person'] else '#7f7fff')
         node_text.append(
-            f"Name: {node}<br>"
+            f"Name: {G.nodes[node]['name']}<br>"
             f"Type: {'Natural Person' if G.nodes[node]['is_person'] else 'Corporate Entity'}<br>"
             f"City: {G.nodes[node]['city']}<br>"
             f"Country: {G.nodes[node]['country']}"
@@ -1,19 +1,23 @@
 import streamlit as st
 from pyvis.network import Network
-import pandas as pd
 import streamlit.components.v1 as components
+from logic.layout import graph_fingerprint
+from utils.assets import localize_assets
 
-def render_pyvis_network(df):
-    """Render network graph using PyVis"""
-    st.write("### PyVis Network Graph")
-    st.write("🔍 Interactive network with physics simulation")
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _pyvis_html(fingerprint, _G):
+    """
+    Page of the PyVis network, generated in memory once per graph
+    """
+    G = _G
     
     # Initialize network
     net = Network(
         height='600px',
         width='100%',
         bgcolor='#ffffff',
-        font_color='#333333'
+        font_color='#333333',
+        cdn_resources='remote'
     )
     
     # Configure physics
@@ -21,33 +25,45 @@ def render_pyvis_network(df):
     net.show_buttons(filter_=['physics'])
     
     # Add nodes
-    for _, row in df.iterrows():
-        is_person = row.get('Natural Person', 'no').lower() == 'yes'
+    for node, data in G.nodes(data=True):
+        is_person = data['is_person']
+        if data.get('is_group'):
+            # Super-node of a level-of-detail graph
+            net.add_node(
+                node,
+                label=data['name'],
+                title=f"Group: {data['name']}<br>Entities: {data['size']:,}<br>Country: {data['country']}",
+                color='#7fbf7f',
+                shape='box',
+                size=20
+            )
+            continue
         net.add_node(
-            row['Name'],
-            label=row['Name'],
+            node,
+            label=data['name'],
             title=(
-                f"Name: {row['Name']}<br>"
+                f"Name: {data['name']}<br>"
                 f"Type: {'Natural Person' if is_person else 'Corporate Entity'}<br>"
-                f"City: {row.get('City', 'N/A')}<br>"
-                f"Country: {row.get('Country Code', 'N/A')}"
+                f"City: {data['city']}<br>"
+                f"Country: {data['country']}"
             ),
             color='#ff7f7f' if is_person else '#7f7fff',
             size=20
         )
     
     # Add edges
-    for _, row in df.iterrows():
-        if pd.notna(row.get('Parent Entity ID')) and row.get('Parent Entity ID') in df.index:
-            parent = df.loc[row['Parent Entity ID']]['Name']
-            net.add_edge(parent, row['Name'], color='#888888')
+    for parent, child in G.edges():
+        net.add_edge(parent, child, color='#888888')
     
-    # Generate HTML file
-    net.save_graph('network.html')
+    return localize_assets(net.generate_html())
+
+def render_pyvis_network(G):
+    """Render network graph using PyVis"""
+    st.write("### PyVis Network Graph")
+    st.write("🔍 Interactive network with physics simulation")
     
-    # Read the file
-    with open('network.html', 'r', encoding='utf-8') as f:
-        html = f.read()
+    # Cached page: no file is written, and reruns reuse the HTML
+    html = _pyvis_html(graph_fingerprint(G), G)
     
     # Display controls
     st.sidebar.write("### Graph Controls")
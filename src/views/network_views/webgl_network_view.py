@@ -0,0 +1,146 @@
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+from logic.graph_payload import DECODER_JS, graph_payload, payload_json
+from logic.layout import get_layout, graph_fingerprint
+from utils.assets import localize_assets
+
+# Layout units per unit of the [-1, 1] force layout, so the whole graph fits at zoom 0
+SCALE = 250
+
+PERSON_COLOR = [255, 127, 127, 220]
+ENTITY_COLOR = [127, 127, 255, 220]
+GROUP_COLOR = [127, 191, 127, 220]
+
+@st.cache_data(max_entries=8, show_spinner="Packing graph...")
+def _webgl_payload(fingerprint, _G):
+    """
+    Binary graph payload with the cached force layout and node colours as
+    extra (n, 2) and (n, 4) columns
+    """
+    G = _G
+    kind = np.fromiter(
+        (2 if data.get('is_group') else 1 if data['is_person'] else 0 for _, data in G.nodes(data=True)),
+        dtype=np.uint8, count=len(G)
+    )
+    colors = np.array([ENTITY_COLOR, PERSON_COLOR, GROUP_COLOR], dtype=np.uint8)[kind]
+    return payload_json(graph_payload(G, extra={'position': get_layout(G) * SCALE, 'color': colors}, binary=True))
+
+def render_webgl_network(G):
+    """Render network graph with deck.gl (WebGL)"""
+    st.write("### WebGL Network Graph")
+    st.write("🚀 GPU-rendered graph for large registers: every entity, at interactive frame rates")
+
+    if len(G) == 0:
+        st.warning("No entities to display.")
+        return
+
+    payload = _webgl_payload(graph_fingerprint(G), G)
+
+    # Point sizes
+    radius = st.sidebar.slider("Node size (px)", 1, 10, 3, key='webgl_radius')
+
+    # Create deck.gl visualization: the payload's typed arrays are handed to
+    # the layers as binary attributes, so no per-node objects are created
+    page = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <script src="https://unpkg.com/deck.gl@8.9.35/dist.min.js"></script>
+        <style>
+            body {{ margin: 0; }}
+            #graph {{
+                position: relative;
+                width: 100%;
+                height: 600px;
+                background: #ffffff;
+            }}
+        </style>
+    </head>
+    <body>
+        <div id="graph"></div>
+        <script>
+            {DECODER_JS}
+            
+            const graph = decodeGraph({payload});
+            const columns = graph.columns;
+            const position = columns.position;
+            
+            // Edge end points from the node positions
+            const source = new Float32Array(2 * graph.source.length);
+            const target = new Float32Array(2 * graph.target.length);
+            for (let i = 0; i < graph.source.length; i++) {{
+                source[2 * i] = position[2 * graph.source[i]];
+                source[2 * i + 1] = position[2 * graph.source[i] + 1];
+                target[2 * i] = position[2 * graph.target[i]];
+                target[2 * i + 1] = position[2 * graph.target[i] + 1];
+            }}
+            
+            function escapeHtml(text) {{
+                const element = document.createElement('span');
+                element.textContent = text;
+                return element.innerHTML;
+            }}
+            
+            function type(index) {{
+                if (columns.is_group[index]) return 'Group';
+                return columns.is_person[index] ? 'Natural Person' : 'Corporate Entity';
+            }}
+            
+            const edges = new deck.LineLayer({{
+                id: 'edges',
+                data: {{
+                    length: graph.source.length,
+                    attributes: {{
+                        getSourcePosition: {{value: source, size: 2}},
+                        getTargetPosition: {{value: target, size: 2}}
+                    }}
+                }},
+                getColor: [136, 136, 136, 90],
+                getWidth: 1,
+                widthUnits: 'pixels'
+            }});
+
+            const nodes = new deck.ScatterplotLayer({{
+                id: 'nodes',
+                data: {{
+                    length: graph.nodes.length,
+                    attributes: {{
+                        getPosition: {{value: position, size: 2}},
+                        getFillColor: {{value: columns.color, size: 4, normalized: true}}
+                    }}
+                }},
+                getRadius: {radius},
+                radiusUnits: 'pixels',
+                pickable: true,
+                autoHighlight: true,
+                highlightColor: [255, 200, 0, 255]
+            }});
+
+            new deck.DeckGL({{
+                container: 'graph',
+                views: new deck.OrthographicView({{id: 'graph'}}),
+                initialViewState: {{target: [0, 0, 0], zoom: 0, minZoom: -4, maxZoom: 12}},
+                controller: true,
+                layers: [edges, nodes],
+                getTooltip: ({{index, layer}}) => layer && layer.id === 'nodes' && index >= 0 && {{
+                    html: '<b>' + escapeHtml(columns.name[index]) + '</b><br>' +
+                          'Type: ' + type(index) + '<br>' +
+                          'City: ' + escapeHtml(columns.city[index]) + '<br>' +
+                          'Country: ' + escapeHtml(columns.country[index]),
+                    style: {{backgroundColor: 'white', color: 'black', fontSize: '12px'}}
+                }}
+            }});
+        </script>
+    </body>
+    </html>
+    """
+
+    # Display controls
+    st.sidebar.write("### Graph Controls")
+    st.sidebar.write("- 🖱️ Drag to pan")
+    st.sidebar.write("- 🔍 Scroll to zoom")
+    st.sidebar.write("- 👆 Hover for details")
+
+    # Display the graph
+    components.html(localize_assets(page), height=600)
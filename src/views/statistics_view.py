@@ -1,20 +1,21 @@
 import streamlit as st
+from logic.aggregate_cube import aggregate
 
 def render_statistics_view(filtered_df):
-    # Add statistical visualizations
+    # Add statistical visualizations; every chart is answered from the
+    # dataset's aggregate cube rather than by rescanning the rows
     st.subheader("Ownership Statistics")
     
     # Ownership distribution by country
     st.write("### Ownership Distribution by Country")
-    country_ownership = filtered_df.groupby('Country Code')['Share'].sum()
+    country_ownership = aggregate(filtered_df, ['country'])['Share']
     st.bar_chart(country_ownership)
     
     # Entity type distribution
+    by_type = aggregate(filtered_df, ['type'])
     st.write("### Entity Type Distribution")
-    entity_types = filtered_df['Natural Person'].value_counts()
-    st.bar_chart(entity_types)
+    st.bar_chart(by_type['Count'])
     
     # Average ownership by entity type
     st.write("### Average Ownership by Entity Type")
-    avg_ownership = filtered_df.groupby('Natural Person')['Share'].mean()
-    st.bar_chart(avg_ownership)
\ No newline at end of file
+    st.bar_chart(by_type['Mean Share'])
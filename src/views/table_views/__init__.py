@@ -1,7 +1,9 @@
+from .paginated_view import render_paginated_table
 from .aggrid_view import render_aggrid_table
 from .dash_view import render_dash_table
 from .plotly_view import render_plotly_table
 from .ipywidgets_view import render_ipywidgets_table
+from components.entity_search import render_entity_search
 
 def render_table_views(df):
     """
@@ -12,13 +14,23 @@ def render_table_views(df):
     # Create tabs for different visualizations
     viz_type = st.radio(
         "Select Table Visualization Type",
-        ["AgGrid", "Dash", "Plotly", "IPyWidgets"],
-        help="Choose different libraries for interactive data tables"
+        ["Paginated", "AgGrid", "Dash", "Plotly", "IPyWidgets"],
+        help="Choose different libraries for interactive data tables",
+        key='table_viz_type'
     )
     
     st.write("---")
     
-    # Render selected visualization
+    # Shared entity search, answered from the dataset's search index
+    matches = render_entity_search(df)
+    
+    # Render selected visualization; the paginated table narrows its own
+    # server-side selection, the others get the matching rows
+    if viz_type == "Paginated":
+        render_paginated_table(df, matches)
+        return
+    if matches is not None:
+        df = df.iloc[matches]
     if viz_type == "AgGrid":
         render_aggrid_table(df)
     elif viz_type == "Dash":
@@ -1,6 +1,7 @@
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
 import pandas as pd
+from logic.table_index import format_share
 
 def render_aggrid_table(df):
     """Render interactive table using Streamlit-AgGrid"""
@@ -11,7 +12,7 @@ def render_aggrid_table(df):
     df_display = df.copy()
     
     # Format Share column
-    df_display['Share'] = df_display['Share'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
+    df_display['Share'] = format_share(df_display['Share'])
     
     # Create GridOptionsBuilder
     gb = GridOptionsBuilder.from_dataframe(df_display)
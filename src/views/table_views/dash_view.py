@@ -1,10 +1,10 @@
 import streamlit as st
 from dash import Dash, dash_table
-import pandas as pd
 from dash import html
 import dash_core_components as dcc
 from dash.dependencies import Input, Output
 import plotly.graph_objects as go
+from logic.table_index import format_share
 
 def render_dash_table(df):
     """Render interactive table using Dash DataTable"""
@@ -14,8 +14,11 @@ def render_dash_table(df):
     # Create a copy of the dataframe
     df_display = df.copy()
     
+    # Plotly compares cell values by truthiness, which pd.NA does not support
+    df_display = df_display.astype(object).where(df_display.notna(), None)
+    
     # Format Share column
-    df_display['Share'] = df_display['Share'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
+    df_display['Share'] = format_share(df_display['Share'])
     
     # Create table using Plotly's Figure
     fig = go.Figure(
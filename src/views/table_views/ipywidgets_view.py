@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from logic.table_index import format_share
 
 def render_ipywidgets_table(df):
     """Render interactive table using Streamlit widgets"""
@@ -11,7 +12,7 @@ def render_ipywidgets_table(df):
     
     # Format Share column - convert to numeric first
     df_display['Share'] = pd.to_numeric(df_display['Share'], errors='coerce')
-    df_display['Share'] = df_display['Share'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
+    df_display['Share'] = format_share(df_display['Share'])
     
     # Create filters
     st.sidebar.write("### Filters")
@@ -59,12 +60,6 @@ def render_ipywidgets_table(df):
     st.sidebar.write("- 📊 Real-time updates")
     st.sidebar.write("- 📈 Summary statistics")
     
-    # Add search functionality
-    search_term = st.text_input("Search in any column", "")
-    if search_term:
-        mask = filtered_df.astype(str).apply(lambda x: x.str.contains(search_term, case=False)).any(axis=1)
-        filtered_df = filtered_df[mask]
-    
     # Display the filtered dataframe
     st.dataframe(filtered_df, height=400, use_container_width=True)
     
@@ -0,0 +1,72 @@
+import math
+import numpy as np
+import streamlit as st
+from logic.table_index import get_table_index
+from components.widget_state import drop_stale_choice
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+# Entity type filter and the Natural Person value it selects
+ENTITY_TYPE_VALUES = {'Natural Person': 'yes', 'Corporate Entity': 'no'}
+
+def render_paginated_table(df, matches=None):
+    """
+    Render a server-side paginated table: only the visible page leaves the
+    server. matches, if given, are the positions of the rows an entity
+    search found; the table shows only those.
+    """
+    st.write("### Paginated Table")
+    st.write("📊 Filtering, sorting and paging run on the server, so large registers stay responsive")
+
+    index = get_table_index(df)
+
+    # Filters
+    countries = ['All'] + index.labels('Country Code')
+    cities = ['All'] + index.labels('City') if 'City' in df.columns else ['All']
+    drop_stale_choice('table_country', countries)
+    drop_stale_choice('table_city', cities)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        country = st.selectbox('Country', countries, key='table_country')
+    with col2:
+        city = st.selectbox('City', cities, key='table_city') if 'City' in df.columns else 'All'
+    with col3:
+        entity_type = st.selectbox('Entity Type', ['All'] + list(ENTITY_TYPE_VALUES), key='table_type')
+
+    share_range = st.slider('Share %', 0.0, 100.0, (0.0, 100.0), step=0.5, key='table_share_range')
+
+    equals = {}
+    if country != 'All':
+        equals['Country Code'] = country
+    if city != 'All':
+        equals['City'] = city
+    if entity_type != 'All':
+        equals['Natural Person'] = ENTITY_TYPE_VALUES[entity_type]
+
+    # Sorting
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox('Sort by', ['(register order)'] + list(df.columns), key='table_sort')
+    with col2:
+        descending = st.toggle('Descending', key='table_descending')
+    with col3:
+        page_size = st.selectbox('Rows per page', PAGE_SIZES, index=1, key='table_page_size')
+
+    rows = index.rows(
+        equals=equals,
+        share_range=None if share_range == (0.0, 100.0) else share_range,
+        sort_by=None if sort_by == '(register order)' else sort_by,
+        ascending=not descending
+    )
+    if matches is not None:
+        rows = rows[np.isin(rows, matches)]
+
+    # Paging
+    n_pages = max(math.ceil(len(rows) / page_size), 1)
+    page = st.number_input('Page', min_value=1, max_value=n_pages, value=1, step=1, key='table_page')
+    page = min(int(page), n_pages) - 1
+
+    st.dataframe(index.page(rows, page, page_size), hide_index=True, use_container_width=True)
+    first = page * page_size + 1 if len(rows) else 0
+    last = min((page + 1) * page_size, len(rows))
+    st.caption(f"Rows {first:,}–{last:,} of {len(rows):,} (page {page + 1:,} of {n_pages:,})")
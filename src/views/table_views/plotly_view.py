@@ -1,6 +1,6 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
+from logic.table_index import format_share
 
 def render_plotly_table(df):
     """Render interactive table using Plotly Table"""
@@ -11,7 +11,7 @@ def render_plotly_table(df):
     df_display = df.copy()
     
     # Format Share column
-    df_display['Share'] = df_display['Share'].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else "N/A")
+    df_display['Share'] = format_share(df_display['Share'])
     
     # Add filters
     st.sidebar.write("### Filters")
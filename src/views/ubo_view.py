@@ -0,0 +1,93 @@
+import streamlit as st
+from logic.filter_engine import filter_state
+from logic.graph_model import get_graph
+from logic.ubo import DEFAULT_UBO_THRESHOLD, get_ubo_index
+from components.widget_state import drop_stale_choice
+
+MAX_LISTED_CYCLES = 100
+
+def _names(G, ids):
+    return [G.nodes[node]['name'] for node in ids]
+
+def render_ubo_view(filtered_df):
+    # Ultimate beneficial owners from effective (indirect) ownership. The
+    # sidebar filters would cut ownership chains and drop persons, so the
+    # index covers the whole dataset and the filters only select which
+    # corporate entities are listed
+    st.subheader("Ultimate Beneficial Owners")
+
+    state = filter_state(filtered_df)
+    dataset = state[0] if state is not None else filtered_df
+    G = get_graph(dataset)
+    index = get_ubo_index(G)
+    shown = set(filtered_df['Entity ID'].tolist())
+
+    threshold = st.slider(
+        "UBO threshold (effective share %)",
+        0.0, 100.0, DEFAULT_UBO_THRESHOLD, step=0.5,
+        key='ubo_threshold'
+    )
+
+    # Screening summary
+    ubos = index.all_ubos(threshold)
+    ubos = ubos[ubos['Entity ID'].isin(shown)].reset_index(drop=True)
+    without_ubo = [entity for entity in index.entities_without_ubo(threshold) if entity in shown]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("UBO relationships", f"{len(ubos):,}")
+    col2.metric("Entities without UBO", f"{len(without_ubo):,}")
+    col3.metric("Cross-holding cycles", f"{len(index.cycles):,}")
+
+    # Lookups
+    mode = st.radio(
+        "Look up",
+        ["UBOs of an entity", "Holdings of a person"],
+        horizontal=True,
+        key='ubo_mode'
+    )
+    if mode == "UBOs of an entity":
+        entities = [node for node, is_person in G.nodes(data='is_person') if not is_person and node in shown]
+        drop_stale_choice('ubo_entity', entities)
+        entity = st.selectbox(
+            "Entity",
+            entities,
+            format_func=lambda node: f"{G.nodes[node]['name']} ({node})",
+            key='ubo_entity'
+        )
+        if entity is not None:
+            found = index.ubos_of(entity, threshold)
+            st.dataframe(
+                {'Person ID': [node for node, _ in found],
+                 'Person': _names(G, [node for node, _ in found]),
+                 'Effective Share': [share for _, share in found]},
+                use_container_width=True
+            )
+    else:
+        persons = [node for node, is_person in G.nodes(data='is_person') if is_person]
+        drop_stale_choice('ubo_person', persons)
+        person = st.selectbox(
+            "Person",
+            persons,
+            format_func=lambda node: f"{G.nodes[node]['name']} ({node})",
+            key='ubo_person'
+        )
+        if person is not None:
+            found = [(entity, share) for entity, share in index.entities_of(person, threshold) if entity in shown]
+            st.dataframe(
+                {'Entity ID': [node for node, _ in found],
+                 'Entity': _names(G, [node for node, _ in found]),
+                 'Effective Share': [share for _, share in found]},
+                use_container_width=True
+            )
+
+    # All UBO relationships above the threshold
+    st.write("### All UBO Relationships")
+    ubos.insert(1, 'Entity', _names(G, ubos['Entity ID']))
+    ubos.insert(3, 'Person', _names(G, ubos['Person ID']))
+    st.dataframe(ubos, use_container_width=True, hide_index=True)
+
+    if index.cycles:
+        with st.expander(f"Cross-holding cycles ({len(index.cycles):,})"):
+            for cycle in index.cycles[:MAX_LISTED_CYCLES]:
+                st.write(", ".join(_names(G, cycle)))
+            if len(index.cycles) > MAX_LISTED_CYCLES:
+                st.caption(f"First {MAX_LISTED_CYCLES} of {len(index.cycles):,} cycles shown")
@@ -0,0 +1,79 @@
+import io
+import os
+import pandas as pd
+import pytest
+from logic.data_processor import build_graph, load_data, normalize_register, update_graph
+from logic.export import write_export
+from logic.register_diff import diff_registers
+from utils import cache_dir as cache_dir_module
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Testdata_ToiToi.xlsx')
+
+class Upload(io.BytesIO):
+    """
+    Stand-in for Streamlit's UploadedFile. The name is the full path:
+    Streamlit hashes a named file object by reading that file.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            super().__init__(f.read())
+        self.name = path
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    # The cache root is read when utils.cache_dir is imported
+    monkeypatch.setattr(cache_dir_module, 'CACHE_ROOT', str(tmp_path))
+    return tmp_path
+
+@pytest.mark.parametrize('column, value', [('Share', 1.0), ('Name', 'x'), ('Natural Person', 'yes'), ('Country Code', 'DE')])
+def test_loaded_frame_refuses_writes(cache_dir, column, value):
+    # Once from the workbook, once from its Parquet sidecar
+    for sidecars in (0, 1):
+        assert len(list(cache_dir.glob('ingest/*.parquet'))) == sidecars
+        df = load_data(Upload(SAMPLE))
+        before = df[column].iloc[0]
+        with pytest.raises(ValueError):
+            df.loc[df.index[0], column] = value
+        assert df[column].iloc[0] == before
+        df.iloc[:5].copy().loc[df.index[0], column] = value
+
+@pytest.mark.parametrize('name', ['Parquet', 'Arrow IPC'])
+def test_export_loads_back(cache_dir, name):
+    df = load_data(Upload(SAMPLE))
+    export = write_export(df.iloc[:50], name)
+
+    loaded = load_data(Upload(export))
+
+    assert loaded['Entity ID'].tolist() == df['Entity ID'].iloc[:50].tolist()
+    assert loaded['Country Code'].tolist() == df['Country Code'].iloc[:50].tolist()
+    assert loaded['Share'].tolist() == df['Share'].iloc[:50].tolist()
+
+def test_share_unit_is_kept_per_choice(cache_dir):
+    # The sample stores fractions; each unit choice gets a sidecar of its own
+    for _ in range(2):
+        detected = load_data(Upload(SAMPLE))
+        percent = load_data(Upload(SAMPLE), 'percent')
+        assert detected.attrs == {'share_unit': 'fraction', 'share_unit_detected': True}
+        assert percent.attrs == {'share_unit': 'percent', 'share_unit_detected': False}
+        assert percent['Share'].max() <= 1 < detected['Share'].max()
+    assert len(list(cache_dir.glob('ingest/*.parquet'))) == 2
+
+def test_update_graph_matches_fresh_build():
+    register = normalize_register(pd.read_excel(SAMPLE, engine='openpyxl'))
+    entity_ids = register['Entity ID'].drop_duplicates()
+    # Drop some entities, change the share of others and add one
+    revised = register[~register['Entity ID'].isin(entity_ids.iloc[5:10])].copy()
+    revised.loc[revised['Entity ID'].isin(entity_ids.iloc[20:25]), 'Share'] = 12.5
+    added = revised.iloc[[-1]].assign(**{'Entity ID': 'NEW-1'}).astype(revised.dtypes)
+    revised = pd.concat([revised, added], ignore_index=True)
+    G = build_graph(register)
+    edges = set(G.edges(data='share'))
+
+    H = update_graph(G, revised, diff_registers(register, revised))
+    fresh = build_graph(revised)
+
+    assert dict(H.nodes(data=True)) == dict(fresh.nodes(data=True))
+    assert set(H.edges(data='share')) == set(fresh.edges(data='share'))
+    assert set(H.pred[added['Entity ID'].iloc[0]]) == set(fresh.pred[added['Entity ID'].iloc[0]])
+    assert set(G.edges(data='share')) == edges
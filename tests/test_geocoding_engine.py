@@ -0,0 +1,71 @@
+import asyncio
+import time
+from utils import geocode_cache
+from utils.geocode_cache import GeocodeCache, STATUS_ERROR, STATUS_NOT_FOUND, STATUS_OK
+from utils.geocoding_engine import GeocodingEngine, MockBackend
+
+BERLIN = (52.52, 13.405)
+
+def _resolve(engine, locations):
+    return dict(engine.iter_stream(locations))
+
+def _resolve_one(engine, location):
+    return asyncio.run(engine.resolve(location))
+
+def test_rate_limit_spaces_lookups():
+    backend = MockBackend({f'City {i}, DE': (float(i), 0.0) for i in range(5)}, rate=20)
+    engine = GeocodingEngine([backend], concurrency=5)
+
+    resolved = _resolve(engine, [f'City {i}, DE' for i in range(5)])
+
+    assert len(resolved) == 5
+    times = sorted(at for _, at in backend.calls)
+    # One token up front, then one every 1/20 s
+    assert times[-1] - times[0] >= 4 / 20 * 0.9
+
+def test_transient_errors_are_retried():
+    backend = MockBackend({'Berlin, DE': BERLIN}, errors={'Berlin, DE': 2})
+    engine = GeocodingEngine([backend], max_retries=3, retry_delay=0.01)
+
+    assert _resolve(engine, ['Berlin, DE']) == {'berlin, de': BERLIN}
+    assert len(backend.calls) == 3
+
+def test_retries_give_up_and_fall_through():
+    failing = MockBackend({'Berlin, DE': BERLIN}, errors={'Berlin, DE': 5})
+    fallback = MockBackend({'Berlin, DE': BERLIN})
+    engine = GeocodingEngine([failing, fallback], max_retries=2, retry_delay=0.01)
+
+    assert _resolve_one(engine, 'berlin, de') == (BERLIN, STATUS_OK)
+    assert len(failing.calls) == 2 and len(fallback.calls) == 1
+
+def test_duplicates_are_looked_up_once():
+    backend = MockBackend({'Berlin, DE': BERLIN})
+    engine = GeocodingEngine([backend])
+
+    assert _resolve(engine, ['Berlin, DE', ' berlin ,de', 'BERLIN, DE']) == {'berlin, de': BERLIN}
+    assert len(backend.calls) == 1
+
+def test_negative_results_expire(tmp_path, monkeypatch):
+    cache = GeocodeCache(str(tmp_path / 'geocode.sqlite3'), negative_ttl={STATUS_NOT_FOUND: 60, STATUS_ERROR: 5})
+    backend = MockBackend({'Berlin, DE': BERLIN}, errors={'Atlantis, XX': 1})
+    engine = GeocodingEngine([backend], cache=cache, max_retries=1)
+    now = time.time()
+    monkeypatch.setattr(geocode_cache.time, 'time', lambda: now)
+
+    assert _resolve(engine, ['Berlin, DE', 'Nowhere, XX', 'Atlantis, XX']) == {
+        'berlin, de': BERLIN, 'nowhere, xx': None, 'atlantis, xx': None
+    }
+    assert len(backend.calls) == 3
+
+    # Within their TTLs the cached misses are served without a lookup
+    _resolve(engine, ['Berlin, DE', 'Nowhere, XX', 'Atlantis, XX'])
+    assert len(backend.calls) == 3
+
+    # The error expires first, then the miss; hits never do
+    monkeypatch.setattr(geocode_cache.time, 'time', lambda: now + 10)
+    _resolve(engine, ['Berlin, DE', 'Nowhere, XX', 'Atlantis, XX'])
+    assert [location for location, _ in backend.calls[3:]] == ['atlantis, xx']
+
+    monkeypatch.setattr(geocode_cache.time, 'time', lambda: now + 120)
+    _resolve(engine, ['Berlin, DE', 'Nowhere, XX', 'Atlantis, XX'])
+    assert sorted(location for location, _ in backend.calls[4:]) == ['atlantis, xx', 'nowhere, xx']
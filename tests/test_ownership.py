@@ -0,0 +1,60 @@
+import os
+import networkx as nx
+import pandas as pd
+import pytest
+from logic.data_processor import build_graph, normalize_register
+from logic.ownership import DEFAULT_THRESHOLD, effective_ownership
+from logic.ubo import build_ubo_index
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Testdata_ToiToi.xlsx')
+
+@pytest.fixture(scope='module')
+def sample_graph():
+    return build_graph(normalize_register(pd.read_excel(SAMPLE, engine='openpyxl')))
+
+def test_fraction_shares_become_percent():
+    df = normalize_register(pd.DataFrame({
+        'Entity ID': [1, 2, 3], 'Name': ['A', 'B', 'C'], 'Country Code': ['DE'] * 3,
+        'Natural Person': ['yes', 'no', 'no'], 'Parent Entity ID': [None, 1, 2], 'Share': [None, 1.0, 0.25],
+    }))
+    assert df['Share'].tolist() == [0.0, 100.0, 25.0]
+    assert df.attrs == {'share_unit': 'fraction', 'share_unit_detected': True}
+
+def test_explicit_percent_keeps_small_shares():
+    df = normalize_register(pd.DataFrame({
+        'Entity ID': [1, 2, 3], 'Name': ['A', 'B', 'C'], 'Country Code': ['DE'] * 3,
+        'Natural Person': ['yes', 'no', 'no'], 'Parent Entity ID': [None, 1, 2], 'Share': [None, 0.5, 0.25],
+    }), share_unit='percent')
+    assert df['Share'].tolist() == [0.0, 0.5, 0.25]
+    assert df.attrs == {'share_unit': 'percent', 'share_unit_detected': False}
+
+def test_percent_shares_unchanged():
+    df = normalize_register(pd.DataFrame({
+        'Entity ID': [1, 2], 'Name': ['A', 'B'], 'Country Code': ['DE'] * 2,
+        'Natural Person': ['yes', 'no'], 'Parent Entity ID': [None, 1], 'Share': [None, 60.0],
+    }))
+    assert df['Share'].tolist() == [0.0, 60.0]
+
+def test_sample_effective_ownership_follows_deep_chains(sample_graph):
+    # The sample stores shares as fractions and is nine levels deep: every
+    # owner/descendant pair joined by a path above the threshold is found
+    ownership = effective_ownership(sample_graph)
+    held = set(zip(ownership.to_frame()['Owner ID'], ownership.to_frame()['Entity ID']))
+    expected = set()
+    for owner in sample_graph:
+        for entity in nx.descendants(sample_graph, owner):
+            for path in nx.all_simple_paths(sample_graph, owner, entity):
+                product = 1.0
+                for u, v in zip(path, path[1:]):
+                    product *= sample_graph.edges[u, v]['share'] / 100
+                if product >= DEFAULT_THRESHOLD:
+                    expected.add((owner, entity))
+                    break
+    assert len(expected) > 400
+    assert expected <= held
+
+def test_sample_person_holding(sample_graph):
+    # John Smith (P1) holds 0.31 % of entity 27, stored as 0.0031
+    ubos = build_ubo_index(sample_graph).all_ubos(threshold=0.3)
+    assert ubos[['Entity ID', 'Person ID']].values.tolist() == [['27', 'P1']]
+    assert ubos['Effective Share'].iloc[0] == pytest.approx(0.31, rel=1e-4)
@@ -0,0 +1,11 @@
+import pandas as pd
+from logic.table_index import TableIndex
+
+def test_sort_mixed_column_by_text():
+    # Extra Excel columns keep their values as read, numbers and text mixed
+    df = pd.DataFrame({'Note': [3, 'b', None, 1, 'a'], 'Share': [10.0, 20.0, 30.0, 40.0, 50.0]})
+    index = TableIndex(df)
+
+    assert index.rows(sort_by='Note').tolist() == [3, 0, 4, 1, 2]
+    assert index.rows(sort_by='Note', ascending=False).tolist() == [1, 4, 0, 3, 2]
+    assert index.rows(sort_by='Share', ascending=False).tolist() == [4, 3, 2, 1, 0]
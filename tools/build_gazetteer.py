@@ -0,0 +1,69 @@
+"""
+Build the bundled city table of the offline gazetteer from a GeoNames dump.
+
+Usage:
+    python tools/build_gazetteer.py cities5000.txt [--alt-min-population 100000]
+
+The input is any GeoNames "citiesN" file (https://download.geonames.org/export/dump/,
+CC BY 4.0). Every city is indexed under its name and ASCII name; cities at or
+above --alt-min-population are also indexed under their Latin-script
+alternate names so exonyms such as "München" or "Warschau" resolve. When a
+country has several places with the same name the most populous one wins.
+
+Writes city_keys.npy and city_coords.npy into src/data/gazetteer/.
+"""
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.gazetteer import (  # noqa: E402
+    GAZETTEER_DIR, CITY_KEYS_FILE, CITY_COORDS_FILE, city_key
+)
+
+# Column positions in the GeoNames dump format
+NAME, ASCII_NAME, ALTERNATE_NAMES, LATITUDE, LONGITUDE, COUNTRY_CODE, POPULATION = 1, 2, 3, 4, 5, 8, 14
+
+
+def is_latin(name):
+    return all(ord(char) < 0x250 for char in name)
+
+
+def read_cities(path, alt_min_population):
+    with open(path, encoding='utf-8') as f:
+        for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+            population = int(row[POPULATION] or 0)
+            names = {row[NAME], row[ASCII_NAME]}
+            if population >= alt_min_population:
+                names.update(name for name in row[ALTERNATE_NAMES].split(',') if name and is_latin(name))
+            for name in names:
+                yield city_key(row[COUNTRY_CODE], name), float(row[LATITUDE]), float(row[LONGITUDE]), population
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('cities', help='GeoNames cities dump (tab separated)')
+    parser.add_argument('--alt-min-population', type=int, default=100_000)
+    parser.add_argument('--out', default=GAZETTEER_DIR)
+    args = parser.parse_args()
+
+    best = {}
+    for key, lat, lon, population in read_cities(args.cities, args.alt_min_population):
+        if key not in best or population > best[key][2]:
+            best[key] = (lat, lon, population)
+
+    keys = sorted(best)
+    city_keys = np.array(keys, dtype=np.uint64)
+    city_coords = np.array([best[key][:2] for key in keys], dtype=np.float32)
+
+    np.save(os.path.join(args.out, CITY_KEYS_FILE), city_keys)
+    np.save(os.path.join(args.out, CITY_COORDS_FILE), city_coords)
+    print(f'{len(keys):,} keys, {city_keys.nbytes + city_coords.nbytes:,} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Download the JS/CSS bundles the HTML renderers load into src/static/vendor/.
+
+Usage:
+    python tools/fetch_assets.py [--force]
+
+Run it once on a machine with internet access (for example while building
+the deployment image); the app then serves the bundles itself instead of
+loading them from public CDNs. Bundles that installed Python packages
+already ship (Bokeh, vis-network from PyVis, React from Dash) are served
+from those packages and not downloaded. Fonts and images a stylesheet
+refers to are downloaded next to it, and the stylesheet is rewritten to
+load them from there.
+"""
+import argparse
+import os
+import re
+import sys
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.assets import ASSETS, VENDOR_DIR  # noqa: E402
+
+
+# url(...) references of a stylesheet, except inline data
+CSS_URL = re.compile(r'''url\(\s*(['"]?)(?!data:)([^'")]+)\1\s*\)''')
+
+
+def download(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def save(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def localize_css(url, path, css):
+    """
+    Download the files a stylesheet refers to into a folder named after it
+    and point the stylesheet at them
+    """
+    folder = os.path.splitext(os.path.basename(path))[0] + '_files'
+    local = {}
+
+    def replace(match):
+        reference = match.group(2).strip()
+        target = urllib.parse.urljoin(url, reference)
+        if target not in local:
+            name = os.path.basename(urllib.parse.urlsplit(target).path)
+            save(os.path.join(os.path.dirname(path), folder, name), download(target))
+            local[target] = f'{folder}/{name}'
+        return f'url("{local[target]}")'
+
+    return CSS_URL.sub(replace, css.decode('utf-8')).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force', action='store_true', help='Download bundles that are already present')
+    args = parser.parse_args()
+
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    failed = 0
+    for url, (root, name) in ASSETS.items():
+        if root != 'vendor':
+            continue
+        path = os.path.join(VENDOR_DIR, name)
+        if os.path.exists(path) and not args.force:
+            print(f'{name}: present')
+            continue
+        try:
+            data = download(url)
+            if name.endswith('.css'):
+                data = localize_css(url, path, data)
+        except OSError as exc:
+            print(f'{name}: failed ({exc})', file=sys.stderr)
+            failed += 1
+            continue
+        save(path, data)
+        print(f'{name}: {len(data) / 1024:,.0f} KiB from {url}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())